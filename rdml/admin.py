@@ -11,7 +11,7 @@ class RDAdminSite(admin.AdminSite):
 
         context = super().each_context(request)
 
-        branding = Branding.objects.first()
+        branding = Branding.get_cached()
         if branding:
             context.update(
                 {
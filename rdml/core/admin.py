@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.contrib import admin
+from django.db.models import Exists, OuterRef
+from django.utils.html import format_html, format_html_join
+
+from .models import LinkCheckResult, LinkStatus
+
+
+class BrokenLinksAdminMixin:
+    """
+    Adds a "broken links" badge to the change list for the URL fields in
+    `link_check_fields`, based on the stored link check results (see the
+    check_links management command), without requests to the URLs.
+    """
+
+    link_check_fields = []
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        unreachable = LinkStatus.objects.filter(is_reachable=False)
+        return queryset.annotate(
+            **{
+                f"{field}_unreachable": Exists(unreachable.filter(url=OuterRef(field)))
+                for field in self.link_check_fields
+            }
+        )
+
+    @admin.display(description="Links")
+    def get_broken_links(self, obj):
+        broken = [field for field in self.link_check_fields if getattr(obj, f"{field}_unreachable", False)]
+        if not broken:
+            return ""
+
+        return format_html(
+            """<span style="
+                background-color: var(--delete-button-bg);
+                border-radius: 10px;
+                font-size: smaller;
+                color: white;
+                padding: 2px 4px;
+                white-space: nowrap;
+            " title="{}">broken link</span>""",
+            format_html_join(
+                "\n",
+                "{}: {}",
+                ((obj._meta.get_field(field).verbose_name, getattr(obj, field)) for field in broken),
+            ),
+        )
+
+
+@admin.register(LinkCheckResult)
+class LinkCheckResultAdmin(admin.ModelAdmin):
+    list_display = [
+        "checked",
+        "url",
+        "is_reachable",
+        "status",
+        "error",
+        "duration",
+    ]
+    list_filter = ["is_reachable", "status"]
+    list_per_page = 50
+    # Counting all rows of a large history table is slow
+    show_full_result_count = False
+    date_hierarchy = "checked"
+    search_fields = ["url"]
+    readonly_fields = list_display
+
+    def has_add_permission(self, request):
+        # Results are written by the link checks
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -8,3 +8,6 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "rdml.core"
+
+    def ready(self):
+        from . import checks  # noqa: F401
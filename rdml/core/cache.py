@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache
+
+# Cache backends keeping their data in the memory of each process
+PROCESS_LOCAL_BACKENDS = [
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+]
+
+
+def is_process_local(alias=DEFAULT_CACHE_ALIAS):
+    """
+    Whether the cache is not shared between processes, i.e. changes made by
+    one worker or management command are not seen by the others.
+    """
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_BACKENDS
+
+
+class VersionedCache:
+    """
+    Keeps a value in process memory and reloads it when its version changes.
+
+    The version lives in the Django cache, so calling invalidate() in one
+    worker makes every worker reload the value on its next access, given a
+    cache backend shared between workers (see CACHES). With the default
+    per-process local memory cache, other workers reload after `timeout`
+    seconds at the latest.
+    """
+
+    def __init__(self, key, loader, timeout=60):
+        self.key = f"rdml:version:{key}"
+        self.loader = loader
+        self.timeout = timeout
+        # (version, loaded_at, value), replaced as a whole to stay thread-safe
+        self._entry = None
+
+    def get(self):
+        version = self._get_version()
+        entry = self._entry
+        if entry is None or entry[0] != version or time.monotonic() - entry[1] > self.timeout:
+            entry = (version, time.monotonic(), self.loader())
+            self._entry = entry
+        return entry[2]
+
+    def invalidate(self):
+        cache.set(self.key, uuid.uuid4().hex, None)
+        self._entry = None
+
+    def _get_version(self):
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, uuid.uuid4().hex, None)
+            version = cache.get(self.key)
+        return version
@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_process_local
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cache invalidation (e.g. of the DataCite configuration, the landing page
+    cache and the DataCite circuit breaker) only reaches all workers through
+    a shared cache.
+    """
+    if settings.RDML_WEB_WORKERS > 1 and is_process_local():
+        return [
+            Warning(
+                f"RDML_WEB_WORKERS is {settings.RDML_WEB_WORKERS}, but the default cache is local to each process.",
+                hint="Set CACHE_URL to a cache shared by all workers, e.g. Redis or Memcached.",
+                id="rdml.W001",
+            )
+        ]
+    return []
@@ -2,9 +2,16 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import time
+import urllib.error
 import urllib.request
-from ipaddress import ip_network
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from ipaddress import collapse_addresses, ip_address, ip_network
 
+from django.conf import settings
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
@@ -154,7 +161,8 @@ def _convert_partial_ip_to_cidr(ip_range):
     "10.1.2.3" → "10.1.2.3/32"
     """
 
-    if "/" in ip_range:
+    if "/" in ip_range or ":" in ip_range:
+        # CIDR notation or IPv6 address
         return ip_range
 
     parts = ip_range.split(".")
@@ -170,20 +178,48 @@ def _convert_partial_ip_to_cidr(ip_range):
     raise ValueError(f"Invalid IP range: {ip_range}")
 
 
-def get_ips_from_ranges(ip_ranges):
+class IPRangeMatcher:
     """
-    Convert a list of IP ranges to a list of IP addresses.
+    Matches IP addresses against a list of IP ranges in any format accepted by
+    _convert_partial_ip_to_cidr(), or "*" to match everything. The ranges are
+    merged into sorted, non-overlapping intervals per IP version, so a lookup
+    is a binary search, regardless of the size of the ranges.
     """
-    ips = set()
-    for ip_range in ip_ranges:
+
+    def __init__(self, ip_ranges):
+        self.match_all = "*" in ip_ranges
+        networks = {4: [], 6: []}
+        for ip_range in ip_ranges:
+            try:
+                network = ip_network(_convert_partial_ip_to_cidr(ip_range))
+            except ValueError:
+                continue
+            networks[network.version].append(network)
+
+        self._starts = {}
+        self._ends = {}
+        for version, version_networks in networks.items():
+            # collapse_addresses() merges overlapping and adjacent networks and
+            # returns them sorted
+            collapsed = list(collapse_addresses(version_networks))
+            self._starts[version] = [int(network.network_address) for network in collapsed]
+            self._ends[version] = [int(network.broadcast_address) for network in collapsed]
+
+    def __contains__(self, ip):
+        if self.match_all:
+            return True
+
         try:
-            cidr = _convert_partial_ip_to_cidr(ip_range)
-            net = ip_network(cidr)
-            ips.update([str(ip) for ip in net])
+            address = ip_address(ip)
         except ValueError:
-            continue
+            return False
+
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
 
-    return ips
+        value = int(address)
+        index = bisect_right(self._starts[address.version], value) - 1
+        return index >= 0 and value <= self._ends[address.version][index]
 
 
 def get_client_ip(request):
@@ -196,15 +232,128 @@ def get_client_ip(request):
     return client_ip
 
 
+def probe_url(url, timeout=5, deadline=None):
+    """
+    Request a fully qualified URL and return (HTTP status, error). Sends a
+    HEAD request and falls back to a GET of the first byte, as some servers
+    do not support HEAD.
+
+    With a `deadline` (time.monotonic() value), requests time out at the
+    deadline at the latest, and None is returned if the URL could not be
+    checked before it.
+    """
+    for method, headers in (("HEAD", {}), ("GET", {"Range": "bytes=0-0"})):
+        request_timeout = timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            request_timeout = min(timeout, remaining)
+
+        req = urllib.request.Request(url, method=method, headers=headers)
+        req.add_header("User-Agent", "RDML Link Checker")
+        try:
+            with urllib.request.urlopen(req, timeout=request_timeout) as response:
+                return response.status, ""
+        except urllib.error.HTTPError as e:
+            status, error = e.code, str(e)
+        except Exception as e:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            # Connection problems do not depend on the method
+            return None, str(e) or e.__class__.__name__
+    return status, error
+
+
 def linkchecker(url, timeout=5):
     """
     Checks if a fully qualified URL is reachable (HTTP status 200-399).
     Returns True if the request succeeds, False otherwise.
     """
-    try:
-        req = urllib.request.Request(url)
-        req.add_header("User-Agent", "RDML Link Checker")
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            return 200 <= response.status < 400
-    except Exception:
-        return False
+    status, _error = probe_url(url, timeout=timeout)
+    return is_reachable_status(status)
+
+
+def check_urls(urls, budget=None):
+    """
+    Check the reachability of URLs concurrently, within an overall time
+    budget in seconds. Results are cached in LinkStatus, see the
+    RDML_LINKCHECK_* settings. Returns a dict of URL to True or False, and
+    None for URLs not checked within the budget.
+    """
+    from .models import LinkStatus
+
+    budget = settings.RDML_LINKCHECK_BUDGET if budget is None else budget
+    now = timezone.now()
+    results = dict.fromkeys(urls)
+    for link_status in LinkStatus.objects.filter(url__in=results, expires__gt=now):
+        results[link_status.url] = link_status.is_reachable
+
+    unchecked = [url for url, result in results.items() if result is None]
+    if not unchecked:
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=len(unchecked))
+    # Each request gets the remaining budget as timeout. URLs not checked
+    # within the budget stay unchecked instead of being cached as unreachable.
+    deadline = time.monotonic() + budget
+    futures = {executor.submit(probe_url, url, budget, deadline): url for url in unchecked}
+    done, _not_done = wait(futures, timeout=budget)
+    # Do not wait for slow servers beyond the budget
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    checked = []
+    for future in done:
+        result = future.result()
+        if result is not None:
+            status, error = result
+            checked.append((futures[future], status, error, None))
+    results.update(store_link_results(checked, now))
+    return results
+
+
+def is_reachable_status(status):
+    return status is not None and 200 <= status < 400
+
+
+def store_link_results(checked, now=None):
+    """
+    Persist link check results, given as (URL, HTTP status, error, duration
+    in ms) tuples: the latest result per URL in LinkStatus and the history in
+    LinkCheckResult. Returns a dict of URL to True or False.
+    """
+    from .models import LinkCheckResult, LinkStatus
+
+    now = now or timezone.now()
+    link_statuses = {}
+    history = []
+    for url, status, error, duration in checked:
+        is_reachable = is_reachable_status(status)
+        ttl = settings.RDML_LINKCHECK_TTL if is_reachable else settings.RDML_LINKCHECK_NEGATIVE_TTL
+        link_statuses[url] = LinkStatus(
+            url=url,
+            is_reachable=is_reachable,
+            status=status,
+            error=error[:255],
+            checked=now,
+            expires=now + timedelta(seconds=ttl),
+        )
+        history.append(
+            LinkCheckResult(
+                url=url,
+                is_reachable=is_reachable,
+                status=status,
+                error=error[:255],
+                checked=now,
+                duration=duration,
+            )
+        )
+
+    LinkStatus.objects.bulk_create(
+        link_statuses.values(),
+        update_conflicts=True,
+        unique_fields=["url"],
+        update_fields=["is_reachable", "status", "error", "checked", "expires"],
+    )
+    LinkCheckResult.objects.bulk_create(history)
+    return {url: link_status.is_reachable for url, link_status in link_statuses.items()}
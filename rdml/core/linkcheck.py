@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Catalogue-wide link checker, see the check_links management command.
+
+URLs are probed concurrently in a thread pool, HEAD first, see
+helpers.probe_url(). To be polite to the checked servers, at most
+`per_host` requests run concurrently per host, started at least `delay`
+seconds apart. URLs are interleaved by host, so a host with many URLs
+(e.g. doi.org) does not hold up the others.
+"""
+
+import itertools
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from .helpers import probe_url
+
+
+class HostLimiter:
+    """
+    Limits the concurrent requests per host and spaces their starts.
+    """
+
+    def __init__(self, per_host, delay):
+        self.per_host = per_host
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.semaphores = {}
+        self.next_start = {}
+
+    @contextmanager
+    def limit(self, host):
+        with self.lock:
+            semaphore = self.semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with semaphore:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_start.get(host, now))
+                self.next_start[host] = start + self.delay
+            time.sleep(start - now)
+            yield
+
+
+def get_host(url):
+    return (urllib.parse.urlsplit(url).hostname or "").lower()
+
+
+def interleave_by_host(urls):
+    """
+    Order URLs round-robin by host: a.org/1, b.org/1, a.org/2, b.org/2, ...
+    """
+    by_host = {}
+    for url in urls:
+        by_host.setdefault(get_host(url), []).append(url)
+    rounds = itertools.zip_longest(*by_host.values())
+    return [url for url in itertools.chain.from_iterable(rounds) if url is not None]
+
+
+def get_catalogue_urls():
+    """
+    Return the sorted, distinct URLs referenced in the catalogue: resource
+    websites and preregistrations, organization and organizational unit
+    URLs, ORCID IDs and the resolver URLs of registered and findable DOIs.
+    """
+    from ..doimanager.models import DataCiteResource
+    from ..organization.models import Organization, OrganizationalUnit, Person
+    from ..research.models import Resource
+
+    sources = [
+        (Resource, ["website", "preregistration"]),
+        (Organization, ["url"]),
+        (OrganizationalUnit, ["url"]),
+        (Person, ["orcid_id"]),
+    ]
+
+    urls = set()
+    for model, fields in sources:
+        for field in fields:
+            queryset = model.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""})
+            urls.update(queryset.values_list(field, flat=True).distinct())
+
+    # Draft DOIs do not resolve
+    dois = (
+        DataCiteResource.objects.filter(
+            datacite_state__in=[DataCiteResource.DOIState.REGISTERED, DataCiteResource.DOIState.FINDABLE]
+        )
+        .exclude(doi__isnull=True)
+        .exclude(doi="")
+        .values_list("doi", flat=True)
+    )
+    urls.update(DataCiteResource(doi=doi).get_doi_resolver_url for doi in dois)
+
+    return sorted(urls)
+
+
+def check_links(urls, workers, per_host, delay, timeout=10):
+    """
+    Probe the URLs concurrently, yields (URL, HTTP status, error, duration in
+    ms) tuples as the checks complete.
+    """
+    limiter = HostLimiter(per_host, delay)
+
+    def check(url):
+        with limiter.limit(get_host(url)):
+            started = time.monotonic()
+            status, error = probe_url(url, timeout=timeout)
+        return url, status, error, int((time.monotonic() - started) * 1000)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(check, url) for url in interleave_by_host(urls)]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import random
+import timeit
+from ipaddress import IPv4Address, IPv6Address
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from rdml.core.helpers import IPRangeMatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark for the IP allow-list matcher used by ip_allowed_middleware. "
+        "Measures building the matcher and looking up random IPv4 and IPv6 addresses."
+    )
+
+    # Large ranges, which expanded to sets of addresses would not fit into memory
+    default_ranges = ["10", "172.16.0.0/12", "192.168", "2001:db8::/32", "fd00::/8"]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lookups", type=int, default=100_000, help="Number of lookups to time.")
+        parser.add_argument(
+            "--networks", type=int, default=1000, help="Number of additional random /24 networks to match against."
+        )
+        parser.add_argument(
+            "--from-settings",
+            action="store_true",
+            help="Use RDML_EDIT_ALLOWED_IP_RANGES instead of the default ranges.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        if options["from_settings"]:
+            ip_ranges = list(settings.RDML_EDIT_ALLOWED_IP_RANGES)
+        else:
+            ip_ranges = self.default_ranges + [
+                f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}" for _ in range(options["networks"])
+            ]
+
+        build_time = timeit.timeit(lambda: IPRangeMatcher(ip_ranges), number=1)
+        matcher = IPRangeMatcher(ip_ranges)
+        self.stdout.write(f"Built matcher for {len(ip_ranges)} ranges in {build_time * 1000:.2f} ms")
+
+        lookups = options["lookups"]
+        addresses = {
+            "IPv4": [str(IPv4Address(rng.getrandbits(32))) for _ in range(lookups)],
+            "IPv6": [str(IPv6Address((0x20010DB8 << 96) | rng.getrandbits(96))) for _ in range(lookups)],
+        }
+        for label, ips in addresses.items():
+            duration = timeit.timeit(lambda ips=ips: [ip in matcher for ip in ips], number=1)
+            matches = sum(ip in matcher for ip in ips)
+            self.stdout.write(
+                f"{label}: {lookups} lookups in {duration * 1000:.2f} ms "
+                f"({duration / lookups * 1_000_000:.2f} µs per lookup, {matches} matches)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from rdml.core.helpers import store_link_results
+from rdml.core.linkcheck import check_links, get_catalogue_urls
+from rdml.core.models import LinkCheckResult, LinkStatus
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the reachability of all URLs in the catalogue (resource websites and preregistrations, "
+        "organization URLs, ORCID IDs and DOI resolver URLs) and stores the results for the admin. "
+        "Run it e.g. nightly, or as a service with --interval."
+    )
+
+    batch_size = 100
+
+    def add_arguments(self, parser):
+        parser.add_argument("urls", nargs="*", help="Check only these URLs.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.RDML_LINKCHECK_WORKERS,
+            help="Number of URLs checked concurrently.",
+        )
+        parser.add_argument(
+            "--per-host",
+            type=int,
+            default=settings.RDML_LINKCHECK_PER_HOST,
+            help="Number of URLs checked concurrently per host.",
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=settings.RDML_LINKCHECK_HOST_DELAY,
+            help="Seconds between the starts of requests to the same host.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=settings.RDML_LINKCHECK_TIMEOUT,
+            help="Seconds to wait for a response.",
+        )
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=0,
+            help="Skip URLs checked within this many seconds.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.RDML_LINKCHECK_RETENTION_DAYS,
+            help="Delete link check results older than this many days.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Check again every this many seconds, instead of exiting.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the URLs, but do not check them.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            started = time.monotonic()
+            self.check(options)
+            if not options["interval"] or options["dry_run"]:
+                break
+            time.sleep(max(0, options["interval"] - (time.monotonic() - started)))
+
+    def check(self, options):
+        urls = options["urls"] or get_catalogue_urls()
+        if options["max_age"]:
+            recent = LinkStatus.objects.filter(
+                url__in=urls, checked__gte=timezone.now() - timedelta(seconds=options["max_age"])
+            ).values_list("url", flat=True)
+            urls = sorted(set(urls) - set(recent))
+
+        if options["dry_run"]:
+            for url in urls:
+                self.stdout.write(url)
+            self.stdout.write(self.style.SUCCESS(f"Would check {len(urls)} URLs."))
+            return
+
+        started = time.monotonic()
+        unreachable = 0
+        batch = []
+        results = check_links(
+            urls,
+            workers=options["workers"],
+            per_host=options["per_host"],
+            delay=options["delay"],
+            timeout=options["timeout"],
+        )
+        for result in results:
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                unreachable += self.store(batch)
+                batch = []
+        unreachable += self.store(batch)
+
+        deleted, _ = LinkCheckResult.objects.filter(
+            checked__lt=timezone.now() - timedelta(days=options["retention_days"])
+        ).delete()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {len(urls)} URLs in {time.monotonic() - started:.1f}s, {unreachable} unreachable. "
+                f"Deleted {deleted} old results."
+            )
+        )
+
+    def store(self, batch):
+        """Persist a batch of results, returns the number of unreachable URLs."""
+        if not batch:
+            return 0
+        reachable = store_link_results(batch)
+        for url, status, error, _duration in batch:
+            if not reachable[url]:
+                self.stdout.write(self.style.ERROR(f"\t{url}: {status or error}"))
+        return list(reachable.values()).count(False)
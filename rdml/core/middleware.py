@@ -7,7 +7,7 @@ from whitenoise.middleware import WhiteNoiseMiddleware
 
 from django.core.exceptions import PermissionDenied
 
-from .helpers import get_ips_from_ranges, get_client_ip
+from .helpers import IPRangeMatcher, get_client_ip
 
 
 def more_whitenoise_middleware(get_response):
@@ -27,8 +27,7 @@ def more_whitenoise_middleware(get_response):
     return middleware
 
 
-ips_allowed = get_ips_from_ranges(settings.RDML_EDIT_ALLOWED_IP_RANGES)
-ips_allowed_all = settings.RDML_EDIT_ALLOWED_IP_RANGES == ["*"]
+ips_allowed = IPRangeMatcher(settings.RDML_EDIT_ALLOWED_IP_RANGES)
 
 
 def ip_allowed_middleware(get_response):
@@ -36,7 +35,7 @@ def ip_allowed_middleware(get_response):
         # Code to be executed for each request before
         # the view (and later middleware) are called.
         client_ip = get_client_ip(request)
-        request.ip_allowed = any([client_ip in ips_allowed, ips_allowed_all])
+        request.ip_allowed = client_ip in ips_allowed
 
         response = get_response(request)
 
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048, unique=True)),
+                ('is_reachable', models.BooleanField()),
+                ('status', models.PositiveSmallIntegerField(blank=True, help_text='HTTP status of the response.', null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('checked', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name_plural': 'link statuses',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkCheckResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2048)),
+                ('is_reachable', models.BooleanField()),
+                ('status', models.PositiveSmallIntegerField(blank=True, help_text='HTTP status of the response.', null=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('checked', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('duration', models.PositiveIntegerField(blank=True, help_text='Duration of the check in milliseconds.', null=True)),
+            ],
+            options={
+                'ordering': ['-checked'],
+                'indexes': [models.Index(fields=['url', '-checked'], name='core_linkch_url_ac2cac_idx')],
+            },
+        ),
+    ]
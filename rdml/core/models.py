@@ -4,6 +4,7 @@
 
 import uuid
 from django.db import models
+from django.utils import timezone
 
 
 class SingletonBaseModel(models.Model):
@@ -40,3 +41,47 @@ class UUIDBaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class LinkStatus(models.Model):
+    """
+    Cached result of a URL reachability check, see helpers.check_urls().
+    Results are valid until `expires`, unreachable URLs for a shorter time.
+    """
+
+    url = models.URLField(max_length=2048, unique=True)
+    is_reachable = models.BooleanField()
+    status = models.PositiveSmallIntegerField(blank=True, null=True, help_text="HTTP status of the response.")
+    error = models.CharField(max_length=255, blank=True)
+    checked = models.DateTimeField(default=timezone.now)
+    expires = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.url} ({'reachable' if self.is_reachable else 'unreachable'})"
+
+    class Meta:
+        verbose_name_plural = "link statuses"
+
+
+class LinkCheckResult(models.Model):
+    """
+    History of URL reachability checks, one row per check, see
+    helpers.store_link_results(). The latest result per URL is kept in
+    LinkStatus.
+    """
+
+    url = models.URLField(max_length=2048)
+    is_reachable = models.BooleanField()
+    status = models.PositiveSmallIntegerField(blank=True, null=True, help_text="HTTP status of the response.")
+    error = models.CharField(max_length=255, blank=True)
+    checked = models.DateTimeField(default=timezone.now, db_index=True)
+    duration = models.PositiveIntegerField(blank=True, null=True, help_text="Duration of the check in milliseconds.")
+
+    def __str__(self):
+        return f"{self.url} ({'reachable' if self.is_reachable else 'unreachable'})"
+
+    class Meta:
+        ordering = ["-checked"]
+        indexes = [
+            models.Index(fields=["url", "-checked"]),
+        ]
@@ -0,0 +1,44 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+
+from rdml.core.cache import VersionedCache
+from rdml.organization.models import Branding
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_branding_is_reloaded_after_saving():
+    assert Branding.get_cached() is None
+
+    branding = Branding.objects.create(organization_name="Before")
+    assert Branding.get_cached().organization_name == "Before"
+
+    branding.organization_name = "After"
+    branding.save()
+    assert Branding.get_cached().organization_name == "After"
+
+    branding.delete()
+    assert Branding.get_cached() is None
+
+
+def test_other_workers_reload_after_invalidation():
+    values = iter(["first", "second"])
+    # Two processes caching the same value
+    worker = VersionedCache("test", lambda: next(values), timeout=3600)
+    other_worker = VersionedCache("test", lambda: "other", timeout=3600)
+
+    assert worker.get() == "first"
+    assert worker.get() == "first"
+    other_worker.invalidate()
+    assert worker.get() == "second"
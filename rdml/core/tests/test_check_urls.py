@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from rdml.core import helpers
+from rdml.core.helpers import check_urls, probe_url
+from rdml.core.models import LinkStatus
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self):
+        self.requests.append(("HEAD", self.path))
+        if self.path == "/slow":
+            time.sleep(1)
+        # Some servers do not support HEAD
+        self.send_response({"/ok": 200, "/no-head": 405, "/slow": 200}.get(self.path, 404))
+        self.end_headers()
+
+    def do_GET(self):
+        self.requests.append(("GET", self.path))
+        self.send_response(206 if self.path == "/no-head" else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.django_db
+def test_check_urls_falls_back_to_get(server):
+    results = check_urls([f"{server}/ok", f"{server}/no-head", f"{server}/missing"])
+
+    assert results == {f"{server}/ok": True, f"{server}/no-head": True, f"{server}/missing": False}
+    assert ("GET", "/no-head") in Handler.requests
+
+
+@pytest.mark.django_db
+def test_check_urls_caches_results(server):
+    check_urls([f"{server}/ok", f"{server}/missing"])
+    Handler.requests.clear()
+
+    results = check_urls([f"{server}/ok", f"{server}/missing"])
+
+    assert results == {f"{server}/ok": True, f"{server}/missing": False}
+    assert Handler.requests == []
+    assert LinkStatus.objects.get(url=f"{server}/missing").expires < LinkStatus.objects.get(url=f"{server}/ok").expires
+
+
+@pytest.mark.django_db
+def test_check_urls_respects_budget(server):
+    started = time.monotonic()
+    results = check_urls([f"{server}/ok", f"{server}/slow"], budget=0.5)
+
+    assert time.monotonic() - started < 0.9
+    assert results == {f"{server}/ok": True, f"{server}/slow": None}
+    assert not LinkStatus.objects.filter(url=f"{server}/slow").exists()
+
+
+def test_probe_times_out_at_the_deadline(server):
+    started = time.monotonic()
+
+    assert probe_url(f"{server}/slow", timeout=5, deadline=started + 0.3) is None
+    assert time.monotonic() - started < 0.9
+
+
+def test_probe_skips_get_fallback_after_the_deadline(server, monkeypatch):
+    # The deadline passes while waiting for the response to HEAD
+    clock = iter([0, 10])
+    monkeypatch.setattr(helpers, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+
+    assert probe_url(f"{server}/no-head", deadline=5) is None
+    assert Handler.requests == [("HEAD", "/no-head")]
@@ -0,0 +1,33 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.checks import run_checks
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+SHARED_CACHE = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://localhost"}}
+
+
+def get_check_ids():
+    return [message.id for message in run_checks(include_deployment_checks=True)]
+
+
+def test_local_memory_cache_with_several_workers_warns(settings):
+    settings.CACHES = LOCMEM_CACHE
+    settings.RDML_WEB_WORKERS = 4
+
+    assert "rdml.W001" in get_check_ids()
+
+
+def test_local_memory_cache_with_one_worker_is_fine(settings):
+    settings.CACHES = LOCMEM_CACHE
+    settings.RDML_WEB_WORKERS = 1
+
+    assert "rdml.W001" not in get_check_ids()
+
+
+def test_shared_cache_with_several_workers_is_fine(settings):
+    settings.CACHES = SHARED_CACHE
+    settings.RDML_WEB_WORKERS = 4
+
+    assert "rdml.W001" not in get_check_ids()
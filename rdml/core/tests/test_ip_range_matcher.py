@@ -0,0 +1,38 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from rdml.core.helpers import IPRangeMatcher
+
+
+@pytest.fixture
+def matcher():
+    return IPRangeMatcher(["10", "192.168.1", "127.0.0.1", "172.16.0.0/12", "2001:db8::/32", "invalid"])
+
+
+@pytest.mark.parametrize(
+    "ip",
+    ["10.0.0.0", "10.255.255.255", "192.168.1.42", "127.0.0.1", "172.31.0.1", "2001:db8::1", "::ffff:10.1.2.3"],
+)
+def test_ip_in_ranges(matcher, ip):
+    assert ip in matcher
+
+
+@pytest.mark.parametrize(
+    "ip",
+    ["11.0.0.0", "9.255.255.255", "192.168.2.1", "127.0.0.2", "172.32.0.1", "2001:db9::1", "", None, "not-an-ip"],
+)
+def test_ip_not_in_ranges(matcher, ip):
+    assert ip not in matcher
+
+
+def test_wildcard_matches_everything():
+    matcher = IPRangeMatcher(["*"])
+    assert "8.8.8.8" in matcher
+    assert "2001:db8::1" in matcher
+
+
+def test_empty_ranges_match_nothing():
+    assert "10.0.0.1" not in IPRangeMatcher([])
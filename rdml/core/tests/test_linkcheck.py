@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.core.management import call_command
+
+from rdml.core.linkcheck import check_links, interleave_by_host
+from rdml.core.models import LinkCheckResult, LinkStatus
+
+
+class Handler(BaseHTTPRequestHandler):
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def do_HEAD(self):
+        with self.lock:
+            Handler.active += 1
+            Handler.max_active = max(Handler.max_active, Handler.active)
+        time.sleep(0.05)
+        with self.lock:
+            Handler.active -= 1
+        self.send_response(404 if self.path == "/missing" else 200)
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.max_active = 0
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_interleave_by_host():
+    urls = ["https://a.org/1", "https://a.org/2", "https://a.org/3", "https://b.org/1"]
+
+    assert interleave_by_host(urls) == ["https://a.org/1", "https://b.org/1", "https://a.org/2", "https://a.org/3"]
+
+
+def test_check_links_limits_requests_per_host(server):
+    urls = [f"{server}/{index}" for index in range(8)]
+
+    results = list(check_links(urls, workers=8, per_host=2, delay=0))
+
+    assert sorted(url for url, *_result in results) == sorted(urls)
+    assert Handler.max_active == 2
+
+
+@pytest.mark.django_db
+def test_check_links_command_keeps_history(server):
+    urls = [f"{server}/ok", f"{server}/missing"]
+
+    call_command("check_links", *urls, delay=0)
+    call_command("check_links", *urls, delay=0)
+
+    assert LinkCheckResult.objects.filter(url=f"{server}/missing", is_reachable=False, status=404).count() == 2
+    assert LinkStatus.objects.get(url=f"{server}/ok").is_reachable
+    assert not LinkStatus.objects.get(url=f"{server}/missing").is_reachable
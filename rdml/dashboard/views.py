@@ -7,6 +7,8 @@ from django.template.response import TemplateResponse
 from django.contrib.auth.decorators import login_required
 
 from rdml.core.decorators import restrict_to_ip_range
+from rdml.doimanager.datacite.request import get_request_stats
+from rdml.doiresolver import cache as page_cache
 from ..research.models import ResearchResource
 
 
@@ -40,6 +42,8 @@ def dashboard(request):
         "research_resources_yours": research_resources.filter(curators=request.user).count(),
         "public_landing_pages_count": research_resources.filter(is_public=True).count(),
         "not_public_landing_pages_count": research_resources.filter(is_public=False).count(),
+        "landing_page_cache": page_cache.get_stats(),
+        "datacite_requests": get_request_stats(),
         "navitems": navitems,
     }
 
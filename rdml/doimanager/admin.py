@@ -2,11 +2,14 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
-# import json
+import json
+
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 
-from .models import DataCiteResource, DataCiteConfiguration
-# from ..core.helpers import json_html_highlighter
+from .models import DataCiteAPILog, DataCiteResource, DataCiteConfiguration, DOITransitionJob
+from ..core.helpers import json_html_highlighter
 
 
 @admin.register(DataCiteResource)
@@ -17,6 +20,11 @@ class DataCiteResourceAdmin(admin.ModelAdmin):
     readonly_fields = [
         "citation_snippet",
         # 'doi',
+        "datacite_state",
+        "datacite_state_synced",
+        "datacite_updated",
+        "metadata_pushed",
+        "get_api_log",
         "created",
         "updated",
     ]
@@ -31,24 +39,19 @@ class DataCiteResourceAdmin(admin.ModelAdmin):
 
     list_display = [
         "__str__",
+        "datacite_state",
+        "datacite_state_synced",
         "created",
         "updated",
     ]
-    # fieldsets = (
-    #     ('READONLY', {
-    #         'classes': ('collapse',),
-    #         'fields': (
-    #             'citation_snippet',
-    #             'datacite_history_formatted',
-    #         ),
-    #     }),
-    # )
-
-    # @admin.display(description="DataCite Response History")
-    # def datacite_history_formatted(self, instance):
-    #     """Function to display pretty version of our data"""
-    #     json_data = json.dumps(instance.datacite_history, sort_keys=True, indent=2)
-    #     return json_html_highlighter(json_data)
+    list_filter = ["datacite_state"]
+
+    @admin.display(description="DataCite API log")
+    def get_api_log(self, obj):
+        if not obj.pk:
+            return "-"
+        url = reverse("admin:doimanager_dataciteapilog_changelist")
+        return format_html('<a href="{}?datacite_resource__id__exact={}">Show requests</a>', url, obj.pk)
 
     def response_change(self, request, obj):
         # if "_datacite_handler" in request.POST:
@@ -63,3 +66,76 @@ class DataCiteResourceAdmin(admin.ModelAdmin):
 @admin.register(DataCiteConfiguration)
 class DataCiteConfigurationAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(DOITransitionJob)
+class DOITransitionJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "__str__",
+        "transition_to",
+        "status",
+        "requested_by",
+        "created",
+        "finished",
+    ]
+    list_filter = ["status", "transition_to"]
+    list_select_related = ["datacite_resource__resource", "requested_by"]
+    readonly_fields = [
+        "datacite_resource",
+        "transition_to",
+        "requested_by",
+        "started",
+        "finished",
+        "result",
+        "error",
+        "created",
+        "updated",
+    ]
+
+    def has_add_permission(self, request):
+        # Jobs are queued via the DOI manager
+        return False
+
+
+@admin.register(DataCiteAPILog)
+class DataCiteAPILogAdmin(admin.ModelAdmin):
+    list_display = [
+        "timestamp",
+        "method",
+        "status",
+        "url",
+        "datacite_resource",
+    ]
+    list_filter = ["method", "status"]
+    list_select_related = ["datacite_resource__resource"]
+    list_per_page = 50
+    # Counting all rows of a large log table is slow
+    show_full_result_count = False
+    date_hierarchy = "timestamp"
+    search_fields = ["url"]
+    fields = [
+        "datacite_resource",
+        "timestamp",
+        "method",
+        "url",
+        "status",
+        "error",
+        "request_data_formatted",
+        "response_body_formatted",
+    ]
+    readonly_fields = fields
+
+    @admin.display(description="Request data")
+    def request_data_formatted(self, instance):
+        return json_html_highlighter(json.dumps(instance.request_data, sort_keys=True, indent=2))
+
+    @admin.display(description="Response body")
+    def response_body_formatted(self, instance):
+        return json_html_highlighter(json.dumps(instance.response_body, sort_keys=True, indent=2))
+
+    def has_add_permission(self, request):
+        # Entries are written by the DataCite REST client
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
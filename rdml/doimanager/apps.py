@@ -8,3 +8,6 @@ from django.apps import AppConfig
 class DoimanagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "rdml.doimanager"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -10,10 +10,18 @@ from django.core.exceptions import MultipleObjectsReturned
 
 
 def doimanager(request):
+    """
+    Warn staff about a missing or test DataCite configuration. Skipped for
+    everyone else, so public pages neither query the database nor write
+    messages to the session.
+    """
+    if not request.user.is_staff:
+        return {}
+
     datacite_configuration_meta = DataCiteConfiguration._meta
 
     try:
-        datacite_configuration = DataCiteConfiguration.objects.get(is_active=True)
+        datacite_configuration = DataCiteConfiguration.get_active()
 
         if datacite_configuration.datacite_instance == DataCiteConfiguration.DataCiteInstance.TEST:
             messages.warning(
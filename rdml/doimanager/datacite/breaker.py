@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Circuit breaker for DataCite API requests.
+
+After `failure_threshold` consecutive failures (connection errors, timeouts
+or 5xx responses) the breaker opens and requests fail immediately with
+DataCiteUnavailableError instead of waiting for the timeouts. After
+`open_interval` seconds a single request probes DataCite (half-open): on
+success the breaker closes, on failure it opens again.
+
+The breaker state is kept in the Django cache, so it is shared by all
+processes using a shared cache backend (e.g. Redis).
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .errors import DataCiteUnavailableError
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold, open_interval, probe_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_interval = open_interval
+        self.probe_timeout = probe_timeout
+        self.failures_key = f"doimanager:datacite:breaker:{name}:failures"
+        self.opened_key = f"doimanager:datacite:breaker:{name}:opened"
+        self.probe_key = f"doimanager:datacite:breaker:{name}:probe"
+
+    def is_open(self):
+        """
+        Return True while requests fail immediately, i.e. the breaker is open
+        and not yet due for a probe.
+        """
+        opened = cache.get(self.opened_key)
+        return opened is not None and time.time() < opened + self.open_interval
+
+    def before_request(self):
+        """
+        Raise DataCiteUnavailableError if the breaker is open. Returns True
+        if the request probes DataCite after the open interval.
+        """
+        opened = cache.get(self.opened_key)
+        if opened is None:
+            return False
+
+        retry_in = opened + self.open_interval - time.time()
+        if retry_in > 0:
+            raise DataCiteUnavailableError(f"DataCite is unavailable, retrying in {retry_in:.0f}s.")
+        # Half-open: let a single request through
+        if not cache.add(self.probe_key, 1, self.probe_timeout):
+            raise DataCiteUnavailableError("DataCite is unavailable, a request is probing it.")
+        return True
+
+    def record_success(self, probing=False):
+        if probing or cache.get(self.failures_key):
+            cache.delete_many([self.failures_key, self.opened_key, self.probe_key])
+
+    def record_failure(self, probing=False):
+        if probing:
+            self.open()
+            return
+
+        # Failures count as consecutive within the open interval
+        cache.add(self.failures_key, 0, self.open_interval)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            failures = 1
+        if failures >= self.failure_threshold:
+            self.open()
+
+    def open(self):
+        print(f"Circuit breaker for {self.name} opened for {self.open_interval}s")
+        cache.set(self.opened_key, time.time(), None)
+        cache.delete(self.probe_key)
+
+
+def get_circuit_breaker(host):
+    """
+    Return the circuit breaker for the given host.
+    """
+    return CircuitBreaker(
+        host,
+        failure_threshold=settings.RDML_DATACITE_BREAKER_THRESHOLD,
+        open_interval=settings.RDML_DATACITE_BREAKER_OPEN_INTERVAL,
+        probe_timeout=settings.RDML_DATACITE_CONNECT_TIMEOUT + settings.RDML_DATACITE_READ_TIMEOUT,
+    )
@@ -52,6 +52,13 @@ class HttpError(Exception):
     """Exception raised when a connection problem happens."""
 
 
+class DataCiteUnavailableError(HttpError):
+    """DataCite failed repeatedly, requests are not sent for a while.
+
+    Raised while the circuit breaker is open, see breaker.CircuitBreaker.
+    """
+
+
 class DataCiteError(Exception):
     """Exception raised when the server returns a known HTTP error code.
 
@@ -63,6 +70,7 @@ class DataCiteError(Exception):
     * 403 Forbidden
     * 404 Not Found
     * 410 Gone (deleted)
+    * 429 Too Many Requests
     """
 
     @staticmethod
@@ -82,6 +90,8 @@ class DataCiteError(Exception):
             return DataCiteGoneError(*args)
         elif err_code == 412:
             return DataCitePreconditionError(*args)
+        elif err_code == 429:
+            return DataCiteTooManyRequestsError(*args)
         else:
             return DataCiteServerError(*args)
 
@@ -135,3 +145,7 @@ class DataCiteGoneError(DataCiteRequestError):
 
 class DataCitePreconditionError(DataCiteRequestError):
     """Metadata must be uploaded first."""
+
+
+class DataCiteTooManyRequestsError(DataCiteRequestError):
+    """Rate limit exceeded, retries did not help. Try later."""
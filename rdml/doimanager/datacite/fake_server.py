@@ -0,0 +1,226 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Local stand-in for the subset of the DataCite REST API used by
+DataCiteRESTClient, for tests and load tests without network access.
+
+DOIs are kept in memory. Latency, server errors and 429 Too Many Requests
+responses can be injected. Point the client at the server with the
+RDML_DATACITE_API_URL setting, see DataCiteConfiguration.get_datacite_env().
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Event sent with a POST or PUT, the states it is allowed from and the
+# resulting state, see https://support.datacite.org/docs/doi-states
+EVENTS = {
+    "register": (["draft"], "registered"),
+    "publish": (["draft", "registered"], "findable"),
+    "hide": (["findable"], "registered"),
+}
+
+
+class FakeDataCite:
+    """
+    In-memory DataCite REST API.
+
+    :param prefix: DOI prefix of the repository.
+    :param latency: Seconds each response is delayed.
+    :param error_rate: Share of requests answered with 503 Service Unavailable.
+    :param throttle_rate: Share of requests answered with 429 Too Many Requests.
+    :param retry_after: Seconds sent in the Retry-After header of 429 responses.
+    :param seed: Seed for the injected errors, for reproducible runs.
+    """
+
+    def __init__(self, prefix="10.12345", latency=0, error_rate=0, throttle_rate=0, retry_after=1, seed=None):
+        self.prefix = prefix
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.dois = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self, host="127.0.0.1", port=0):
+        """Serve in a background thread, returns the base URL."""
+        self.server = ThreadingHTTPServer((host, port), self.get_handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.url
+
+    def serve_forever(self, host="127.0.0.1", port=8765):
+        self.server = ThreadingHTTPServer((host, port), self.get_handler())
+        self.server.daemon_threads = True
+        self.server.serve_forever()
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def get_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def handle_method(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = fake.handle(
+                    self.command, self.path, body, authorized="Authorization" in self.headers
+                )
+                content = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = handle_method
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, method, path, body=b"", authorized=True):
+        """Return status, headers and payload (JSON data or bytes) of a request."""
+        url = urllib.parse.urlsplit(path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        parts = [urllib.parse.unquote(part) for part in url.path.strip("/").split("/", 1)]
+
+        with self.lock:
+            self.requests.append((method, url.path))
+            injected = self.random.random()
+
+        if self.latency:
+            time.sleep(self.latency)
+        if injected < self.throttle_rate:
+            return 429, {"Retry-After": str(self.retry_after)}, error(429, "Too many requests")
+        if injected < self.throttle_rate + self.error_rate:
+            return 503, {}, error(503, "Service unavailable")
+
+        if parts[0] == "resolve" and len(parts) == 2:
+            return self.resolve(parts[1])
+        if parts[0] != "dois":
+            return 404, {}, error(404, "Not found")
+        if not authorized:
+            return 401, {}, error(401, "Bad credentials")
+
+        doi = parts[1].lower() if len(parts) == 2 else None
+        data = json.loads(body or "{}").get("data", {})
+        with self.lock:
+            if method == "GET" and doi:
+                return self.get(doi)
+            if method == "GET":
+                return self.list(query)
+            if method == "POST" and not doi:
+                return self.create(data.get("attributes", {}))
+            if method == "PUT" and doi:
+                return self.update(doi, data.get("attributes", {}))
+            if method == "DELETE" and doi:
+                return self.delete(doi)
+        return 405, {}, error(405, "Method not allowed")
+
+    def get(self, doi):
+        if doi not in self.dois:
+            return 404, {}, error(404, "The resource you are looking for doesn't exist.")
+        return 200, {}, {"data": self.serialize(doi)}
+
+    def list(self, query):
+        # The cursor is the offset of the page, counted from 1
+        offset = int(query.get("page[cursor]", 1)) - 1
+        size = min(int(query.get("page[size]", 25)), 1000)
+        dois = sorted(self.dois)
+        page = dois[offset : offset + size]
+        fields = query.get("fields[dois]")
+        payload = {"data": [self.serialize(doi, fields.split(",") if fields else None) for doi in page], "links": {}}
+        if offset + size < len(dois):
+            next_query = {**query, "page[cursor]": offset + size + 1}
+            payload["links"]["next"] = f"{self.url}dois?{urllib.parse.urlencode(next_query)}"
+        return 200, {}, payload
+
+    def create(self, attributes):
+        attributes = dict(attributes)
+        event = attributes.pop("event", None)
+        doi = (attributes.pop("doi", None) or f"{self.prefix}/{uuid.uuid4().hex[:8]}").lower()
+        if doi in self.dois:
+            return 422, {}, error(422, "This DOI has already been taken")
+        if event and event not in ("register", "publish"):
+            return 422, {}, error(422, f"Invalid event {event}")
+        if event and not attributes.get("url"):
+            return 422, {}, error(422, "A URL is required to register a DOI")
+
+        now = timestamp()
+        self.dois[doi] = {
+            **attributes,
+            "doi": doi,
+            "prefix": doi.split("/")[0],
+            "state": EVENTS[event][1] if event else "draft",
+            "created": now,
+            "updated": now,
+        }
+        return 201, {}, {"data": self.serialize(doi)}
+
+    def update(self, doi, attributes):
+        if doi not in self.dois:
+            return 404, {}, error(404, "The resource you are looking for doesn't exist.")
+        attributes = dict(attributes)
+        attributes.pop("doi", None)
+        event = attributes.pop("event", None)
+        record = self.dois[doi]
+        if event:
+            if event not in EVENTS or record["state"] not in EVENTS[event][0]:
+                return 422, {}, error(422, f"Event {event} is not possible in state {record['state']}")
+            if event != "hide" and not (attributes.get("url") or record.get("url")):
+                return 422, {}, error(422, "A URL is required to register a DOI")
+            record["state"] = EVENTS[event][1]
+        record.update(attributes, updated=timestamp())
+        return 200, {}, {"data": self.serialize(doi)}
+
+    def delete(self, doi):
+        if doi not in self.dois:
+            return 404, {}, error(404, "The resource you are looking for doesn't exist.")
+        if self.dois[doi]["state"] != "draft":
+            return 405, {}, error(405, "Method not allowed")
+        del self.dois[doi]
+        return 204, {}, b""
+
+    def resolve(self, doi):
+        record = self.dois.get(doi.lower())
+        if record is None or record["state"] != "findable":
+            return 404, {"Content-Type": "text/plain"}, b"DOI not found"
+        title = (record.get("titles") or [{}])[0].get("title", "")
+        citation = f"{title}. ({record.get('publicationYear', '')}). https://doi.org/{record['doi']}"
+        return 200, {"Content-Type": "text/x-bibliography; charset=utf-8"}, citation.encode()
+
+    def serialize(self, doi, fields=None):
+        attributes = self.dois[doi]
+        if fields:
+            attributes = {field: attributes.get(field) for field in fields}
+        return {"id": doi, "type": "dois", "attributes": dict(attributes)}
+
+
+def error(status, title):
+    return {"errors": [{"status": str(status), "title": title}]}
+
+
+def timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Client side rate limiting of DataCite API requests.
+
+DataCite documents a limit of 3000 requests within five minutes per client
+IP address. Requests beyond the limit are answered with 429 Too Many Requests.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket allowing `rate` requests per `period` seconds,
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate, period, burst=10):
+        self.interval = period / rate
+        self.capacity = max(1, min(burst, rate))
+        self.tokens = float(self.capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting until one is available. Returns the number of
+        seconds waited.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) / self.interval)
+            self.last = now
+            # Reserve the token, waiting callers queue up behind each other
+            self.tokens -= 1
+            wait = -self.tokens * self.interval if self.tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """
+        Hold back all requests for `seconds`, e.g. after DataCite answered
+        with 429 Too Many Requests.
+        """
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds / self.interval
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host):
+    """
+    Return the rate limiter of the current process for the given host.
+    """
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(
+                host,
+                RateLimiter(settings.RDML_DATACITE_RATE_LIMIT, settings.RDML_DATACITE_RATE_LIMIT_PERIOD),
+            )
+    return limiter
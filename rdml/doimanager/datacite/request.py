@@ -41,13 +41,138 @@
 
 """Module for making requests to the DataCite API."""
 
+import os
+import random
 import ssl
+import threading
+import time
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from http.cookiejar import DefaultCookiePolicy
 
 import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from requests.exceptions import RequestException
+from requests.exceptions import ConnectTimeout, RequestException
 
+from .breaker import get_circuit_breaker
 from .errors import HttpError
+from .ratelimit import get_rate_limiter
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Responses worth another attempt: throttled, or a gateway/server hiccup
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE"}
+
+STATS_KEYS = {
+    name: f"doimanager:datacite:{name}" for name in ("retries", "retry_wait_ms", "throttled", "throttle_wait_ms")
+}
+
+
+def get_session(pool_maxsize=10):
+    """Return the process-wide HTTP session.
+
+    The session keeps connections alive and pools them per host, so
+    consecutive requests skip the TCP and TLS handshakes. Connection pools
+    are thread-safe. Sessions are kept per process id, so a worker forked
+    from a preloaded master (e.g. gunicorn --preload) never shares sockets
+    with its parent.
+
+    :param pool_maxsize: Number of connections kept alive per host. Only
+        used when the session of the current process is created.
+    """
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(pid)
+            if session is None:
+                session = requests.Session()
+                # Stateless API: never share cookies between threads
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions.clear()
+                _sessions[pid] = session
+    return session
+
+
+def get_pool_stats():
+    """Return connection pool statistics of the current process.
+
+    One entry per host with the number of connections opened, requests
+    sent and idle connections currently kept alive.
+    """
+    session = _sessions.get(os.getpid())
+    if session is None:
+        return []
+
+    stats = []
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        # A snapshot of the keys, iterating the pool container itself raises
+        # NotImplementedError as it is not thread-safe
+        keys = pools.keys()
+        for key in keys:
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats.append(
+                {
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "num_connections": pool.num_connections,
+                    "num_requests": pool.num_requests,
+                    # The pool queue is padded with None placeholders
+                    "idle_connections": sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                    if pool.pool
+                    else 0,
+                    "maxsize": pool.pool.maxsize if pool.pool else 0,
+                }
+            )
+    return stats
+
+
+def get_request_stats():
+    """Return retry and throttling statistics of all processes.
+
+    The number of retried requests and the milliseconds spent waiting before
+    retries, the number of 429 Too Many Requests responses and the
+    milliseconds requests were held back by the rate limiter.
+    """
+    stats = cache.get_many(STATS_KEYS.values())
+    return {name: stats.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def _count(name, delta=1):
+    key = STATS_KEYS[name]
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Key does not exist yet, or was evicted
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait given by a Retry-After header, or None.
+
+    The header holds either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
 
 class DataCiteRequest(object):
@@ -60,6 +185,12 @@ class DataCiteRequest(object):
         query string on all requests.
     :param timeout: Connect and read timeout in seconds. Specify a tuple
         (connect, read) to specify each timeout individually.
+    :param pool_maxsize: Number of connections kept alive per host by the
+        process-wide session.
+    :param max_retries: Number of retries of failed requests, see request().
+    :param backoff: Base delay in seconds between retries, doubled with
+        each retry.
+    :param max_backoff: Maximum delay in seconds between retries.
     """
 
     def __init__(
@@ -69,6 +200,10 @@ class DataCiteRequest(object):
         password=None,
         default_params=None,
         timeout=None,
+        pool_maxsize=10,
+        max_retries=0,
+        backoff=0.5,
+        max_backoff=30,
     ):
         """Initialize request object."""
         self.base_url = base_url
@@ -76,12 +211,29 @@ class DataCiteRequest(object):
         self.password = password.encode("utf8")
         self.default_params = default_params or {}
         self.timeout = timeout
+        self.auth = HTTPBasicAuth(self.username, self.password)
+        self.session = get_session(pool_maxsize=pool_maxsize)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
 
     def request(self, url, method="GET", body=None, params=None, headers=None):
         """Make a request.
 
-        If the request was successful (i.e no exceptions), you can find the
-        HTTP response code in self.code and the response body in self.value.
+        Requests are sent via the process-wide session, see get_session(),
+        and rate limited per host, see ratelimit.get_rate_limiter().
+
+        Idempotent requests (GET, PUT, DELETE) are retried up to max_retries
+        times on connection errors and on 429, 502, 503 and 504 responses,
+        with exponential backoff and jitter or as given by Retry-After. POST
+        requests are only retried if DataCite did not process them, i.e. on
+        429 responses and connect timeouts. A 429 response holds back all
+        requests of this process to the host.
+
+        Requests failing with a connection error or 5xx response after all
+        retries are counted by the circuit breaker of the host, see
+        breaker.CircuitBreaker. While it is open, requests raise
+        DataCiteUnavailableError without contacting DataCite.
 
         :param url: Request URL (relative to base_url if set)
         :param method: Request method (GET, POST, DELETE) supported
@@ -92,9 +244,6 @@ class DataCiteRequest(object):
         params = params or {}
         headers = headers or {}
 
-        self.data = None
-        self.code = None
-
         if self.default_params:
             params.update(self.default_params)
 
@@ -104,9 +253,8 @@ class DataCiteRequest(object):
         if body and isinstance(body, str):
             body = body.encode("utf-8")
 
-        request_func = getattr(requests, method.lower())
         kwargs = dict(
-            auth=HTTPBasicAuth(self.username, self.password),
+            auth=self.auth,
             params=params,
             headers=headers,
         )
@@ -118,12 +266,60 @@ class DataCiteRequest(object):
         if self.timeout is not None:
             kwargs["timeout"] = self.timeout
 
-        try:
-            return request_func(url, **kwargs)
-        except RequestException as e:
-            raise HttpError(e)
-        except ssl.SSLError as e:
-            raise HttpError(e)
+        host = urllib.parse.urlsplit(url).netloc
+        limiter = get_rate_limiter(host)
+        breaker = get_circuit_breaker(host)
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+
+        while True:
+            probing = breaker.before_request()
+            waited = limiter.acquire()
+            if waited:
+                _count("throttle_wait_ms", int(waited * 1000))
+
+            # A request counts as one failure of the breaker once its retries
+            # are exhausted. A failed probe is not retried, it reopens the
+            # breaker.
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (RequestException, ssl.SSLError) as e:
+                if probing or attempt >= self.max_retries or not (idempotent or isinstance(e, ConnectTimeout)):
+                    breaker.record_failure(probing)
+                    raise HttpError(e)
+                delay = self._get_backoff(attempt)
+            else:
+                status = response.status_code
+                if status < 500:
+                    breaker.record_success(probing)
+                if (
+                    (probing and status >= 500)
+                    or attempt >= self.max_retries
+                    or status not in RETRY_STATUSES
+                    or not (idempotent or status == 429)
+                ):
+                    if status >= 500:
+                        breaker.record_failure(probing)
+                    return response
+
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self._get_backoff(attempt) if delay is None else min(delay, self.max_backoff)
+                if status == 429:
+                    _count("throttled")
+                    # Slow down all threads, the limiter waits before the retry
+                    limiter.pause(delay)
+                    delay = 0
+
+            attempt += 1
+            _count("retries")
+            if delay:
+                _count("retry_wait_ms", int(delay * 1000))
+                time.sleep(delay)
+
+    def _get_backoff(self, attempt):
+        """Exponential backoff with jitter, so concurrent clients spread out."""
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
 
     def get(self, url, params=None, headers=None):
         """Make a GET request."""
@@ -46,12 +46,17 @@ https://support.datacite.org/reference/introduction.
 """
 
 import json
+import urllib.parse
+from collections import OrderedDict
+
 import requests
-from datetime import datetime
+
+from django.conf import settings
 
 from ..utils import normalize_doi
-from .errors import DataCiteError
-from .request import DataCiteRequest
+from .breaker import get_circuit_breaker
+from .errors import DataCiteError, DataCiteNotFoundError
+from .request import DataCiteRequest, get_pool_stats, get_request_stats
 
 
 HTTP_OK = requests.codes["ok"]
@@ -61,12 +66,15 @@ HTTP_CREATED = requests.codes["created"]
 class DataCiteRESTClient(object):
     """DataCite REST API client wrapper."""
 
+    # Maximum number of DOI records cached by a client, see get_doi_record()
+    RECORDS_CACHE_SIZE = 256
+
     def __init__(self):
         from ..models import DataCiteConfiguration
         from django.core.exceptions import ImproperlyConfigured
 
         try:
-            datacite_configuration = DataCiteConfiguration.objects.get(is_active=True)
+            datacite_configuration = DataCiteConfiguration.get_active()
         except DataCiteConfiguration.DoesNotExist:
             raise ImproperlyConfigured("No active DataCiteConfiguration found. Create one via the admin interface.")
         except DataCiteConfiguration.MultipleObjectsReturned:
@@ -81,67 +89,115 @@ class DataCiteRESTClient(object):
         self.prefix = datacite_configuration.doi_prefix
         self.url = datacite_env.backend_url
         self.api_url = datacite_env.api_url
-        self.timeout = 15
+        self.timeout = (settings.RDML_DATACITE_CONNECT_TIMEOUT, settings.RDML_DATACITE_READ_TIMEOUT)
+        self._request = None
+        # DOI records fetched or written by this client, see get_doi_record()
+        self._records = OrderedDict()
 
     def __repr__(self):
         """Create string representation of object."""
         return "<DataCiteRESTClient: {0}>".format(self.username)
 
     def _create_request(self):
-        """Create a new Request object."""
-        datacite_request = DataCiteRequest(
-            base_url=self.api_url,
-            username=self.username,
-            password=self.password,
-            timeout=self.timeout,
-        )
-        return datacite_request
+        """Return the Request object of this client, created on first use."""
+        if self._request is None:
+            self._request = DataCiteRequest(
+                base_url=self.api_url,
+                username=self.username,
+                password=self.password,
+                timeout=self.timeout,
+                pool_maxsize=settings.RDML_DATACITE_POOL_MAXSIZE,
+                max_retries=settings.RDML_DATACITE_MAX_RETRIES,
+                backoff=settings.RDML_DATACITE_RETRY_BACKOFF,
+                max_backoff=settings.RDML_DATACITE_RETRY_MAX_BACKOFF,
+            )
+        return self._request
+
+    @staticmethod
+    def get_pool_stats():
+        """Connection pool statistics of the current process, see request.get_pool_stats()."""
+        return get_pool_stats()
+
+    def is_available(self):
+        """False while the circuit breaker for the DataCite API is open."""
+        return not get_circuit_breaker(urllib.parse.urlsplit(self.api_url).netloc).is_open()
+
+    @staticmethod
+    def get_request_stats():
+        """Retry and throttling statistics, see request.get_request_stats()."""
+        return get_request_stats()
 
     def _log_history(self, datacite_resource, method, url, request_data=None, response=None, error=None):
-        """Log API communication to datacite_history field of DataCiteResource, but skip GET requests."""
+        """Log API communication of a DataCiteResource to DataCiteAPILog, but skip GET requests."""
+        from ..models import DataCiteAPILog
+
         if datacite_resource is None:
             return
         if method.upper() == "GET":
             return  # Skip logging for GET requests
-        entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "method": method,
-            "url": url,
-        }
-        if request_data is not None:
-            entry["request_data"] = request_data
+        entry = DataCiteAPILog(
+            datacite_resource=datacite_resource,
+            method=method,
+            url=url,
+            request_data=request_data,
+        )
         if response is not None:
+            entry.status = response.status_code
             try:
-                entry["response_status"] = response.status_code
-                entry["response_body"] = response.json()
+                entry.response_body = response.json()
             except Exception:
-                entry["response_body"] = getattr(response, "text", str(response))
+                entry.response_body = getattr(response, "text", str(response))
         if error is not None:
-            entry["error"] = str(error)
-        # Append to history
-        history = datacite_resource.datacite_history or []
-        history.append(entry)
-        datacite_resource.datacite_history = history
-        datacite_resource.save(update_fields=["datacite_history"])
+            entry.error = str(error)
+        entry.save()
 
-    def get_doi(self, doi, datacite_resource=None):
-        """Get the URL where the resource pointed by the DOI is located.
+    def get_doi_record(self, doi, datacite_resource=None):
+        """Get the attributes of a DOI, including its state and URL.
+
+        Successfully fetched records are cached by the client instance (at
+        most RECORDS_CACHE_SIZE), so create one client per request or job.
+        Write requests of this client update the cache. Failed requests are
+        not cached, the next call tries again.
 
         :param doi: DOI name of the resource.
         """
+        key = doi.lower()
+        if key in self._records:
+            self._records.move_to_end(key)
+            return self._records[key]
+        return self._cache_record(doi, self._fetch_doi_record(doi, datacite_resource))
+
+    def _cache_record(self, doi, attributes):
+        """Cache the attributes of a DOI, evicting the least recently used."""
+        self._records[doi.lower()] = attributes
+        self._records.move_to_end(doi.lower())
+        while len(self._records) > self.RECORDS_CACHE_SIZE:
+            self._records.popitem(last=False)
+        return attributes
+
+    def _fetch_doi_record(self, doi, datacite_resource=None):
+        """Return the attributes of a DOI."""
+        headers = {"content-type": "application/vnd.api+json"}
         request = self._create_request()
         url = "dois/" + doi
         try:
-            resp = request.get(url)
+            resp = request.get(url, headers=headers)
             self._log_history(datacite_resource, "GET", url, response=resp)
             if resp.status_code == HTTP_OK:
-                return resp.json()["data"]["attributes"]["url"]
+                return resp.json()["data"]["attributes"]
             else:
                 raise DataCiteError.factory(resp.status_code, resp.text)
         except Exception as e:
             self._log_history(datacite_resource, "GET", url, error=e)
             raise
 
+    def get_doi(self, doi, datacite_resource=None):
+        """Get the URL where the resource pointed by the DOI is located.
+
+        :param doi: DOI name of the resource.
+        """
+        return self.get_doi_record(doi, datacite_resource)["url"]
+
     def check_doi(self, doi):
         """Check doi structure.
 
@@ -179,7 +235,9 @@ class DataCiteRESTClient(object):
             resp = request.post(url, body=body_json, headers=headers)
             self._log_history(datacite_resource, "POST", url, request_data=body, response=resp)
             if resp.status_code == HTTP_CREATED:
-                return resp.json()["data"]["id"]
+                data = resp.json()["data"]
+                self._cache_record(data["id"], data["attributes"])
+                return data["id"]
             else:
                 raise DataCiteError.factory(resp.status_code, resp.text)
         except Exception as e:
@@ -198,7 +256,7 @@ class DataCiteRESTClient(object):
             resp = request.put(url, body=body_json, headers=headers)
             self._log_history(datacite_resource, "PUT", url, request_data=body, response=resp)
             if resp.status_code == HTTP_OK:
-                return resp.json()["data"]["attributes"]
+                return self._cache_record(doi, resp.json()["data"]["attributes"])
             else:
                 raise DataCiteError.factory(resp.status_code, resp.text)
         except Exception as e:
@@ -253,6 +311,7 @@ class DataCiteRESTClient(object):
         """
         request = self._create_request()
         url = "dois/" + doi
+        self._records.pop(doi.lower(), None)
         try:
             resp = request.delete(url)
             self._log_history(datacite_resource, "DELETE", url, response=resp)
@@ -377,25 +436,30 @@ class DataCiteRESTClient(object):
         data["attributes"]["event"] = state
         return self.put_doi(doi, data, datacite_resource)
 
+    def push_metadata(self, datacite_resource, metadata, force=False):
+        """Update the metadata of the DOI of a DataCiteResource, if it changed.
+
+        Compares the fingerprint of the metadata with the one last pushed
+        for this DataCiteResource and skips unchanged metadata.
+
+        :param datacite_resource: DataCiteResource with a DOI.
+        :param metadata: JSON format of the metadata.
+        :param force: Push even if the metadata is unchanged.
+        :return: The updated DOI attributes, or None if skipped.
+        """
+        if not force and not datacite_resource.is_metadata_dirty(metadata):
+            return None
+
+        result = self.update_doi(datacite_resource.doi, metadata=metadata, datacite_resource=datacite_resource)
+        datacite_resource.set_metadata_pushed(metadata)
+        return result
+
     def get_metadata(self, doi, datacite_resource=None):
         """Get the JSON metadata associated to a DOI name.
 
         :param doi: DOI name of the resource.
         """
-        """Put a JSON payload to DataCite for an existing DOI."""
-        headers = {"content-type": "application/vnd.api+json"}
-        request = self._create_request()
-        url = "dois/" + doi
-        try:
-            resp = request.get(url, headers=headers)
-            self._log_history(datacite_resource, "GET", url, response=resp)
-            if resp.status_code == HTTP_OK:
-                return resp.json()["data"]["attributes"]
-            else:
-                raise DataCiteError.factory(resp.status_code, resp.text)
-        except Exception as e:
-            self._log_history(datacite_resource, "GET", url, error=e)
-            raise
+        return self.get_doi_record(doi, datacite_resource)
 
     def get_media(self, doi, datacite_resource=None):
         """Get list of pairs of media type and URLs associated with a DOI.
@@ -416,28 +480,54 @@ class DataCiteRESTClient(object):
             self._log_history(datacite_resource, "GET", url, error=e)
             raise
 
+    def iter_dois(self, fields=("state", "url", "updated"), page_size=1000):
+        """Iterate over all DOIs of the configured repository.
+
+        Pages through the DOI list endpoint with cursor based pagination and
+        only requests the given attributes (sparse fieldsets), see
+        https://support.datacite.org/docs/pagination.
+
+        :param fields: DOI attributes to request.
+        :param page_size: Number of DOIs per page (max. 1000).
+        :return: Generator of (doi, attributes) tuples.
+        """
+        headers = {"accept": "application/vnd.api+json"}
+        request = self._create_request()
+        params = {
+            "client-id": self.username.lower(),
+            "fields[dois]": ",".join(fields),
+            "page[size]": page_size,
+            "page[cursor]": 1,
+        }
+
+        while params:
+            resp = request.get("dois", params=params, headers=headers)
+            if resp.status_code != HTTP_OK:
+                raise DataCiteError.factory(resp.status_code, resp.text)
+
+            payload = resp.json()
+            for item in payload["data"]:
+                yield item["id"], item.get("attributes", {})
+
+            # The next link carries the cursor for the following page
+            next_url = payload.get("links", {}).get("next")
+            if payload["data"] and next_url:
+                params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(next_url).query))
+            else:
+                params = None
+
     def get_datacite_doi_state(self, doi=None, datacite_resource=None):
+        """Return the state of a DOI and whether DataCite knows it.
+
+        Unknown DOIs are unset. Other errors are raised, so an outage is not
+        mistaken for a deleted DOI.
+        """
         UNSET_STATE = "unset"
-        found = False
 
         if not doi:
-            return (UNSET_STATE, found)
+            return (UNSET_STATE, False)
 
-        headers = {"content-type": "application/vnd.api+json"}
-        request = self._create_request()
-        url = "dois/" + doi
         try:
-            resp = request.get(url, headers=headers)
-            self._log_history(datacite_resource, "GET", url, response=resp)
-            if resp.status_code == HTTP_OK:
-                state = resp.json()["data"]["attributes"]["state"]
-                found = True
-            else:
-                state = UNSET_STATE
-                found = False
-        except Exception as e:
-            self._log_history(datacite_resource, "GET", url, error=e)
-            state = UNSET_STATE
-            found = False
-
-        return (state, found)
+            return (self.get_doi_record(doi, datacite_resource)["state"], True)
+        except DataCiteNotFoundError:
+            return (UNSET_STATE, False)
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from rdml.doimanager.models import DataCiteResource, DOITransitionJob
+from rdml.doimanager.transitions import run_transition_jobs
+from rdml.research.models import Resource
+
+
+class Command(BaseCommand):
+    help = (
+        "Drafts, registers or publishes the DOIs of many resources concurrently. Resources whose "
+        "local DOI state does not allow the transition are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "transition_to",
+            choices=[state for state in DataCiteResource.DOIState.values if state != DataCiteResource.DOIState.UNSET],
+            help="Target DOI state.",
+        )
+        parser.add_argument("resources", nargs="*", help="IDs or slugs of the resources.")
+        parser.add_argument("--all", action="store_true", help="Transition all resources allowing it.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.RDML_DOI_TRANSITIONS_WORKERS,
+            help="Number of transitions performed concurrently.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the resources, but do not transition them.")
+
+    def handle(self, *args, **options):
+        if not options["resources"] and not options["all"]:
+            raise CommandError("Pass the resources to transition or --all.")
+
+        resources = Resource.objects.order_by("title_en")
+        if options["resources"]:
+            ids = [value for value in options["resources"] if self.is_uuid(value)]
+            resources = resources.filter(Q(id__in=ids) | Q(slug__in=options["resources"]))
+
+        if options["dry_run"]:
+            for resource in resources:
+                self.stdout.write(f"\t{resource}")
+            self.stdout.write(self.style.SUCCESS(f"Would transition up to {len(resources)} resources."))
+            return
+
+        queued, skipped = DOITransitionJob.enqueue_many(resources, options["transition_to"])
+        # Jobs already run by a worker are left to it
+        jobs = [job for job in queued if job.transition_to == options["transition_to"] and job.claim()]
+        for resource in skipped:
+            self.stdout.write(self.style.WARNING(f"\tSkipped {resource}: DOI state does not allow the transition."))
+
+        started = time.monotonic()
+        self.finished = 0
+        self.total = len(jobs)
+        jobs = run_transition_jobs(jobs, max_workers=options["workers"], progress=self.write_job)
+
+        failed = sum(job.status == DOITransitionJob.Status.FAILED for job in jobs)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Transitioned {len(jobs) - failed} DOIs to '{options['transition_to']}', {failed} failed, "
+                f"{len(skipped)} skipped, {len(queued) - len(jobs)} already in progress in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    def write_job(self, job):
+        self.finished += 1
+        style = self.style.SUCCESS if job.status == DOITransitionJob.Status.SUCCEEDED else self.style.ERROR
+        self.stdout.write(
+            style(f"\t[{self.finished}/{self.total}] {job.datacite_resource}{f': {job.error}' if job.error else ''}")
+        )
+
+    @staticmethod
+    def is_uuid(value):
+        try:
+            uuid.UUID(value)
+        except ValueError:
+            return False
+        return True
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from rdml.doimanager.models import DataCiteAPILog
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacts and deletes old DataCite API log entries. Entries older than the compaction age lose "
+        "the request and response bodies of successful requests, entries older than the retention "
+        "age are deleted. Run it e.g. nightly."
+    )
+
+    batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--compact-days",
+            type=int,
+            default=settings.RDML_DATACITE_API_LOG_COMPACT_DAYS,
+            help="Drop the bodies of successful requests older than this many days.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.RDML_DATACITE_API_LOG_RETENTION_DAYS,
+            help="Delete entries older than this many days.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report counts, but do not change anything.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = DataCiteAPILog.objects.filter(timestamp__lt=now - timedelta(days=options["retention_days"]))
+        # Failed requests keep their bodies for debugging
+        compactable = DataCiteAPILog.objects.filter(
+            timestamp__lt=now - timedelta(days=options["compact_days"]),
+            status__lt=400,
+            error="",
+        ).filter(Q(request_data__isnull=False) | Q(response_body__isnull=False))
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Would delete {expired.count()} and compact {compactable.count()} DataCite API log entries."
+                )
+            )
+            return
+
+        deleted = self.in_batches(expired, lambda batch: batch.delete()[0])
+        compacted = self.in_batches(compactable, lambda batch: batch.update(request_data=None, response_body=None))
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} and compacted {compacted} DataCite API log entries."))
+
+    def in_batches(self, queryset, action):
+        """Apply action to the queryset in batches, keeping transactions short."""
+        total = 0
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[: self.batch_size])
+            if not ids:
+                return total
+            total += action(DataCiteAPILog.objects.filter(id__in=ids))
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.management.base import BaseCommand
+
+from rdml.doimanager.datacite.errors import DataCiteError, HttpError
+from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
+from rdml.doimanager.metadata import iter_rdml_metadata
+from rdml.doimanager.models import DataCiteResource
+from rdml.research.models import Resource
+
+
+class Command(BaseCommand):
+    help = (
+        "Pushes the metadata of all resources with a DOI to DataCite. Only metadata "
+        "changed since the last successful push is sent, see DataCiteResource.metadata_hash."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dois", nargs="*", help="Only push the metadata of the given DOIs.")
+        parser.add_argument("--force", action="store_true", help="Push the metadata even if unchanged.")
+        parser.add_argument("--dry-run", action="store_true", help="Report changed metadata, but do not push it.")
+
+    def handle(self, *args, **options):
+        resources = Resource.objects.filter(dataciteresource__doi__isnull=False).exclude(dataciteresource__doi="")
+        resources = resources.exclude(dataciteresource__datacite_state=DataCiteResource.DOIState.UNSET)
+        if options["dois"]:
+            resources = resources.filter(dataciteresource__doi__in=options["dois"])
+
+        client = DataCiteRESTClient()
+        counts = {"pushed": 0, "unchanged": 0, "invalid": 0, "failed": 0}
+
+        for resource, metadata, error in iter_rdml_metadata(resources.select_related("dataciteresource")):
+            datacite_resource = resource.dataciteresource
+            if error:
+                counts["invalid"] += 1
+                self.stdout.write(self.style.WARNING(f"\t{datacite_resource.doi}: {error}"))
+                continue
+
+            if not options["force"] and not datacite_resource.is_metadata_dirty(metadata):
+                counts["unchanged"] += 1
+                continue
+
+            if options["dry_run"]:
+                counts["pushed"] += 1
+                self.stdout.write(f"\t{datacite_resource.doi}: changed")
+                continue
+
+            try:
+                client.push_metadata(datacite_resource, metadata, force=True)
+            except (DataCiteError, HttpError, ValueError) as e:
+                counts["failed"] += 1
+                self.stdout.write(self.style.ERROR(f"\t{datacite_resource.doi}: {e}"))
+            else:
+                counts["pushed"] += 1
+                self.stdout.write(f"\t{datacite_resource.doi}: pushed")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Would push' if options['dry_run'] else 'Pushed'} {counts['pushed']} DOIs, "
+                f"{counts['unchanged']} unchanged, {counts['invalid']} with invalid metadata, "
+                f"{counts['failed']} failed."
+            )
+        )
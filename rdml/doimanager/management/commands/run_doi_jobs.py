@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
+from rdml.doimanager.models import DOITransitionJob
+from rdml.doimanager.transitions import run_transition_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker performing queued DOI transitions. Run it as a service next to the web "
+        "server. Several workers may run in parallel, each job is claimed by one worker only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--interval", type=float, default=2, help="Seconds to wait for new jobs.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.RDML_DOI_TRANSITIONS_WORKERS,
+            help="Number of jobs performed concurrently.",
+        )
+        parser.add_argument(
+            "--requeue-after",
+            type=int,
+            default=settings.RDML_DOI_TRANSITIONS_TIMEOUT,
+            help="Requeue jobs running for more than this many minutes, e.g. after a worker crash.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = DOITransitionJob.expire_stale(timeout=options["requeue_after"], requeue=True)
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale jobs."))
+
+        processed = 0
+        while True:
+            close_old_connections()
+            if not self.is_datacite_available():
+                # Leave the jobs queued instead of failing them
+                self.stdout.write(self.style.WARNING("DataCite is unavailable, waiting."))
+                if options["once"]:
+                    break
+                time.sleep(max(options["interval"], settings.RDML_DATACITE_BREAKER_OPEN_INTERVAL / 4))
+                continue
+
+            jobs = []
+            while len(jobs) < options["workers"]:
+                job = DOITransitionJob.claim_next()
+                if job is None:
+                    break
+                self.stdout.write(f"\t{job}")
+                jobs.append(job)
+
+            if not jobs:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+
+            run_transition_jobs(jobs, max_workers=options["workers"], progress=self.write_job)
+            processed += len(jobs)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} DOI transition jobs."))
+
+    def write_job(self, job):
+        style = self.style.SUCCESS if job.status == DOITransitionJob.Status.SUCCEEDED else self.style.ERROR
+        self.stdout.write(style(f"\t{job}{f': {job.error}' if job.error else ''}"))
+
+    @staticmethod
+    def is_datacite_available():
+        try:
+            return DataCiteRESTClient().is_available()
+        except ImproperlyConfigured:
+            # Jobs fail with the configuration error
+            return True
@@ -0,0 +1,43 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.management.base import BaseCommand
+
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs a local stand-in for the DataCite REST API, for load tests of DOI workflows without "
+        "network access. DOIs are kept in memory. Point rdml at it with RDML_DATACITE_API_URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--prefix", default="10.12345", help="DOI prefix of drafted DOIs.")
+        parser.add_argument("--latency", type=float, default=0, help="Seconds each response is delayed.")
+        parser.add_argument("--error-rate", type=float, default=0, help="Share of requests answered with 503.")
+        parser.add_argument("--throttle-rate", type=float, default=0, help="Share of requests answered with 429.")
+        parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds of 429 responses.")
+        parser.add_argument("--seed", type=int, help="Seed for injected errors.")
+
+    def handle(self, *args, **options):
+        fake = FakeDataCite(
+            prefix=options["prefix"],
+            latency=options["latency"],
+            error_rate=options["error_rate"],
+            throttle_rate=options["throttle_rate"],
+            retry_after=options["retry_after"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fake DataCite API listening, set RDML_DATACITE_API_URL=http://{options['host']}:{options['port']}/"
+            )
+        )
+        try:
+            fake.serve_forever(options["host"], options["port"])
+        except KeyboardInterrupt:
+            fake.stop()
@@ -0,0 +1,137 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.management.base import BaseCommand
+
+from rdml.doimanager.datacite.errors import DataCiteError, HttpError
+from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
+from rdml.doimanager.metadata import get_landing_page_url
+from rdml.doimanager.models import DataCiteResource
+from rdml.doiresolver import cache as page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Fetches the current state of DOIs from DataCite and stores it locally. "
+        "Landing pages and the admin only read the stored state, so run this "
+        "regularly, e.g. via cron. Without arguments, all DOIs of the repository "
+        "are reconciled in one pass over the paginated DataCite DOI listing."
+    )
+
+    batch_size = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument("dois", nargs="*", help="Only sync the given DOIs, one request per DOI.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift, but do not save anything.")
+        parser.add_argument(
+            "--reset-missing",
+            action="store_true",
+            help="Reset local DOIs not found at DataCite to unset, instead of only reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        datacite_resources = DataCiteResource.objects.exclude(doi__isnull=True).exclude(doi="")
+        client = DataCiteRESTClient()
+
+        if options["dois"]:
+            self.sync_single(client, datacite_resources.filter(doi__in=options["dois"]), options["dry_run"])
+        else:
+            self.sync_all(client, datacite_resources, options["dry_run"], options["reset_missing"])
+
+    def sync_single(self, client, datacite_resources, dry_run):
+        changed = 0
+        for datacite_resource in datacite_resources:
+            previous_state = datacite_resource.datacite_state
+            if dry_run:
+                try:
+                    state, _found = client.get_datacite_doi_state(doi=datacite_resource.doi)
+                except (DataCiteError, HttpError) as e:
+                    self.stdout.write(self.style.ERROR(f"\t{datacite_resource.doi}: {e}"))
+                    continue
+            else:
+                state = datacite_resource.sync_datacite_state(client=client)
+            if state != previous_state:
+                changed += 1
+                self.stdout.write(f"\t{datacite_resource.doi}: {previous_state} → {state}")
+
+        self.stdout.write(self.style.SUCCESS(f"Synced DOI states, {changed} changed."))
+
+    def sync_all(self, client, datacite_resources, dry_run, reset_missing=False):
+        # DOIs are case-insensitive, DataCite returns them in lower case
+        local = {
+            datacite_resource.doi.lower(): datacite_resource
+            for datacite_resource in datacite_resources.only(
+                "id", "doi", "resource_id", *DataCiteResource.DATACITE_STATE_FIELDS
+            )
+        }
+        seen = set()
+        pending = []
+        drift = {"state": 0, "url": 0, "unknown": 0, "missing": 0}
+
+        for doi, attributes in client.iter_dois(fields=("state", "url", "updated")):
+            datacite_resource = local.get(doi.lower())
+            if datacite_resource is None:
+                drift["unknown"] += 1
+                self.stdout.write(self.style.WARNING(f"\t{doi}: registered at DataCite, but unknown locally"))
+                continue
+
+            seen.add(doi.lower())
+            previous_state = datacite_resource.datacite_state
+            changed = datacite_resource.apply_datacite_state(attributes.get("state"), attributes)
+
+            if previous_state != datacite_resource.datacite_state:
+                drift["state"] += 1
+                self.stdout.write(f"\t{doi}: {previous_state} → {datacite_resource.datacite_state}")
+
+            expected_url = get_landing_page_url(datacite_resource.resource_id) if datacite_resource.resource_id else ""
+            if (
+                datacite_resource.datacite_state != DataCiteResource.DOIState.DRAFT
+                and attributes.get("url") != expected_url
+            ):
+                drift["url"] += 1
+                self.stdout.write(
+                    self.style.WARNING(f"\t{doi}: resolves to {attributes.get('url')}, expected {expected_url}")
+                )
+
+            pending.append((datacite_resource, changed))
+            if len(pending) >= self.batch_size:
+                self.save(pending, dry_run)
+                pending = []
+
+        for doi, datacite_resource in local.items():
+            if doi not in seen:
+                drift["missing"] += 1
+                self.stdout.write(self.style.WARNING(f"\t{datacite_resource.doi}: not found at DataCite"))
+                # Missing from the listing, e.g. after a change of the
+                # repository account, is no proof that the DOI is gone
+                if reset_missing:
+                    changed = datacite_resource.apply_datacite_state(DataCiteResource.DOIState.UNSET)
+                    pending.append((datacite_resource, changed))
+
+        self.save(pending, dry_run)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {len(local)} local DOIs: {drift['state']} state changes, "
+                f"{drift['url']} URL mismatches, {drift['missing']} missing at DataCite, "
+                f"{drift['unknown']} unknown locally."
+            )
+        )
+
+    def save(self, pending, dry_run):
+        if dry_run or not pending:
+            return
+
+        changed = [datacite_resource for datacite_resource, has_changed in pending if has_changed]
+        unchanged = [datacite_resource for datacite_resource, has_changed in pending if not has_changed]
+
+        # bulk_update() does not touch auto_now fields, so set `updated` explicitly
+        # to let changed DOIs invalidate anything derived from them.
+        for datacite_resource in changed:
+            datacite_resource.updated = datacite_resource.datacite_state_synced
+
+        DataCiteResource.objects.bulk_update(changed, DataCiteResource.DATACITE_STATE_FIELDS + ["updated"])
+        # bulk_update() does not send post_save signals
+        page_cache.invalidate_resources([datacite_resource.resource_id for datacite_resource in changed])
+        DataCiteResource.objects.bulk_update(unchanged, ["datacite_state_synced"])
@@ -3,18 +3,18 @@
 # SPDX-License-Identifier: EUPL-1.2
 
 import json
+from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
+from django.db.models import QuerySet
 from django.urls import reverse
 from django.contrib.sites.models import Site
 
 from rdml.research.models import Resource
 
 
-def get_creators(resource_id):
+def get_creators(resource):
     creators = []
     # TODO: merge with get_contributors
 
-    resource = Resource.objects.get(id=resource_id)
-
     for creator in resource.creatorperson_set.all():
         creator_dict = {
             "name": creator.person.get_full_name,
@@ -86,9 +86,40 @@ def get_creators(resource_id):
 #     return contributors
 
 
-def get_rdml_metadata(resource_id, as_json=True):
-    resource = Resource.objects.get(id=resource_id)
+def get_landing_page_url(resource_id):
+    """The URL a DOI for the given resource should resolve to."""
+    current_site = Site.objects.get_current()
+    return f"https://{current_site.domain}{reverse('doiresolver:landing-page', args=[resource_id])}"
 
+
+def get_rdml_metadata(resource_id, as_json=True):
+    resource = Resource.objects.for_datacite_metadata().get(id=resource_id)
+    return build_rdml_metadata(resource, as_json=as_json)
+
+
+def iter_rdml_metadata(resources, as_json=False, chunk_size=500):
+    """
+    Build the metadata for many resources, given as a queryset or a list of
+    ids. Yields `(resource, metadata, error)` per resource, with either
+    metadata or the error (e.g. missing required attributes) set. Related
+    objects are prefetched per chunk, so the number of queries does not
+    depend on the number of resources or creators.
+    """
+    if not isinstance(resources, QuerySet):
+        resources = Resource.objects.filter(id__in=list(resources))
+
+    for resource in resources.for_datacite_metadata().iterator(chunk_size=chunk_size):
+        try:
+            yield resource, build_rdml_metadata(resource, as_json=as_json), None
+        except (ValueError, AttributeError, ObjectDoesNotExist, MultipleObjectsReturned) as e:
+            yield resource, None, e
+
+
+def build_rdml_metadata(resource, as_json=True):
+    """
+    Build the DataCite metadata for a resource fetched via
+    `Resource.objects.for_datacite_metadata()`.
+    """
     errors = []
 
     try:
@@ -101,7 +132,7 @@ def get_rdml_metadata(resource_id, as_json=True):
             missing_required_fields.append("Datacite ResourceTypeGeneral")
 
         # Check for creators
-        creators_list = get_creators(resource_id)
+        creators_list = get_creators(resource)
         if not creators_list:
             missing_required_fields.append("Creators")
 
@@ -118,15 +149,14 @@ def get_rdml_metadata(resource_id, as_json=True):
             raise ValueError(f"Missing required metadata attributes: {', '.join(missing_required_fields)}.")
 
         # Construct metadata
-        current_site = Site.objects.get_current()
-        redirect_url = f"https://{current_site.domain}{reverse('doiresolver:landing-page', args=[resource.pk])}"
+        redirect_url = get_landing_page_url(resource.pk)
 
         if hasattr(resource, "doi"):
             prefix = resource.doi.split("/")[0]
         else:
             from .models import DataCiteConfiguration
 
-            datacite_configuration = DataCiteConfiguration.objects.get(is_active=True)
+            datacite_configuration = DataCiteConfiguration.get_active()
             prefix = datacite_configuration.doi_prefix
 
         metadata = {
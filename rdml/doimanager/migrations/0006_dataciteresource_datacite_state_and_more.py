@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0005_alter_dataciteconfiguration_is_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='datacite_state',
+            field=models.CharField(choices=[('unset', 'Unset'), ('draft', 'Draft'), ('registered', 'Registered'), ('findable', 'Findable')], default='unset', help_text='Last known DOI state at DataCite.', max_length=20, verbose_name='DOI state'),
+        ),
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='datacite_state_synced',
+            field=models.DateTimeField(blank=True, help_text='Date the DOI state was last fetched from DataCite.', null=True, verbose_name='DOI state synced'),
+        ),
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='datacite_updated',
+            field=models.DateTimeField(blank=True, help_text='Last modification of this DOI record as reported by DataCite.', null=True, verbose_name='Updated at DataCite'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0006_dataciteresource_datacite_state_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='datacite_url',
+            field=models.URLField(blank=True, help_text='URL this DOI resolves to as reported by DataCite.', max_length=500, verbose_name='URL at DataCite'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0007_dataciteresource_datacite_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='metadata_hash',
+            field=models.CharField(blank=True, editable=False, help_text='SHA-256 of the metadata last pushed to DataCite.', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='dataciteresource',
+            name='metadata_pushed',
+            field=models.DateTimeField(blank=True, help_text='Date the metadata was last pushed to DataCite.', null=True, verbose_name='Metadata pushed'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:52
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0008_dataciteresource_metadata_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DOITransitionJob',
+            fields=[
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('transition_to', models.CharField(choices=[('unset', 'Unset'), ('draft', 'Draft'), ('registered', 'Registered'), ('findable', 'Findable')], max_length=20)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+                ('result', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('datacite_resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transition_jobs', to='doimanager.dataciteresource')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'DOI transition job',
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['status', 'created'], name='doimanager__status_ebc28d_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('datacite_resource',), name='doimanager_doitransitionjob_one_active_job_per_resource')],
+            },
+        ),
+    ]
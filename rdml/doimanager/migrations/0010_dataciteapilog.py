@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0009_doitransitionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataCiteAPILog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('method', models.CharField(max_length=10)),
+                ('url', models.CharField(max_length=255)),
+                ('status', models.PositiveSmallIntegerField(blank=True, help_text='HTTP status of the response.', null=True)),
+                ('request_data', models.JSONField(blank=True, null=True)),
+                ('response_body', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('datacite_resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_logs', to='doimanager.dataciteresource')),
+            ],
+            options={
+                'verbose_name': 'DataCite API log',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['datacite_resource', '-timestamp'], name='doimanager__datacit_c6adf9_idx'), models.Index(fields=['-timestamp'], name='doimanager__timesta_cacedc_idx'), models.Index(fields=['method'], name='doimanager__method_c3f262_idx'), models.Index(fields=['status'], name='doimanager__status_8e313d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:59
+
+import datetime
+
+from django.db import migrations
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+def move_history_to_api_log(apps, schema_editor):
+    DataCiteResource = apps.get_model("doimanager", "DataCiteResource")
+    DataCiteAPILog = apps.get_model("doimanager", "DataCiteAPILog")
+
+    entries = []
+    datacite_resources = DataCiteResource.objects.exclude(datacite_history=[]).only("id", "updated", "datacite_history")
+    for datacite_resource in datacite_resources.iterator(chunk_size=100):
+        for item in datacite_resource.datacite_history or []:
+            timestamp = parse_datetime(item.get("timestamp") or "")
+            if timestamp is not None and timezone.is_naive(timestamp):
+                timestamp = timezone.make_aware(timestamp, datetime.timezone.utc)
+            entries.append(
+                DataCiteAPILog(
+                    datacite_resource=datacite_resource,
+                    timestamp=timestamp or datacite_resource.updated,
+                    method=item.get("method", "")[:10],
+                    url=item.get("url", "")[:255],
+                    status=item.get("response_status"),
+                    request_data=item.get("request_data"),
+                    response_body=item.get("response_body"),
+                    error=item.get("error", ""),
+                )
+            )
+        if len(entries) >= 1000:
+            DataCiteAPILog.objects.bulk_create(entries)
+            entries = []
+    DataCiteAPILog.objects.bulk_create(entries)
+
+
+def move_api_log_to_history(apps, schema_editor):
+    DataCiteResource = apps.get_model("doimanager", "DataCiteResource")
+    DataCiteAPILog = apps.get_model("doimanager", "DataCiteAPILog")
+
+    histories = {}
+    for log in DataCiteAPILog.objects.exclude(datacite_resource=None).order_by("timestamp", "id").iterator():
+        entry = {"timestamp": log.timestamp.isoformat(), "method": log.method, "url": log.url}
+        if log.request_data is not None:
+            entry["request_data"] = log.request_data
+        if log.status is not None:
+            entry["response_status"] = log.status
+        if log.response_body is not None:
+            entry["response_body"] = log.response_body
+        if log.error:
+            entry["error"] = log.error
+        histories.setdefault(log.datacite_resource_id, []).append(entry)
+
+    for datacite_resource_id, history in histories.items():
+        DataCiteResource.objects.filter(id=datacite_resource_id).update(datacite_history=history)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0010_dataciteapilog'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_history_to_api_log, move_api_log_to_history),
+    ]
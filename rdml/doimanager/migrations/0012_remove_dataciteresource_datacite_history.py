@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doimanager', '0011_move_datacite_history_to_api_log'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dataciteresource',
+            name='datacite_history',
+        ),
+    ]
@@ -2,17 +2,25 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import hashlib
+import json
 import urllib.parse
+from datetime import timedelta
 from typing import NamedTuple
 
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from auditlog.registry import auditlog
 from auditlog.models import AuditlogHistoryField
 
+from ..core.cache import VersionedCache
 from ..core.models import UUIDBaseModel, TimeStampedBaseModel
 from .datacite.rest_client import DataCiteRESTClient
+from .datacite.errors import DataCiteError, DataCiteNotFoundError, HttpError
 
 
 DataCiteResourceTypeGeneral = models.TextChoices(
@@ -112,6 +120,13 @@ DataCiteContributorType = models.TextChoices(
 
 
 class DataCiteResource(TimeStampedBaseModel, UUIDBaseModel):
+    # https://support.datacite.org/docs/doi-states
+    class DOIState(models.TextChoices):
+        UNSET = "unset", "Unset"
+        DRAFT = "draft", "Draft"
+        REGISTERED = "registered", "Registered"
+        FINDABLE = "findable", "Findable"
+
     DOI_TRANSITIONS = {
         "unset": ["draft"],
         "draft": ["registered", "findable"],
@@ -119,6 +134,7 @@ class DataCiteResource(TimeStampedBaseModel, UUIDBaseModel):
         # "findable": ["registered"],  # We will not support this transition
         "findable": [],
     }
+    DATACITE_STATE_FIELDS = ["datacite_state", "datacite_state_synced", "datacite_updated", "datacite_url"]
 
     resource = models.OneToOneField(
         "research.Resource",
@@ -138,19 +154,55 @@ class DataCiteResource(TimeStampedBaseModel, UUIDBaseModel):
     citation_snippet = models.TextField(
         blank=True,
     )
-    datacite_history = models.JSONField(
+    # Local copy of the DOI state at DataCite. Public pages and the admin
+    # read these fields only, they are refreshed by DOI transitions and
+    # the `sync_doi_states` management command.
+    datacite_state = models.CharField(
+        max_length=20,
+        choices=DOIState.choices,
+        default=DOIState.UNSET,
+        verbose_name="DOI state",
+        help_text="Last known DOI state at DataCite.",
+    )
+    datacite_state_synced = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="DOI state synced",
+        help_text="Date the DOI state was last fetched from DataCite.",
+    )
+    datacite_updated = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Updated at DataCite",
+        help_text="Last modification of this DOI record as reported by DataCite.",
+    )
+    datacite_url = models.URLField(
+        max_length=500,
+        blank=True,
+        verbose_name="URL at DataCite",
+        help_text="URL this DOI resolves to as reported by DataCite.",
+    )
+
+    # Fingerprint of the metadata last pushed to DataCite, to skip pushing
+    # unchanged metadata again
+    metadata_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 of the metadata last pushed to DataCite.",
+    )
+    metadata_pushed = models.DateTimeField(
         blank=True,
-        default=list,
-        help_text="Collects API responses from DataCite.",
+        null=True,
+        verbose_name="Metadata pushed",
+        help_text="Date the metadata was last pushed to DataCite.",
     )
 
     @property
     def get_datacite_doi_url(self):
         # print(f"get_doi_admin_url for {self.doi}")
         if self.doi:
-            from .models import DataCiteConfiguration
-
-            datacite_configuration = DataCiteConfiguration.objects.get(is_active=True)
+            datacite_configuration = DataCiteConfiguration.get_active()
             backend_url = datacite_configuration.get_datacite_env().backend_url
             return f"{backend_url}{urllib.parse.quote_plus(self.doi)}"
 
@@ -164,13 +216,76 @@ class DataCiteResource(TimeStampedBaseModel, UUIDBaseModel):
         if self.doi:
             return DataCiteRESTClient().get_metadata(self.doi, datacite_resource=self)
 
-    @property
-    def get_datacite_doi_state(self):
-        if self.doi:
-            datacite_doi_state, datacite_found = DataCiteRESTClient().get_datacite_doi_state(
-                doi=self.doi, datacite_resource=self
-            )
-            return datacite_doi_state
+    def set_datacite_state(self, state, attributes=None):
+        """
+        Persist the DOI state and, if given, the `updated` timestamp and URL
+        from the DataCite DOI attributes.
+        """
+        if self.apply_datacite_state(state, attributes):
+            update_fields = self.DATACITE_STATE_FIELDS + ["updated"]
+        else:
+            update_fields = ["datacite_state_synced"]
+        self.save(update_fields=update_fields)
+
+    def apply_datacite_state(self, state, attributes=None):
+        """
+        Set the DOI state fields from DataCite without saving. Returns True if
+        anything but the sync timestamp changed.
+        """
+        attributes = attributes or {}
+        datacite_updated = parse_datetime(attributes["updated"]) if attributes.get("updated") else None
+        datacite_url = attributes.get("url") or ""
+        changed = bool(
+            state != self.datacite_state
+            or (datacite_updated and datacite_updated != self.datacite_updated)
+            or ("url" in attributes and datacite_url != self.datacite_url)
+        )
+
+        self.datacite_state = state
+        self.datacite_state_synced = timezone.now()
+        if datacite_updated:
+            self.datacite_updated = datacite_updated
+        if "url" in attributes:
+            self.datacite_url = datacite_url
+        return changed
+
+    @staticmethod
+    def get_metadata_hash(metadata):
+        """SHA-256 of the canonical JSON serialization of the given metadata."""
+        canonical = json.dumps(metadata, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def is_metadata_dirty(self, metadata):
+        """Whether the given metadata differs from the metadata last pushed to DataCite."""
+        return self.get_metadata_hash(metadata) != self.metadata_hash
+
+    def set_metadata_pushed(self, metadata, save=True):
+        """Record the given metadata as successfully pushed to DataCite."""
+        self.metadata_hash = self.get_metadata_hash(metadata)
+        self.metadata_pushed = timezone.now()
+        if save:
+            self.save(update_fields=["metadata_hash", "metadata_pushed"])
+
+    def sync_datacite_state(self, client=None):
+        """
+        Fetch the DOI state from DataCite and persist it locally. If DataCite
+        is not reachable, the last known state is kept and returned.
+        """
+        if not self.doi:
+            return self.datacite_state
+
+        client = client or DataCiteRESTClient()
+        try:
+            attributes = client.get_metadata(self.doi, datacite_resource=self)
+        except DataCiteNotFoundError:
+            # E.g. a draft DOI deleted via DataCite Fabrica
+            self.set_datacite_state(self.DOIState.UNSET)
+        except (DataCiteError, HttpError) as e:
+            print(f"sync_datacite_state for {self.doi} failed: {e}")
+        else:
+            self.set_datacite_state(attributes["state"], attributes)
+
+        return self.datacite_state
 
     def draft_doi_with_logging(self, metadata=None, doi=None):
         """Call draft_doi and ensure API communication is logged to this instance."""
@@ -192,6 +307,236 @@ class DataCiteResource(TimeStampedBaseModel, UUIDBaseModel):
         ]
 
 
+class DataCiteAPILog(models.Model):
+    """
+    A request to the DataCite API changing a DOI and its response. Requests
+    reading data (GET) are not logged. Old entries are compacted and deleted
+    by the `prune_datacite_api_log` management command.
+    """
+
+    datacite_resource = models.ForeignKey(
+        DataCiteResource,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="api_logs",
+    )
+    timestamp = models.DateTimeField(default=timezone.now)
+    method = models.CharField(max_length=10)
+    url = models.CharField(max_length=255)
+    status = models.PositiveSmallIntegerField(blank=True, null=True, help_text="HTTP status of the response.")
+    request_data = models.JSONField(blank=True, null=True)
+    response_body = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.method} {self.url} ({self.status or self.error or 'n/a'})"
+
+    class Meta:
+        verbose_name = "DataCite API log"
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["datacite_resource", "-timestamp"]),
+            models.Index(fields=["-timestamp"]),
+            models.Index(fields=["method"]),
+            models.Index(fields=["status"]),
+        ]
+
+
+class DOITransitionJob(TimeStampedBaseModel, UUIDBaseModel):
+    """
+    A DOI transition queued by the DOI manager and run outside of the request
+    by the `run_doi_jobs` management command.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    ACTIVE_STATUSES = [Status.QUEUED, Status.RUNNING]
+
+    datacite_resource = models.ForeignKey(
+        DataCiteResource,
+        on_delete=models.CASCADE,
+        related_name="transition_jobs",
+    )
+    transition_to = models.CharField(
+        max_length=20,
+        choices=DataCiteResource.DOIState.choices,
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+    )
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    @classmethod
+    def enqueue(cls, datacite_resource, transition_to, requested_by=None):
+        """
+        Queue a transition, unless one is already queued or running for this
+        DataCiteResource. Returns the new or the already active job.
+
+        A unique constraint allows one active job per DataCiteResource, so of
+        concurrent requests only one creates a job.
+        """
+        cls.expire_stale(datacite_resource)
+        active_jobs = cls.objects.filter(datacite_resource=datacite_resource, status__in=cls.ACTIVE_STATUSES)
+        active_job = active_jobs.first()
+        if active_job:
+            return active_job
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    datacite_resource=datacite_resource,
+                    transition_to=transition_to,
+                    requested_by=requested_by,
+                )
+        except IntegrityError:
+            # Queued by a concurrent request in the meantime
+            return active_jobs.first() or cls.enqueue(datacite_resource, transition_to, requested_by=requested_by)
+
+    @classmethod
+    def enqueue_many(cls, resources, transition_to, requested_by=None):
+        """
+        Queue a transition for each of the given resources whose local DOI
+        state allows it. Creates missing DataCiteResources. Returns the queued
+        jobs, including jobs which were already active, and the skipped
+        resources.
+        """
+        from_states = [state for state, targets in DataCiteResource.DOI_TRANSITIONS.items() if transition_to in targets]
+        jobs, skipped = [], []
+        for resource in resources:
+            try:
+                datacite_resource = resource.dataciteresource
+            except DataCiteResource.DoesNotExist:
+                datacite_resource = DataCiteResource.objects.create(resource=resource)
+            if datacite_resource.datacite_state in from_states:
+                jobs.append(cls.enqueue(datacite_resource, transition_to, requested_by=requested_by))
+            else:
+                skipped.append(resource)
+        return jobs, skipped
+
+    @classmethod
+    def expire_stale(cls, datacite_resource=None, timeout=None, requeue=None):
+        """
+        Recover jobs running for more than `timeout` minutes (default
+        RDML_DOI_TRANSITIONS_TIMEOUT), e.g. after the process performing them
+        was killed. They are queued again for the worker if `requeue` (default
+        RDML_DOI_TRANSITIONS_ASYNC), otherwise they fail. Returns the number of
+        recovered jobs.
+        """
+        if timeout is None:
+            timeout = settings.RDML_DOI_TRANSITIONS_TIMEOUT
+        if requeue is None:
+            requeue = settings.RDML_DOI_TRANSITIONS_ASYNC
+
+        now = timezone.now()
+        stale_jobs = cls.objects.filter(status=cls.Status.RUNNING, started__lt=now - timedelta(minutes=timeout))
+        if datacite_resource is not None:
+            stale_jobs = stale_jobs.filter(datacite_resource=datacite_resource)
+
+        if requeue:
+            return stale_jobs.update(status=cls.Status.QUEUED, started=None, updated=now)
+        return stale_jobs.update(
+            status=cls.Status.FAILED,
+            error="The transition did not finish in time, it may have been interrupted.",
+            finished=now,
+            updated=now,
+        )
+
+    @classmethod
+    def claim_next(cls):
+        """
+        Claim the oldest queued job for this worker. The conditional update
+        ensures a job is claimed by one worker only. Returns None if no job
+        is queued.
+        """
+        while True:
+            job = (
+                cls.objects.filter(status=cls.Status.QUEUED)
+                .select_related("datacite_resource")
+                .order_by("created")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.claim():
+                return job
+
+    def claim(self):
+        """
+        Mark this job as running, if it is still queued. Returns True if this
+        call claimed the job.
+        """
+        started = timezone.now()
+        claimed = DOITransitionJob.objects.filter(pk=self.pk, status=self.Status.QUEUED).update(
+            status=self.Status.RUNNING, started=started, updated=started
+        )
+        if claimed:
+            self.status = self.Status.RUNNING
+            self.started = started
+        return bool(claimed)
+
+    def run(self, client=None, metadata=None):
+        """
+        Perform the transition and record its outcome.
+        """
+        from .transitions import perform_doi_transition
+
+        try:
+            result = perform_doi_transition(
+                self.datacite_resource, self.transition_to, client=client, metadata=metadata
+            )
+        except Exception as e:
+            self.fail(e)
+        else:
+            self.status = self.Status.SUCCEEDED
+            self.result = "" if result is None else str(result)
+            self.finished = timezone.now()
+            self.save(update_fields=["status", "result", "error", "finished", "updated"])
+
+    def fail(self, error):
+        print(f"DOI transition job {self.pk} failed: {error}")
+        self.status = self.Status.FAILED
+        self.error = str(error) or error.__class__.__name__
+        self.finished = timezone.now()
+        self.save(update_fields=["status", "result", "error", "finished", "updated"])
+
+    def __str__(self):
+        return f"{self.datacite_resource} → {self.transition_to} ({self.status})"
+
+    class Meta:
+        verbose_name = "DOI transition job"
+        ordering = ["-created"]
+        indexes = [
+            models.Index(fields=["status", "created"]),
+        ]
+        constraints = [
+            # At most one job in ACTIVE_STATUSES per DataCiteResource
+            models.UniqueConstraint(
+                fields=["datacite_resource"],
+                condition=Q(status__in=["queued", "running"]),
+                name="%(app_label)s_%(class)s_one_active_job_per_resource",
+            )
+        ]
+
+
 class DataCiteConfiguration(TimeStampedBaseModel, UUIDBaseModel):
     history = AuditlogHistoryField()
 
@@ -242,8 +587,28 @@ class DataCiteConfiguration(TimeStampedBaseModel, UUIDBaseModel):
             api_url = "https://api.datacite.org/"
             doi_base_url = "https://doi.org/"
 
+        if settings.RDML_DATACITE_API_URL:
+            # E.g. the local stand-in server, see `run_fake_datacite`
+            api_url = settings.RDML_DATACITE_API_URL
+            doi_base_url = f"{api_url}resolve/"
+
         return DataCiteEnvironment(backend_url, api_url, doi_base_url)
 
+    @classmethod
+    def get_active(cls):
+        """
+        Return the active configuration. The result is cached per process and
+        invalidated whenever a configuration is saved or deleted, see signals.py.
+        Raises DoesNotExist or MultipleObjectsReturned like
+        `objects.get(is_active=True)`. Do not modify the returned instance.
+        """
+        configurations = _active_configuration.get()
+        if not configurations:
+            raise cls.DoesNotExist("No active DataCiteConfiguration found.")
+        if len(configurations) > 1:
+            raise cls.MultipleObjectsReturned("Multiple active DataCiteConfiguration instances found.")
+        return configurations[0]
+
     def save(self, *args, **kwargs):
         """
         Ensure only one instance is active.
@@ -260,4 +625,9 @@ class DataCiteConfiguration(TimeStampedBaseModel, UUIDBaseModel):
         verbose_name_plural = "DataCite Configurations"
 
 
+_active_configuration = VersionedCache(
+    "doimanager:datacite_configuration",
+    lambda: list(DataCiteConfiguration.objects.filter(is_active=True)[:2]),
+)
+
 auditlog.register(DataCiteConfiguration)
@@ -0,0 +1,14 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DataCiteConfiguration, _active_configuration
+
+
+@receiver(post_save, sender=DataCiteConfiguration)
+@receiver(post_delete, sender=DataCiteConfiguration)
+def invalidate_active_configuration(sender, **kwargs):
+    _active_configuration.invalidate()
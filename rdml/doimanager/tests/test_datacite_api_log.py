@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from datetime import timedelta
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from rdml.doimanager.models import DataCiteAPILog, DataCiteResource
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def datacite_resource(db):
+    return DataCiteResource.objects.create(resource=Resource.objects.create(), doi="10.12345/survey")
+
+
+def create_log(datacite_resource, days, status=200, error=""):
+    return DataCiteAPILog.objects.create(
+        datacite_resource=datacite_resource,
+        timestamp=timezone.now() - timedelta(days=days),
+        method="PUT",
+        url="https://api.test.datacite.org/dois/10.12345/survey",
+        status=status,
+        request_data={"data": {}},
+        response_body={"data": {}},
+        error=error,
+    )
+
+
+def test_prune_compacts_and_deletes_old_entries(datacite_resource, settings):
+    settings.RDML_DATACITE_API_LOG_COMPACT_DAYS = 90
+    settings.RDML_DATACITE_API_LOG_RETENTION_DAYS = 730
+    recent = create_log(datacite_resource, days=1)
+    old = create_log(datacite_resource, days=100)
+    old_failed = create_log(datacite_resource, days=100, status=422, error="Invalid metadata")
+    expired = create_log(datacite_resource, days=800)
+
+    call_command("prune_datacite_api_log", "--dry-run")
+    assert DataCiteAPILog.objects.filter(request_data__isnull=False).count() == 4
+
+    call_command("prune_datacite_api_log")
+
+    assert not DataCiteAPILog.objects.filter(pk=expired.pk).exists()
+    recent.refresh_from_db()
+    old.refresh_from_db()
+    old_failed.refresh_from_db()
+    assert recent.request_data == {"data": {}}
+    assert old.request_data is None
+    assert old.response_body is None
+    # Failed requests keep their bodies for debugging
+    assert old_failed.request_data == {"data": {}}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_history_migration_is_reversible():
+    history = [
+        {
+            "timestamp": "2024-01-01T10:00:00+00:00",
+            "method": "PUT",
+            "url": "https://api.test.datacite.org/dois/10.12345/survey",
+            "request_data": {"data": {"attributes": {"event": "publish"}}},
+            "response_status": 200,
+        },
+        {"timestamp": "2024-01-02T10:00:00+00:00", "method": "POST", "url": "dois", "error": "Timeout"},
+    ]
+    before, after = [("doimanager", "0010_dataciteapilog")], [("doimanager", "0011_move_datacite_history_to_api_log")]
+
+    executor = MigrationExecutor(connection)
+    latest = executor.loader.graph.leaf_nodes()
+    try:
+        executor.migrate(before)
+        apps = executor.loader.project_state(before).apps
+        resource = apps.get_model("research", "Resource").objects.create()
+        apps.get_model("doimanager", "DataCiteResource").objects.create(
+            resource_id=resource.pk, doi="10.12345/survey", datacite_history=history
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(after)
+        apps = executor.loader.project_state(after).apps
+        logs = apps.get_model("doimanager", "DataCiteAPILog").objects.order_by("timestamp")
+        assert [(log.method, log.status, log.error) for log in logs] == [("PUT", 200, ""), ("POST", None, "Timeout")]
+        assert logs[0].request_data == history[0]["request_data"]
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(before)
+        apps = executor.loader.project_state(before).apps
+        datacite_resource = apps.get_model("doimanager", "DataCiteResource").objects.get()
+        assert datacite_resource.datacite_history == history
+    finally:
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(latest)
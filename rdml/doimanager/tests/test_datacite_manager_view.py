@@ -2,7 +2,12 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import json
+import threading
+import time
+
 import pytest
+import requests
 
 from django.contrib.auth.models import Permission
 from django.urls import reverse
@@ -10,6 +15,8 @@ from django.http import HttpResponseForbidden
 
 from rdml.research.models import Resource
 from rdml.doimanager.models import DataCiteResource, DataCiteConfiguration
+from rdml.doimanager.datacite.errors import DataCiteNotFoundError, HttpError
+from rdml.doimanager.datacite.request import get_session
 from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
 
 
@@ -75,3 +82,156 @@ def test_datacite_manager_draft_transition(
     url = reverse("doimanager:datacite_manager", args=[resource.id])
     response = client.get(url, {"transition_to": "draft"})
     assert response.status_code == 200
+
+
+@pytest.fixture
+def datacite_api(monkeypatch):
+    """Answer HTTP requests like DataCite does for a registered DOI, and record them."""
+    calls = []
+    doi_state = {"state": "registered"}
+
+    def session_request(method, url, **kwargs):
+        calls.append((method, url))
+        response = requests.Response()
+        response.status_code = 200
+        if "datacite.org/dois/" in url:
+            if method == "PUT":
+                doi_state["state"] = "findable"
+            attributes = {**doi_state, "url": "https://example.org/", "updated": "2024-01-01T00:00:00Z"}
+            response._content = json.dumps({"data": {"id": "10.12345/67890", "attributes": attributes}}).encode()
+        else:
+            response._content = b"Citation"
+        return response
+
+    monkeypatch.setattr(get_session(), "request", session_request)
+    return calls
+
+
+def count_datacite_api_gets(calls):
+    return len([url for method, url in calls if method == "GET" and "api.test.datacite.org" in url])
+
+
+@pytest.mark.django_db
+def test_datacite_manager_fetches_doi_record_once(
+    client, resource, datacite_configuration, user_with_permission, datacite_api
+):
+    DataCiteResource.objects.create(resource=resource, doi="10.12345/67890", datacite_state="registered")
+    client.force_login(user_with_permission)
+
+    response = client.get(reverse("doimanager:datacite_manager", args=[resource.id]))
+
+    assert response.status_code == 200
+    assert count_datacite_api_gets(datacite_api) == 1
+
+
+def test_failed_doi_record_fetch_is_not_cached(datacite_configuration, datacite_api, monkeypatch):
+    session_request = get_session().request
+    failures = iter([DataCiteNotFoundError("Not found")])
+
+    def failing_session_request(method, url, **kwargs):
+        error = next(failures, None)
+        if error:
+            raise error
+        return session_request(method, url, **kwargs)
+
+    monkeypatch.setattr(get_session(), "request", failing_session_request)
+    datacite_client = DataCiteRESTClient()
+
+    with pytest.raises(DataCiteNotFoundError):
+        datacite_client.get_doi_record("10.12345/67890")
+    assert datacite_client.get_doi_record("10.12345/67890")["state"] == "registered"
+    assert datacite_client.get_doi_record("10.12345/67890")["state"] == "registered"
+    assert count_datacite_api_gets(datacite_api) == 1
+
+
+def test_doi_state_is_unset_only_for_unknown_dois(datacite_configuration, monkeypatch):
+    datacite_client = DataCiteRESTClient()
+    errors = [DataCiteNotFoundError("Not found"), HttpError("Connection refused")]
+
+    def get_doi_record(doi, datacite_resource=None):
+        raise errors.pop(0)
+
+    monkeypatch.setattr(datacite_client, "get_doi_record", get_doi_record)
+
+    assert datacite_client.get_datacite_doi_state("10.12345/67890") == ("unset", False)
+    with pytest.raises(HttpError):
+        datacite_client.get_datacite_doi_state("10.12345/67890")
+
+
+@pytest.mark.django_db
+def test_doi_transition_fetches_doi_record_once(
+    client, resource, datacite_configuration, user_with_permission, datacite_api, monkeypatch, settings
+):
+    """State before and after the transition and the citation snippet share one GET."""
+    settings.RDML_DOI_TRANSITIONS_ASYNC = False
+    monkeypatch.setattr("rdml.doimanager.transitions.get_rdml_metadata", lambda resource_id, as_json: {"titles": []})
+    DataCiteResource.objects.create(resource=resource, doi="10.12345/67890", datacite_state="registered")
+    client.force_login(user_with_permission)
+
+    client.get(reverse("doimanager:datacite_manager", args=[resource.id, "findable"]))
+
+    assert [method for method, url in datacite_api if "api.test.datacite.org" in url] == ["GET", "PUT"]
+
+
+@pytest.mark.django_db
+def test_datacite_manager_fetches_doi_record_and_citation_concurrently(
+    client, resource, datacite_configuration, user_with_permission, monkeypatch
+):
+    DataCiteResource.objects.create(resource=resource, doi="10.12345/67890", datacite_state="findable")
+    client.force_login(user_with_permission)
+    running = []
+    overlapped = threading.Event()
+
+    def session_request(method, url, **kwargs):
+        running.append(url)
+        if len(running) > 1:
+            overlapped.set()
+        # Wait for the other request to start
+        overlapped.wait(timeout=1)
+        response = requests.Response()
+        response.status_code = 200
+        if "api.test.datacite.org" in url:
+            attributes = {"state": "findable", "url": "https://example.org/", "updated": "2024-01-01T00:00:00Z"}
+            response._content = json.dumps({"data": {"id": "10.12345/67890", "attributes": attributes}}).encode()
+        else:
+            response._content = b"Citation"
+        return response
+
+    monkeypatch.setattr(get_session(), "request", session_request)
+
+    started = time.monotonic()
+    response = client.get(reverse("doimanager:datacite_manager", args=[resource.id]))
+
+    assert response.status_code == 200
+    assert overlapped.is_set()
+    assert time.monotonic() - started < 1
+    assert DataCiteResource.objects.get(resource=resource).citation_snippet == "Citation"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "transitions_async, notice",
+    [
+        (True, "Queued transitions are performed once DataCite is available again."),
+        (False, "Transitions fail until DataCite is available again."),
+    ],
+)
+def test_datacite_manager_unavailable_notice(
+    client,
+    resource,
+    datacite_configuration,
+    user_with_permission,
+    datacite_api,
+    monkeypatch,
+    settings,
+    transitions_async,
+    notice,
+):
+    settings.RDML_DOI_TRANSITIONS_ASYNC = transitions_async
+    monkeypatch.setattr(DataCiteRESTClient, "is_available", lambda self: False)
+    DataCiteResource.objects.create(resource=resource, doi="10.12345/67890", datacite_state="findable")
+    client.force_login(user_with_permission)
+
+    response = client.get(reverse("doimanager:datacite_manager", args=[resource.id]))
+
+    assert notice in response.content.decode()
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+import requests
+
+from django.core.cache import cache
+
+from rdml.doimanager.datacite.breaker import get_circuit_breaker
+from rdml.doimanager.datacite.errors import DataCiteUnavailableError, HttpError
+from rdml.doimanager.datacite import request as datacite_request
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.datacite.request import (
+    DataCiteRequest,
+    get_pool_stats,
+    get_request_stats,
+    get_session,
+    parse_retry_after,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def make_response(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return response
+
+
+def make_request(monkeypatch, outcomes, max_retries=3):
+    """A DataCiteRequest whose session returns (or raises) the given outcomes in turn."""
+    request = DataCiteRequest(base_url="https://api.test.datacite.org/", username="user", password="secret")
+    request.max_retries = max_retries
+    request.backoff = 0
+    calls = []
+
+    def session_request(method, url, **kwargs):
+        calls.append(method)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return make_response(*outcome)
+
+    monkeypatch.setattr(request.session, "request", session_request)
+    return request, calls
+
+
+def test_get_is_retried_on_server_errors(monkeypatch):
+    request, calls = make_request(monkeypatch, [(502,), (503,), (200,)])
+
+    assert request.get("dois/10.12345/abc").status_code == 200
+    assert len(calls) == 3
+    assert get_request_stats()["retries"] == 2
+
+
+def test_get_is_retried_on_connection_errors(monkeypatch):
+    request, calls = make_request(monkeypatch, [requests.exceptions.ConnectionError(), (200,)])
+
+    assert request.get("dois/10.12345/abc").status_code == 200
+    assert len(calls) == 2
+
+
+def test_retries_are_limited(monkeypatch):
+    request, calls = make_request(monkeypatch, [(503,)] * 3, max_retries=2)
+
+    assert request.get("dois/10.12345/abc").status_code == 503
+    assert len(calls) == 3
+
+
+def test_post_is_not_retried_on_server_errors(monkeypatch):
+    request, calls = make_request(monkeypatch, [(502,), (201,)])
+
+    assert request.post("dois", body="{}").status_code == 502
+    assert len(calls) == 1
+
+
+def test_post_is_not_retried_on_read_timeouts(monkeypatch):
+    request, calls = make_request(monkeypatch, [requests.exceptions.ReadTimeout(), (201,)])
+
+    with pytest.raises(HttpError):
+        request.post("dois", body="{}")
+    assert len(calls) == 1
+
+
+def test_post_is_retried_when_throttled(monkeypatch):
+    request, calls = make_request(monkeypatch, [(429, {"Retry-After": "0"}), (201,)])
+
+    assert request.post("dois", body="{}").status_code == 201
+    assert len(calls) == 2
+    assert get_request_stats()["throttled"] == 1
+
+
+def test_circuit_breaker_opens_after_failures(monkeypatch, settings):
+    settings.RDML_DATACITE_BREAKER_THRESHOLD = 2
+    request, calls = make_request(monkeypatch, [(503,), (503,), (200,)], max_retries=0)
+
+    assert request.get("dois/10.12345/abc").status_code == 503
+    assert request.get("dois/10.12345/abc").status_code == 503
+    with pytest.raises(DataCiteUnavailableError):
+        request.get("dois/10.12345/abc")
+    assert len(calls) == 2
+
+
+def test_retried_request_counts_as_one_failure(monkeypatch, settings):
+    settings.RDML_DATACITE_BREAKER_THRESHOLD = 2
+    request, calls = make_request(monkeypatch, [(503,), (503,), (503,), (503,), (200,)], max_retries=3)
+    breaker = get_circuit_breaker("api.test.datacite.org")
+
+    assert request.get("dois/10.12345/abc").status_code == 503
+    assert cache.get(breaker.opened_key) is None
+    assert request.get("dois/10.12345/abc").status_code == 200
+    assert len(calls) == 5
+
+
+def test_circuit_breaker_closes_after_successful_probe(monkeypatch, settings):
+    settings.RDML_DATACITE_BREAKER_THRESHOLD = 1
+    settings.RDML_DATACITE_BREAKER_OPEN_INTERVAL = 0
+    request, _calls = make_request(monkeypatch, [(503,), (200,), (200,)], max_retries=0)
+    breaker = get_circuit_breaker("api.test.datacite.org")
+
+    request.get("dois/10.12345/abc")
+    assert cache.get(breaker.opened_key)
+    # The open interval has passed, the next request probes DataCite
+    assert request.get("dois/10.12345/abc").status_code == 200
+    assert cache.get(breaker.opened_key) is None
+    assert request.get("dois/10.12345/abc").status_code == 200
+
+
+def test_session_is_reused():
+    assert get_session() is get_session()
+
+
+def test_session_is_recreated_in_forked_processes(monkeypatch):
+    parent_session = get_session()
+
+    monkeypatch.setattr(datacite_request.os, "getpid", lambda: -1)
+
+    child_session = get_session()
+    assert child_session is not parent_session
+    assert get_session() is child_session
+    # Sessions of other processes are dropped
+    assert list(datacite_request._sessions) == [-1]
+
+
+def test_pool_stats():
+    fake = FakeDataCite()
+    url = fake.start()
+    try:
+        for _index in range(2):
+            get_session().get(f"{url}dois/10.12345/unknown")
+    finally:
+        fake.stop()
+
+    stats = {entry["host"]: entry for entry in get_pool_stats()}
+    host = url.removeprefix("http://").rstrip("/")
+    assert stats[f"http://{host}"]["num_requests"] >= 2
+    assert stats[f"http://{host}"]["num_connections"] == 1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.models import DataCiteConfiguration, DataCiteResource
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def fake_datacite(db, settings):
+    cache.clear()
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    # No client side rate limit for the local server
+    settings.RDML_DATACITE_RATE_LIMIT = 100_000
+    fake = FakeDataCite(prefix="10.12345", seed=1)
+    settings.RDML_DATACITE_API_URL = fake.start()
+    yield fake
+    fake.stop()
+    cache.clear()
+
+
+@pytest.fixture
+def datacite_resource(db):
+    resource = Resource.objects.create(
+        slug="survey",
+        title_en="Survey",
+        is_public=True,
+        organizational_unit=OrganizationalUnit.objects.create(name="Unit", slug="unit"),
+        publisher=Organization.objects.create(name="Organization", slug="organization"),
+    )
+    return DataCiteResource.objects.create(resource=resource, doi="10.12345/survey", datacite_state="registered")
+
+
+def test_sync_persists_the_doi_state(fake_datacite, datacite_resource):
+    fake_datacite.dois["10.12345/survey"] = {
+        "doi": "10.12345/survey",
+        "state": "findable",
+        "url": "https://example.org/",
+        "updated": "2024-01-01T00:00:00Z",
+    }
+
+    assert datacite_resource.sync_datacite_state() == DataCiteResource.DOIState.FINDABLE
+
+    datacite_resource.refresh_from_db()
+    assert datacite_resource.datacite_state == DataCiteResource.DOIState.FINDABLE
+    assert datacite_resource.datacite_state_synced is not None
+    assert datacite_resource.datacite_updated.year == 2024
+    assert datacite_resource.datacite_url == "https://example.org/"
+
+
+def test_sync_unsets_unknown_dois(fake_datacite, datacite_resource):
+    assert datacite_resource.sync_datacite_state() == DataCiteResource.DOIState.UNSET
+
+    datacite_resource.refresh_from_db()
+    assert datacite_resource.datacite_state == DataCiteResource.DOIState.UNSET
+
+
+def test_sync_keeps_the_state_while_datacite_is_unavailable(fake_datacite, datacite_resource, settings):
+    settings.RDML_DATACITE_MAX_RETRIES = 0
+    fake_datacite.error_rate = 1
+
+    assert datacite_resource.sync_datacite_state() == DataCiteResource.DOIState.REGISTERED
+
+    datacite_resource.refresh_from_db()
+    assert datacite_resource.datacite_state == DataCiteResource.DOIState.REGISTERED
+    assert datacite_resource.datacite_state_synced is None
+
+
+def test_landing_page_shows_the_stored_state_without_requests(client, fake_datacite, datacite_resource):
+    response = client.get(reverse("doiresolver:landing-page", kwargs={"identifier": "survey"}))
+
+    assert response.status_code == 200
+    assert "Registered" in response.content.decode()
+    assert fake_datacite.requests == []
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from datetime import timedelta
+
+import pytest
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.models import DataCiteConfiguration, DataCiteResource, DOITransitionJob
+from rdml.research.models import Resource
+
+
+METADATA = {"titles": [{"title": "Survey"}], "publicationYear": "2024", "url": "https://example.org/"}
+
+
+@pytest.fixture
+def fake_datacite(db, settings):
+    cache.clear()
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    # No client side rate limit for the local server
+    settings.RDML_DATACITE_RATE_LIMIT = 100_000
+    fake = FakeDataCite(prefix="10.12345", seed=1)
+    settings.RDML_DATACITE_API_URL = fake.start()
+    yield fake
+    fake.stop()
+    cache.clear()
+
+
+@pytest.fixture
+def datacite_resource(db):
+    return DataCiteResource.objects.create(resource=Resource.objects.create(language="de"))
+
+
+def test_enqueue_returns_the_active_job(datacite_resource):
+    job = DOITransitionJob.enqueue(datacite_resource, "draft")
+
+    assert DOITransitionJob.enqueue(datacite_resource, "findable") == job
+    with pytest.raises(IntegrityError), transaction.atomic():
+        DOITransitionJob.objects.create(datacite_resource=datacite_resource, transition_to="findable")
+
+    job.fail("Failed")
+    assert DOITransitionJob.enqueue(datacite_resource, "draft") != job
+
+
+def test_job_is_claimed_once(datacite_resource):
+    job = DOITransitionJob.enqueue(datacite_resource, "draft")
+    other_worker_job = DOITransitionJob.objects.get(pk=job.pk)
+
+    assert job.claim()
+    assert not other_worker_job.claim()
+    assert DOITransitionJob.claim_next() is None
+
+
+def test_interrupted_job_does_not_block_transitions(datacite_resource, settings):
+    settings.RDML_DOI_TRANSITIONS_ASYNC = False
+    settings.RDML_DOI_TRANSITIONS_TIMEOUT = 10
+    job = DOITransitionJob.enqueue(datacite_resource, "draft")
+    job.claim()
+
+    # Still running within the timeout
+    assert DOITransitionJob.enqueue(datacite_resource, "findable") == job
+
+    # The process performing the transition was killed
+    DOITransitionJob.objects.filter(pk=job.pk).update(started=timezone.now() - timedelta(minutes=11))
+    new_job = DOITransitionJob.enqueue(datacite_resource, "findable")
+
+    job.refresh_from_db()
+    assert job.status == DOITransitionJob.Status.FAILED
+    assert job.error
+    assert new_job != job
+    assert new_job.status == DOITransitionJob.Status.QUEUED
+
+
+def test_interrupted_job_is_requeued_for_the_worker(datacite_resource, settings):
+    settings.RDML_DOI_TRANSITIONS_ASYNC = True
+    job = DOITransitionJob.enqueue(datacite_resource, "draft")
+    job.claim()
+    DOITransitionJob.objects.filter(pk=job.pk).update(started=timezone.now() - timedelta(hours=1))
+
+    assert DOITransitionJob.expire_stale() == 1
+    assert DOITransitionJob.claim_next() == job
+
+
+def test_failed_job_records_error(fake_datacite, datacite_resource):
+    # A DOI which does not exist yet cannot be hidden
+    job = DOITransitionJob.enqueue(datacite_resource, "registered")
+
+    job.run(metadata=METADATA)
+
+    job.refresh_from_db()
+    assert job.status == DOITransitionJob.Status.FAILED
+    assert "not supported" in job.error
+    assert job.finished is not None
+
+
+def test_jobs_perform_transitions(fake_datacite, datacite_resource):
+    for transition_to in ["draft", "findable"]:
+        job = DOITransitionJob.enqueue(datacite_resource, transition_to)
+        assert DOITransitionJob.claim_next() == job
+        job.run(metadata=METADATA)
+        assert job.status == DOITransitionJob.Status.SUCCEEDED, job.error
+
+    datacite_resource.refresh_from_db()
+    assert datacite_resource.datacite_state == DataCiteResource.DOIState.FINDABLE
+    assert fake_datacite.dois[datacite_resource.doi.lower()]["state"] == "findable"
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+from django.core.cache import cache
+
+from rdml.doimanager.datacite.errors import DataCiteNotFoundError
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.datacite.request import get_request_stats
+from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
+from rdml.doimanager.models import DataCiteConfiguration, DataCiteResource
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def fake_datacite(db, settings):
+    cache.clear()
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    # No client side rate limit for the local server
+    settings.RDML_DATACITE_RATE_LIMIT = 100_000
+    fake = FakeDataCite(prefix="10.12345", seed=1)
+    settings.RDML_DATACITE_API_URL = fake.start()
+    yield fake
+    fake.stop()
+    cache.clear()
+
+
+def test_doi_workflow(fake_datacite):
+    client = DataCiteRESTClient()
+    metadata = {"titles": [{"title": "Survey"}], "publicationYear": "2024", "url": "https://example.org/"}
+
+    doi = client.draft_doi(metadata=metadata)
+    assert DataCiteRESTClient().get_datacite_doi_state(doi) == ("draft", True)
+
+    client.change_doi_state(doi=doi, state="register", metadata={})
+    assert DataCiteRESTClient().get_datacite_doi_state(doi) == ("registered", True)
+
+    client.change_doi_state(doi=doi, state="publish", metadata={})
+    assert DataCiteRESTClient().get_metadata(doi)["state"] == "findable"
+
+    other_doi = client.draft_doi(metadata=metadata)
+    client.draft_doi(metadata=metadata)
+    assert len(list(client.iter_dois(page_size=2))) == 3
+
+    client.delete_doi(other_doi)
+    with pytest.raises(DataCiteNotFoundError):
+        DataCiteRESTClient().get_metadata(other_doi)
+
+
+def test_throttled_requests_are_retried(fake_datacite, settings):
+    settings.RDML_DATACITE_MAX_RETRIES = 10
+    fake_datacite.throttle_rate = 0.5
+    fake_datacite.retry_after = 0
+    client = DataCiteRESTClient()
+
+    for _index in range(5):
+        client.draft_doi(metadata={"titles": [{"title": "Survey"}]})
+
+    assert len(fake_datacite.dois) == 5
+    assert get_request_stats()["throttled"] > 0
+
+
+def test_unchanged_metadata_is_not_pushed(fake_datacite):
+    client = DataCiteRESTClient()
+    metadata = {"titles": [{"title": "Survey"}], "publicationYear": "2024", "url": "https://example.org/"}
+    doi = client.draft_doi(metadata=metadata)
+    datacite_resource = DataCiteResource.objects.create(resource=Resource.objects.create(), doi=doi)
+
+    def count_updates():
+        return len([method for method, _path in fake_datacite.requests if method == "PUT"])
+
+    assert client.push_metadata(datacite_resource, metadata) is not None
+    assert client.push_metadata(datacite_resource, metadata) is None
+    assert count_updates() == 1
+
+    datacite_resource.refresh_from_db()
+    assert not datacite_resource.is_metadata_dirty(metadata)
+    changed_metadata = {**metadata, "titles": [{"title": "Household survey"}]}
+    client.push_metadata(datacite_resource, changed_metadata)
+    assert count_updates() == 2
+    assert fake_datacite.dois[doi.lower()]["titles"] == [{"title": "Household survey"}]
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import datetime
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from rdml.doimanager.metadata import get_rdml_metadata, iter_rdml_metadata
+from rdml.doimanager.models import DataCiteConfiguration
+from rdml.organization.models import Organization, Person
+from rdml.research.models import Resource
+from rdml.research.models.base_models import ContributionPosition, CreatorPerson
+
+
+@pytest.fixture
+def organization(db):
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    return Organization.objects.create(name="Organization", slug="organization")
+
+
+def create_resource(organization, name, creators_count=1):
+    resource = Resource.objects.create(
+        slug=name,
+        title_en=f"Resource {name}",
+        datacite_resource_type="Survey",
+        date_start=datetime.date(2024, 1, 1),
+        language="en",
+        publisher=organization,
+    )
+    position = ContributionPosition.objects.get_or_create(name="Researcher")[0]
+    for index in range(creators_count):
+        person = Person.objects.create(
+            first_name="First",
+            last_name=f"Last {name} {index}",
+            name_slug=f"person-{name}-{index}",
+            organization=organization,
+        )
+        CreatorPerson.objects.create(
+            resource=resource, person=person, person_organization=organization, contribution_position=position
+        )
+    return resource
+
+
+def count_queries(resources):
+    with CaptureQueriesContext(connection) as context:
+        results = list(iter_rdml_metadata(resources))
+    return len(context), results
+
+
+def test_metadata_of_many_resources_is_built_in_constant_queries(organization):
+    few = [create_resource(organization, "few").id]
+    many = [create_resource(organization, f"many-{index}", creators_count=3).id for index in range(5)]
+
+    # The current site and the DataCite configuration are cached per process
+    count_queries(few)
+    few_queries, _results = count_queries(few)
+    many_queries, results = count_queries(many)
+
+    assert few_queries == many_queries
+    assert len(results) == 5
+    assert all(error is None for _resource, _metadata, error in results)
+    assert [len(metadata["creators"]) for _resource, metadata, _error in results] == [3] * 5
+
+
+def test_invalid_resource_does_not_abort_the_batch(organization):
+    valid = create_resource(organization, "valid")
+    invalid = create_resource(organization, "invalid", creators_count=0)
+
+    results = {
+        resource.id: (metadata, error) for resource, metadata, error in iter_rdml_metadata([valid.id, invalid.id])
+    }
+
+    assert results[valid.id][0] == get_rdml_metadata(valid.id, as_json=False)
+    assert results[invalid.id][0] is None
+    assert "Creators" in str(results[invalid.id][1])
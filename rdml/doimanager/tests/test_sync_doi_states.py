@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
+from rdml.doimanager.metadata import get_landing_page_url
+from rdml.doimanager.models import DataCiteConfiguration, DataCiteResource
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def fake_datacite(db, settings):
+    cache.clear()
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    # No client side rate limit for the local server
+    settings.RDML_DATACITE_RATE_LIMIT = 100_000
+    fake = FakeDataCite(prefix="10.12345", seed=1)
+    settings.RDML_DATACITE_API_URL = fake.start()
+    yield fake
+    fake.stop()
+    cache.clear()
+
+
+def register(fake_datacite, doi, state, url="https://example.org/"):
+    fake_datacite.dois[doi] = {"doi": doi, "state": state, "url": url, "updated": "2024-01-01T00:00:00Z"}
+
+
+def create_datacite_resource(doi, state):
+    return DataCiteResource.objects.create(resource=Resource.objects.create(), doi=doi, datacite_state=state)
+
+
+def test_iter_dois_follows_the_cursor(fake_datacite):
+    for index in range(5):
+        register(fake_datacite, f"10.12345/{index}", "findable")
+
+    dois = [doi for doi, _attributes in DataCiteRESTClient().iter_dois(fields=("state",), page_size=2)]
+
+    assert dois == [f"10.12345/{index}" for index in range(5)]
+    assert [path for method, path in fake_datacite.requests if method == "GET"] == ["/dois"] * 3
+
+
+@pytest.fixture
+def drift(fake_datacite):
+    changed = create_datacite_resource("10.12345/changed", "draft")
+    register(fake_datacite, "10.12345/changed", "findable", get_landing_page_url(changed.resource_id))
+    missing = create_datacite_resource("10.12345/missing", "findable")
+    register(fake_datacite, "10.12345/unknown", "findable")
+    return changed, missing
+
+
+def test_sync_reconciles_states_and_reports_missing_dois(drift, capsys):
+    changed, missing = drift
+
+    call_command("sync_doi_states")
+
+    changed.refresh_from_db()
+    missing.refresh_from_db()
+    assert changed.datacite_state == DataCiteResource.DOIState.FINDABLE
+    assert missing.datacite_state == DataCiteResource.DOIState.FINDABLE
+    output = capsys.readouterr().out
+    assert "10.12345/missing: not found at DataCite" in output
+    assert "10.12345/unknown: registered at DataCite, but unknown locally" in output
+    assert "1 state changes, 0 URL mismatches, 1 missing at DataCite, 1 unknown locally" in output
+
+
+def test_sync_resets_missing_dois_on_request(drift):
+    _changed, missing = drift
+
+    call_command("sync_doi_states", "--reset-missing")
+
+    missing.refresh_from_db()
+    assert missing.datacite_state == DataCiteResource.DOIState.UNSET
+
+
+def test_dry_run_saves_nothing(drift):
+    changed, missing = drift
+
+    call_command("sync_doi_states", "--dry-run", "--reset-missing")
+
+    changed.refresh_from_db()
+    missing.refresh_from_db()
+    assert changed.datacite_state == DataCiteResource.DOIState.DRAFT
+    assert missing.datacite_state == DataCiteResource.DOIState.FINDABLE
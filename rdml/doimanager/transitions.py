@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connection
+
+from ..research.models import Resource
+from .datacite.rest_client import DataCiteRESTClient
+from .metadata import get_rdml_metadata, iter_rdml_metadata
+from .utils import get_citation_snippet
+
+
+def perform_doi_transition(datacite, transition_to, client=None, metadata=None):
+    """
+    Move the DOI of a DataCiteResource to the state `transition_to` at
+    DataCite, refresh the locally stored state and, for findable DOIs, the
+    citation snippet. Returns the transition result of the REST client and
+    raises on any error. Pass `metadata` if it is already built, e.g. by
+    iter_rdml_metadata().
+    """
+    client = client or DataCiteRESTClient()
+
+    # Refresh the locally stored DOI state before deciding on a transition
+    datacite_doi_state = datacite.sync_datacite_state(client=client)
+    if transition_to == datacite_doi_state:
+        return None
+
+    print(f"Transition DOI for '{datacite.resource}' from '{datacite_doi_state}' to state '{transition_to}'")
+    # https://support.datacite.org/docs/api-create-dois
+    # Possible actions:
+    # publish - Triggers a state move from draft or registered to findable
+    # register - Triggers a state move from draft to registered
+    # hide - Triggers a state move from findable to registered
+
+    # We update the metadata on the remote DataCite endpoint on every
+    # DOI state transition, unless it is unchanged since the last push.
+    rdml_metadata = metadata if metadata is not None else get_rdml_metadata(datacite.resource_id, as_json=False)
+    sync_citation_snippet = False
+
+    if transition_to == "draft":
+        # to_draft is only possible for objects which do not yet have any DOI.
+        # Create an identifier in Draft state -> event: None
+        transition_result = client.draft_doi(
+            metadata=rdml_metadata,
+            datacite_resource=datacite,
+        )
+        # draft_doi() returns the validated and draft-saved DOI
+        datacite.doi = transition_result
+
+    elif datacite_doi_state == "draft" and transition_to == "registered":
+        # Create a Findable DOI -> event: register
+        transition_result = client.change_doi_state(
+            doi=datacite.doi,
+            state="register",
+            metadata=rdml_metadata if datacite.is_metadata_dirty(rdml_metadata) else {},
+            datacite_resource=datacite,
+        )
+    elif datacite_doi_state == "findable" and transition_to == "registered":
+        # Hide a previously findable DOI (state: registered; event: hide):
+        transition_result = client.hide_doi(
+            doi=datacite.doi,
+            datacite_resource=datacite,
+        )
+    elif transition_to == "findable":
+        # Create a Findable DOI -> event: publish
+        transition_result = client.change_doi_state(
+            doi=datacite.doi,
+            state="publish",
+            metadata=rdml_metadata if datacite.is_metadata_dirty(rdml_metadata) else {},
+            datacite_resource=datacite,
+        )
+
+        # Only try to get a citation_snippet for findable DOIs
+        sync_citation_snippet = True
+    else:
+        raise NotImplementedError(f"Transition from '{datacite_doi_state}' to '{transition_to}' is not supported.")
+
+    print(f"{transition_result=}")
+    if transition_to != "registered" or datacite_doi_state == "draft":
+        # All transitions but hiding a DOI push the metadata
+        datacite.set_metadata_pushed(rdml_metadata, save=False)
+    datacite.save()
+
+    datacite.refresh_from_db()
+    datacite_doi_state = datacite.sync_datacite_state(client=client)
+    print(f"doi state after transition: {datacite_doi_state}")
+
+    if sync_citation_snippet and datacite.doi:
+        datacite.citation_snippet = get_citation_snippet(datacite.doi)
+        datacite.save(update_fields=["citation_snippet"])
+
+    return transition_result
+
+
+def run_transition_jobs(jobs, max_workers=None, progress=None):
+    """
+    Run claimed DOITransitionJobs concurrently in a bounded thread pool.
+
+    The metadata of all resources is built up front with a few queries, jobs
+    with invalid metadata fail without any request to DataCite. Requests are
+    rate limited per host, see datacite.ratelimit. `progress` is called with
+    each finished job. Returns the finished jobs.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return jobs
+
+    resources = Resource.objects.filter(id__in=[job.datacite_resource.resource_id for job in jobs])
+    metadata = {resource.id: (data, error) for resource, data, error in iter_rdml_metadata(resources)}
+
+    def run(job):
+        data, error = metadata.get(job.datacite_resource.resource_id, (None, None))
+        try:
+            if error:
+                job.fail(error)
+            else:
+                # Each job creates its own client, so cached DOI records are
+                # not shared between threads and are freed with the job
+                job.run(metadata=data)
+        finally:
+            # Each thread uses its own database connection
+            connection.close()
+        return job
+
+    with ThreadPoolExecutor(max_workers=max_workers or settings.RDML_DOI_TRANSITIONS_WORKERS) as executor:
+        futures = [executor.submit(run, job) for job in jobs]
+        for future in as_completed(futures):
+            job = future.result()
+            if progress:
+                progress(job)
+
+    return jobs
@@ -30,24 +30,25 @@ def get_citation_snippet(doi):
     * https://blog.datacite.org/citation-formatting-service-upgrade/
     """
 
+    from django.conf import settings
+
     from .models import DataCiteConfiguration
-    from .datacite.rest_client import DataCiteRESTClient
+    from .datacite.request import get_session
 
     try:
         print(f"get_citation_snippet {doi=}")
-        datacite_configuration = DataCiteConfiguration.objects.get(is_active=True)
-
-        # Possible values:"findable", "registered", and "draft"
-        # TODO: find out for which values a citation snippet is available
-        doi_state = DataCiteRESTClient().get_metadata(doi)
-        print(f"{doi_state['state']=}")
+        datacite_configuration = DataCiteConfiguration.get_active()
 
         env = datacite_configuration.get_datacite_env()
         url = f"{env.doi_base_url}{doi}"
         print(f"{url=}")
 
         headers = {"Accept": "text/x-bibliography", "style": "apa"}
-        response = requests.get(url, headers=headers)
+        response = get_session().get(
+            url,
+            headers=headers,
+            timeout=(settings.RDML_DATACITE_CONNECT_TIMEOUT, settings.RDML_DATACITE_READ_TIMEOUT),
+        )
         response.raise_for_status()
         http_status_code = response.status_code
         print(f"{http_status_code=}")
@@ -57,8 +58,8 @@ def get_citation_snippet(doi):
         print("get_citation_snippet: no active DataCiteConfiguration found")
         return ""
     except requests.exceptions.HTTPError as httperror:
-        print(f"get_citation_snippet error for {url}: {httperror}")
+        print(f"get_citation_snippet error for {doi}: {httperror}")
         return ""
     except BaseException as base_exception:
-        print(f"get_citation_snippet error for {url}: {base_exception}")
+        print(f"get_citation_snippet error for {doi}: {base_exception}")
         return ""
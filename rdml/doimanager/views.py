@@ -2,28 +2,63 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import difflib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
 from django.views.decorators.http import require_GET
 from django.contrib.auth.decorators import login_required, permission_required
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
+from django_htmx.http import HttpResponseClientRefresh
 
 from ..research.models import Resource
+from .datacite.errors import DataCiteError, HttpError
 from .datacite.rest_client import DataCiteRESTClient
-from .datacite import errors as datacite_errors
-from .models import DataCiteResource
 from .metadata import get_rdml_metadata
+from .models import DataCiteResource, DOITransitionJob
 from .utils import get_citation_snippet
 
 
+def _in_thread(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Each thread uses its own database connection
+        connection.close()
+
+
+def _prefetch_doi_record(client, doi):
+    try:
+        client.get_doi_record(doi)
+    except (DataCiteError, HttpError) as e:
+        # Failed requests are not cached, sync_datacite_state() fetches the
+        # record again and handles the error
+        print(f"Prefetching the DOI record of {doi} failed: {e}")
+
+
+def _compare_metadata(local_metadata, remote_attributes):
+    """
+    Return the local metadata and the DataCite attributes it covers as JSON,
+    and an HTML table of their differences.
+    """
+    remote_metadata = {key: remote_attributes.get(key) for key in local_metadata}
+    local_json = json.dumps(local_metadata, sort_keys=True, indent=2, ensure_ascii=False)
+    remote_json = json.dumps(remote_metadata, sort_keys=True, indent=2, ensure_ascii=False)
+    diff = difflib.HtmlDiff(wrapcolumn=60).make_table(
+        remote_json.splitlines(), local_json.splitlines(), "DataCite", "Local", context=True
+    )
+    return local_json, remote_json, diff
+
+
 @login_required
 @permission_required("doimanager.register_or_update_dois", raise_exception=True)
 @require_GET
 def datacite_manager(request, resource_id, transition_to=None):
     print(80 * "-")
     print(f"datacite_manager: {transition_to=}")
-    errors = []
-    sync_citation_snippet = False
-    transition_result = None
 
     project = Resource.objects.get(id=resource_id)
     print(f"{project=}")
@@ -33,6 +68,20 @@ def datacite_manager(request, resource_id, transition_to=None):
         # defaults={'resource': project.id,},
     )
 
+    if transition_to:
+        # With RDML_DOI_TRANSITIONS_ASYNC, transitions are queued and performed
+        # by the `run_doi_jobs` worker, as they take several, possibly slow,
+        # requests to DataCite.
+        job = DOITransitionJob.enqueue(datacite, transition_to, requested_by=request.user)
+        if not settings.RDML_DOI_TRANSITIONS_ASYNC and job.claim():
+            job.run()
+
+        # Redirect to main view without transition url part
+        return redirect("doimanager:datacite_manager", resource_id=project.id)
+
+    DOITransitionJob.expire_stale(datacite)
+    job = datacite.transition_jobs.first()
+
     if datacite.doi:
         doi = datacite.doi
     else:
@@ -41,104 +90,75 @@ def datacite_manager(request, resource_id, transition_to=None):
         # Setting DOI to a new proposed DOI
         doi = None
 
-    datacite_doi_state, datacite_found = DataCiteRESTClient().get_datacite_doi_state(
-        doi=doi, datacite_resource=datacite
-    )
-    print(f"{datacite_doi_state=}; {transition_to=}")
-
-    if datacite_found:
-        # We found a datacite record for this doi, ensure this is
-        # saved in our datacite object:
-        datacite.doi = doi
-        datacite.save()
-
-    if transition_to and transition_to != datacite_doi_state:
-        print(f"Transition DOI for '{project}' from '{datacite_doi_state}' to state '{transition_to}'")
-        # https://support.datacite.org/docs/api-create-dois
-        # Possible actions:
-        # publish - Triggers a state move from draft or registered to findable
-        # register - Triggers a state move from draft to registered
-        # hide - Triggers a state move from findable to registered
-
-        # We always update metadate on remote datacite endpoint on every
-        # DOI state transition.
-
-        try:
-            rdml_metadata = get_rdml_metadata(project.id, as_json=False)
-
-            if transition_to == "draft":
-                print("Transition to draft now")
-                # to_draft is only possible for objects which do not yet have any DOI.
-                # Create an identifier in Draft state -> event: None
-                transition_result = DataCiteRESTClient().draft_doi(
-                    metadata=rdml_metadata,
-                    datacite_resource=datacite,
-                )
-                # draft_doi() returns the validated and draft-saved DOI
-                datacite.doi = doi = transition_result
-
-            elif datacite_doi_state == "draft" and transition_to == "registered":
-                # Create a Findable DOI -> event: register
-                transition_result = DataCiteRESTClient().change_doi_state(
-                    doi=doi,
-                    state="register",
-                    metadata=rdml_metadata,
-                    datacite_resource=datacite,
-                )
-            elif datacite_doi_state == "findable" and transition_to == "registered":
-                # Hide a previously findable DOI (state: registered; event: hide):
-                transition_result = DataCiteRESTClient().hide_doi(
-                    doi=doi,
-                    datacite_resource=datacite,
-                )
-            elif transition_to == "findable":
-                # Create a Findable DOI -> event: publish
-                transition_result = DataCiteRESTClient().change_doi_state(
-                    doi=doi,
-                    state="publish",
-                    metadata=rdml_metadata,
-                    datacite_resource=datacite,
-                )
-
-                # Only try to get a citation_snippet for findable DOIs
-                sync_citation_snippet = True
-            else:
-                raise NotImplementedError
-
-        except datacite_errors.DataCiteServerError as e:
-            errors.append(e)
-        except Exception as e:
-            errors.append(e)
-
-        else:
-            # If no exceptions are raised, execute this try-else block:
-            print(f"{transition_result=}")
-            datacite.save()
-
-            # datacite_after_transition = DataCiteResource.objects.get(resource__id=resource_id)
-            datacite.refresh_from_db()
-            datacite_doi_state, datacite_found = DataCiteRESTClient().get_datacite_doi_state(
-                doi=doi, datacite_resource=datacite
-            )
-            print(f"doi state after transition: {datacite_doi_state}")
-
-            if sync_citation_snippet and datacite.doi:
-                datacite.citation_snippet = get_citation_snippet(doi)
-                datacite.save(update_fields=["citation_snippet"])
-
-            # Redirect to main view without transition url part
-            return redirect("doimanager:datacite_manager", resource_id=project.id)
-
-    print(f"{errors=}")
-    print(f"{transition_result=}")
+    # One client per request, it caches the DOI record
+    client = DataCiteRESTClient() if datacite.doi else None
+    metadata_comparison = None
+
+    if job and job.is_active:
+        # The worker is about to change the state
+        datacite_doi_state = datacite.datacite_state
+    elif client:
+        # The DOI record (state and metadata) and the citation from the
+        # resolver are independent requests, fetch them concurrently while
+        # building the local metadata.
+        citation = None
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(_in_thread, _prefetch_doi_record, client, datacite.doi)
+            if datacite.datacite_state == DataCiteResource.DOIState.FINDABLE:
+                citation = executor.submit(_in_thread, get_citation_snippet, datacite.doi)
+            try:
+                local_metadata = get_rdml_metadata(project.id, as_json=False)
+            except ValueError as e:
+                # Incomplete metadata, nothing to compare
+                print(f"{e=}")
+                local_metadata = None
+
+        datacite_doi_state = datacite.sync_datacite_state(client=client)
+
+        if citation and citation.result() and citation.result() != datacite.citation_snippet:
+            datacite.citation_snippet = citation.result()
+            datacite.save(update_fields=["citation_snippet"])
+
+        if local_metadata is not None:
+            try:
+                metadata_comparison = _compare_metadata(local_metadata, client.get_doi_record(datacite.doi))
+            except Exception as e:
+                print(f"Comparing metadata of {datacite.doi} failed: {e}")
+    else:
+        datacite_doi_state = datacite.sync_datacite_state(client=client)
+
+    # While DataCite is unavailable, sync_datacite_state() keeps the locally
+    # stored state
+    datacite_available = client.is_available() if client else True
+    print(f"{datacite_doi_state=}")
 
     context = {
-        "errors": errors,
         "project": project,
         "datacite": datacite,
         "datacite_doi_state": datacite_doi_state,
         "doi": doi,
-        "transition_result": transition_result,
+        "job": job,
+        "datacite_available": datacite_available,
+        "transitions_async": settings.RDML_DOI_TRANSITIONS_ASYNC,
+        "metadata_comparison": metadata_comparison,
     }
 
     return TemplateResponse(request, "doimanager/datacite_manager.html", context)
+
+
+@login_required
+@permission_required("doimanager.register_or_update_dois", raise_exception=True)
+@require_GET
+def doi_transition_job(request, job_id):
+    """
+    Status of a DOI transition job, polled via htmx while the job is active.
+    """
+    job = get_object_or_404(DOITransitionJob, id=job_id)
+    if job.is_active and DOITransitionJob.expire_stale(job.datacite_resource):
+        job.refresh_from_db()
+
+    if request.htmx and not job.is_active and request.GET.get("polling"):
+        # Reload the DOI manager to show the new DOI state
+        return HttpResponseClientRefresh()
+
+    return TemplateResponse(request, "doimanager/datacite/htmx_doi_transition.html", {"job": job})
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Response cache for public landing pages.
+
+Cached pages are stored per requested identifier (slug or UUID), language and
+`request.ip_allowed`, together with the id of the rendered resource and its
+version at render time. Saving anything shown on a landing page bumps the
+version of the affected resources (see signals.py), which turns their cached
+pages into misses. Changes affecting all pages (e.g. the branding) bump a
+global generation instead.
+
+Invalidation relies on a cache shared by all processes, so the page cache is
+disabled with a process-local cache backend.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+from ..core.cache import is_process_local
+
+PREFIX = "rdml:landing_page"
+GENERATION_KEY = f"{PREFIX}:generation"
+STATS_KEYS = {"hits": f"{PREFIX}:hits", "misses": f"{PREFIX}:misses"}
+
+
+def _version_key(resource_id):
+    return f"{PREFIX}:version:{resource_id}"
+
+
+def _page_key(generation, identifier, request):
+    return f"{PREFIX}:page:{generation}:{identifier}:{get_language()}:{int(request.ip_allowed)}"
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def is_enabled():
+    return settings.RDML_LANDING_PAGE_CACHE_TIMEOUT > 0 and not is_process_local()
+
+
+def is_cacheable(request):
+    return request.method in ("GET", "HEAD") and not request.user.is_authenticated and is_enabled()
+
+
+def get_page(request, identifier):
+    """
+    Return the cached response for the given identifier or None.
+    """
+    entry = cache.get(_page_key(get_generation(), identifier, request))
+    if entry and cache.get(_version_key(entry["resource_id"])) == entry["version"]:
+        _count("hits")
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        response["X-Cache"] = "HIT"
+        return response
+
+    _count("misses")
+    return None
+
+
+def get_version(resource_id):
+    """
+    Return the current version of a resource. Read it before rendering, so a
+    change saved during rendering invalidates the stored page.
+    """
+    version = cache.get(_version_key(resource_id))
+    if version is None:
+        cache.add(_version_key(resource_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(resource_id))
+    return version
+
+
+def set_page(request, identifier, resource_id, version, response):
+    """
+    Store a rendered response for the given identifier.
+    """
+    entry = {
+        "resource_id": str(resource_id),
+        "version": version,
+        "content": response.content,
+        "content_type": response["Content-Type"],
+    }
+    cache.set(_page_key(get_generation(), identifier, request), entry, settings.RDML_LANDING_PAGE_CACHE_TIMEOUT)
+    response["X-Cache"] = "MISS"
+
+
+def invalidate_resources(resource_ids):
+    """
+    Invalidate the cached landing pages of the given resources.
+    """
+    versions = {_version_key(resource_id): uuid.uuid4().hex for resource_id in resource_ids if resource_id}
+    if versions:
+        cache.set_many(versions, None)
+
+
+def invalidate_all():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def get_stats():
+    stats = cache.get_many(STATS_KEYS.values())
+    return {name: stats.get(key, 0) for name, key in STATS_KEYS.items()}
+
+
+def _count(name):
+    key = STATS_KEYS[name]
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key does not exist yet, or was evicted
+        cache.add(key, 1, None)
@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Validators for conditional GET requests (ETag) of the public pages. They are
+computed with a single aggregate query, so a request answered with 304 Not
+Modified never renders a template.
+
+There is no Last-Modified: the pages show related objects without own
+timestamps (e.g. keywords), whose changes only the ETag reflects.
+
+ETags include versions kept in the Django cache (see cache.py and facets.py).
+With a process-local cache backend they would differ between workers and
+miss changes saved by other processes, so no ETag is sent then.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils.cache import patch_cache_control
+from django.utils.translation import get_language
+
+from ..core import middleware
+from ..core.cache import is_process_local
+from ..research.models.base_models import Resource
+from . import cache as page_cache
+from .facets import get_version as get_facet_version
+
+
+def _latest(*timestamps):
+    return max((timestamp for timestamp in timestamps if timestamp), default=None)
+
+
+def _make_etag(request, *parts):
+    # Pages differ by language and, in the header, by ip_allowed and the user
+    parts = (*parts, page_cache.get_generation(), get_language(), int(request.ip_allowed), request.user.pk)
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _get_landing_page_state(identifier=None, pk_uuid=None):
+    """
+    Return the id and last modification of a public resource, including its
+    DataCite record, creators, contributors and files.
+    """
+    if pk_uuid:
+        resources = Resource.public_objects.filter(id=str(pk_uuid))
+    else:
+        resources = Resource.public_objects.filter(slug__exact=identifier)
+
+    state = (
+        resources.annotate(
+            datacite_updated=Max("dataciteresource__updated"),
+            creators_updated=Max("creatorperson__updated"),
+            contributors_updated=Max("contributorperson__updated"),
+            files_updated=Max("fileinfo__updated"),
+        )
+        .values("id", "updated", "datacite_updated", "creators_updated", "contributors_updated", "files_updated")
+        .first()
+    )
+    if not state:
+        return None
+    return (
+        state["id"],
+        _latest(
+            state["updated"],
+            state["datacite_updated"],
+            state["creators_updated"],
+            state["contributors_updated"],
+            state["files_updated"],
+        ),
+    )
+
+
+def landing_page_etag(request, identifier=None, pk_uuid=None):
+    if is_process_local():
+        return None
+
+    state = _get_landing_page_state(identifier, pk_uuid)
+    if not state:
+        return None
+
+    resource_id, last_modified = state
+    # The page cache version changes with everything shown on the page,
+    # including vocabulary entries without own timestamps on the resource.
+    return _make_etag(request, resource_id, last_modified, page_cache.get_version(resource_id))
+
+
+def _get_listing_state(request):
+    if not hasattr(request, "_listing_state"):
+        state = Resource.objects.aggregate(
+            updated=Max("updated"),
+            datacite_updated=Max("dataciteresource__updated"),
+            count=Count("id"),
+            public_count=Count("id", filter=Q(is_public=True)),
+        )
+        request._listing_state = (
+            _latest(state["updated"], state["datacite_updated"]),
+            state["count"],
+            state["public_count"],
+        )
+    return request._listing_state
+
+
+def get_listing_counts(request):
+    """
+    Return the number of all and of public resources.
+    """
+    return _get_listing_state(request)[1:]
+
+
+def listing_etag(request):
+    # The counts cover deleted resources, the facet version changes of
+    # related objects (e.g. keywords) shown in the facet sidebar
+    if is_process_local():
+        return None
+    return _make_etag(request, *_get_listing_state(request), get_facet_version())
+
+
+def public_cache_control(view_func):
+    """
+    Let shared caches (reverse proxies) store pages for anonymous users, and
+    keep all other pages private. With restricted RDML_EDIT_ALLOWED_IP_RANGES
+    pages differ by `request.ip_allowed`, which shared caches cannot tell
+    apart, so they are private as well.
+    """
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = view_func(request, *args, **kwargs)
+        if request.user.is_authenticated or not middleware.ips_allowed.match_all:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.RDML_PUBLIC_PAGES_MAX_AGE)
+        return response
+
+    return wrapper
@@ -0,0 +1,220 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Facets of the public resource listing.
+
+The number of public resources per facet value is kept in FacetCount, so
+the facet sidebar is a plain read. FacetMembership records the values each
+resource is counted for. When resources or their relations change (see
+signals.py), update_facet_counts() compares the current facet values of
+the affected resources with their memberships and applies the difference
+to the counts. Updates are idempotent, so scheduling a resource more than
+once is harmless. Run the `rebuild_facet_counts` management command after
+bulk updates bypassing signals.
+"""
+
+import threading
+import uuid
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from ..doimanager.models import DataCiteResourceTypeGeneral
+from ..research.models.base_models import Resource
+from .models import Facet, FacetCount, FacetMembership
+
+VERSION_KEY = "rdml:listing:facets:version"
+
+# Lookup of the facet value on Resource, and lookups of its label parts
+FACETS = {
+    Facet.ORGANIZATIONAL_UNIT: ("organizational_unit", ["organizational_unit__name"]),
+    Facet.RESOURCE_TYPE: ("datacite_resource_type_general", []),
+    Facet.YEAR: ("date_start__year", []),
+    Facet.SUBJECT_AREA: ("cv_subject_areas", ["cv_subject_areas__name_en"]),
+    Facet.KEYWORD: ("keywords", ["keywords__name_en"]),
+    Facet.GEOGRAPHIC_AREA: (
+        "cv_geographic_areas",
+        ["cv_geographic_areas__country_name", "cv_geographic_areas__subdivision_name"],
+    ),
+}
+
+_pending = threading.local()
+
+
+def get_label(facet, value, label_parts):
+    if facet == Facet.RESOURCE_TYPE:
+        return DataCiteResourceTypeGeneral(value).label if value in DataCiteResourceTypeGeneral.values else value
+    return ": ".join(str(part) for part in label_parts if part) or str(value)
+
+
+def get_facet_values(resource_ids):
+    """
+    Return the current facet values of the given public resources, as a dict
+    of (resource id, facet, value) to label. One query per facet.
+    """
+    resources = Resource.public_objects.filter(pk__in=resource_ids)
+    values = {}
+    for facet, (lookup, label_lookups) in FACETS.items():
+        for resource_id, value, *label_parts in resources.values_list("pk", lookup, *label_lookups).distinct():
+            if value is None or value == "":
+                continue
+            values[(resource_id, facet.value, str(value))] = get_label(facet, value, label_parts)[:255]
+    return values
+
+
+def update_facet_counts(resource_ids):
+    """
+    Bring the facet counts of the given resources up to date.
+    """
+    resource_ids = {uuid.UUID(str(resource_id)) for resource_id in resource_ids}
+    if not resource_ids:
+        return
+
+    current = get_facet_values(resource_ids)
+    with transaction.atomic():
+        memberships = FacetMembership.objects.select_for_update().filter(resource_id__in=resource_ids)
+        counted = set(memberships.values_list("resource_id", "facet", "value"))
+        added = current.keys() - counted
+        removed = counted - current.keys()
+        if not added and not removed:
+            return
+
+        deltas = Counter((facet, value) for _resource_id, facet, value in added)
+        deltas.subtract((facet, value) for _resource_id, facet, value in removed)
+        labels = {(facet, value): label for (_resource_id, facet, value), label in current.items()}
+
+        if removed:
+            FacetMembership.objects.filter(
+                reduce(
+                    or_,
+                    (Q(resource_id=resource_id, facet=facet, value=value) for resource_id, facet, value in removed),
+                )
+            ).delete()
+        FacetMembership.objects.bulk_create(
+            [FacetMembership(resource_id=resource_id, facet=facet, value=value) for resource_id, facet, value in added]
+        )
+
+        FacetCount.objects.bulk_create(
+            [
+                FacetCount(facet=facet, value=value, label=labels[(facet, value)])
+                for (facet, value), delta in deltas.items()
+                if delta > 0
+            ],
+            ignore_conflicts=True,
+        )
+        for (facet, value), delta in deltas.items():
+            if delta:
+                FacetCount.objects.filter(facet=facet, value=value).update(count=F("count") + delta)
+        FacetCount.objects.filter(count=0).delete()
+
+    bump_version()
+
+
+def schedule_facet_update(resource_ids):
+    """
+    Update the facet counts of the given resources once the current
+    transaction is committed. Resources scheduled within a transaction are
+    updated together by the first callback.
+    """
+    if not hasattr(_pending, "resource_ids"):
+        _pending.resource_ids = set()
+    _pending.resource_ids.update(resource_ids)
+    transaction.on_commit(flush_facet_updates)
+
+
+def flush_facet_updates():
+    # Resources of rolled back transactions are left over and updated here,
+    # which is harmless as updates are idempotent
+    resource_ids = getattr(_pending, "resource_ids", set())
+    _pending.resource_ids = set()
+    update_facet_counts(resource_ids)
+
+
+def update_facet_label(facet, instance):
+    """
+    Update the label of a facet value after the related object (e.g. a
+    keyword) was renamed.
+    """
+    lookup, label_lookups = FACETS[facet]
+    label_parts = [getattr(instance, label_lookup.removeprefix(f"{lookup}__")) for label_lookup in label_lookups]
+    label = get_label(facet, instance.pk, label_parts)[:255]
+    if FacetCount.objects.filter(facet=facet, value=str(instance.pk)).exclude(label=label).update(label=label):
+        bump_version()
+
+
+def get_counted_resource_ids(facet, value):
+    return list(FacetMembership.objects.filter(facet=facet, value=str(value)).values_list("resource_id", flat=True))
+
+
+def rebuild_facet_counts(batch_size=1000):
+    """
+    Recount all facets, returns the number of resources counted.
+    """
+    with transaction.atomic():
+        FacetMembership.objects.all().delete()
+        FacetCount.objects.all().delete()
+        resource_ids = list(Resource.public_objects.values_list("pk", flat=True))
+        for start in range(0, len(resource_ids), batch_size):
+            update_facet_counts(resource_ids[start : start + batch_size])
+    bump_version()
+    return len(resource_ids)
+
+
+def bump_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_version():
+    """
+    Changes whenever facet counts change, part of the listing ETag.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_selected_facets(params):
+    """
+    Return the facet values selected in the query parameters, e.g.
+    `?keyword=<id>&year=2020`, as a dict of facet to value.
+    """
+    return {facet.value: params[facet.value] for facet in Facet if params.get(facet.value)}
+
+
+def filter_resources(queryset, selected):
+    for facet, value in selected.items():
+        lookup, _label_lookups = FACETS[facet]
+        if facet in (Facet.ORGANIZATIONAL_UNIT, Facet.SUBJECT_AREA, Facet.KEYWORD, Facet.GEOGRAPHIC_AREA):
+            try:
+                value = uuid.UUID(value)
+            except ValueError:
+                return queryset.none()
+        elif facet == Facet.YEAR and not value.isdigit():
+            return queryset.none()
+        queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+def get_facet_counts(limit):
+    """
+    Return the `limit` most frequent values of each facet, as a dict of
+    facet to FacetCount objects. A single query, without aggregation over
+    resources.
+    """
+    counts = FacetCount.objects.annotate(
+        position=Window(RowNumber(), partition_by="facet", order_by=[F("count").desc(), "label"])
+    ).filter(position__lte=limit)
+
+    facets = {facet.value: [] for facet in Facet}
+    for facet_count in counts.order_by("facet", "position"):
+        facets[facet_count.facet].append(facet_count)
+    return facets
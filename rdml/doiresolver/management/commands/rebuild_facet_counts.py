@@ -0,0 +1,18 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.management.base import BaseCommand
+
+from rdml.doiresolver.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the facets of the public resource listing. Run it once after upgrading and after bulk "
+        "updates bypassing signals, counts are otherwise updated on every change."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f"Counted the facets of {count} public resources."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('organizational_unit', 'Organizational unit'), ('resource_type', 'Resource type'), ('year', 'Start year'), ('subject_area', 'Subject area'), ('keyword', 'Keyword'), ('geographic_area', 'Geographic area')], max_length=50)),
+                ('value', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['facet', '-count', 'label'],
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='unique_facet_value')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FacetMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_id', models.UUIDField(db_index=True)),
+                ('facet', models.CharField(choices=[('organizational_unit', 'Organizational unit'), ('resource_type', 'Resource type'), ('year', 'Start year'), ('subject_area', 'Subject area'), ('keyword', 'Keyword'), ('geographic_area', 'Geographic area')], max_length=50)),
+                ('value', models.CharField(max_length=255)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facet', 'value'], name='doiresolver_facet_e43e33_idx')],
+                'constraints': [models.UniqueConstraint(fields=('resource_id', 'facet', 'value'), name='unique_facet_membership')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations
+
+# Lookup of the facet value on Resource, and lookups of its label parts, as
+# in facets.FACETS when this migration was written
+FACETS = {
+    "organizational_unit": ("organizational_unit", ["organizational_unit__name"]),
+    "resource_type": ("datacite_resource_type_general", []),
+    "year": ("date_start__year", []),
+    "subject_area": ("cv_subject_areas", ["cv_subject_areas__name_en"]),
+    "keyword": ("keywords", ["keywords__name_en"]),
+    "geographic_area": (
+        "cv_geographic_areas",
+        ["cv_geographic_areas__country_name", "cv_geographic_areas__subdivision_name"],
+    ),
+}
+
+
+def count_facets(apps, schema_editor):
+    Resource = apps.get_model("research", "Resource")
+    FacetCount = apps.get_model("doiresolver", "FacetCount")
+    FacetMembership = apps.get_model("doiresolver", "FacetMembership")
+    db_alias = schema_editor.connection.alias
+
+    resource_types = dict(Resource._meta.get_field("datacite_resource_type_general").choices)
+    resources = Resource.objects.using(db_alias).filter(is_public=True)
+
+    FacetMembership.objects.using(db_alias).all().delete()
+    FacetCount.objects.using(db_alias).all().delete()
+
+    memberships = []
+    counts = {}
+    for facet, (lookup, label_lookups) in FACETS.items():
+        for resource_id, value, *label_parts in resources.values_list("pk", lookup, *label_lookups).distinct():
+            if value is None or value == "":
+                continue
+            if facet == "resource_type":
+                label = resource_types.get(value, value)
+            else:
+                label = ": ".join(str(part) for part in label_parts if part) or str(value)
+            memberships.append(FacetMembership(resource_id=resource_id, facet=facet, value=str(value)))
+            label, count = counts.get((facet, str(value)), (label[:255], 0))
+            counts[(facet, str(value))] = (label, count + 1)
+
+    FacetMembership.objects.using(db_alias).bulk_create(memberships, batch_size=1000)
+    FacetCount.objects.using(db_alias).bulk_create(
+        [
+            FacetCount(facet=facet, value=value, label=label, count=count)
+            for (facet, value), (label, count) in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classification', '0002_filetype_unique_lower_extension_software'),
+        ('doiresolver', '0001_facetcount'),
+        ('organization', '0004_alter_organization_options_and_more'),
+        ('research', '0005_resource_title_en_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
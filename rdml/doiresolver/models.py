@@ -2,3 +2,55 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+
+from django.db import models
+
+
+class Facet(models.TextChoices):
+    ORGANIZATIONAL_UNIT = "organizational_unit", "Organizational unit"
+    RESOURCE_TYPE = "resource_type", "Resource type"
+    YEAR = "year", "Start year"
+    SUBJECT_AREA = "subject_area", "Subject area"
+    KEYWORD = "keyword", "Keyword"
+    GEOGRAPHIC_AREA = "geographic_area", "Geographic area"
+
+
+class FacetCount(models.Model):
+    """
+    Number of public resources per facet value, shown in the facet sidebar
+    of the listing. Maintained incrementally, see facets.py.
+    """
+
+    facet = models.CharField(max_length=50, choices=Facet.choices)
+    value = models.CharField(max_length=255)
+    label = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.get_facet_display()}: {self.label} ({self.count})"
+
+    class Meta:
+        ordering = ["facet", "-count", "label"]
+        constraints = [
+            models.UniqueConstraint(fields=["facet", "value"], name="unique_facet_value"),
+        ]
+
+
+class FacetMembership(models.Model):
+    """
+    Facet values a resource is counted for in FacetCount. The resource is
+    not a foreign key, so the values of deleted resources can still be
+    subtracted.
+    """
+
+    resource_id = models.UUIDField(db_index=True)
+    facet = models.CharField(max_length=50, choices=Facet.choices)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["resource_id", "facet", "value"], name="unique_facet_membership"),
+        ]
+        indexes = [
+            models.Index(fields=["facet", "value"]),
+        ]
@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from ..classification.models import CVClassificationKeyword, CVGeographicArea, CVSubjectArea
+from ..doimanager.models import DataCiteResource
+from ..organization.models import Branding, Organization, OrganizationalUnit
+from ..research.models.base_models import ContributionPosition, ContributorPerson, CreatorPerson, FileInfo, Resource
+from . import cache as page_cache
+from .facets import get_counted_resource_ids, schedule_facet_update, update_facet_label
+from .models import Facet
+
+
+# Relations of Resource not shown on landing pages
+NOT_DISPLAYED_FIELDS = ["curators"]
+
+# Models of the facet values of the listing, and the many-to-many fields of
+# Resource referencing them
+FACET_MODELS = {
+    OrganizationalUnit: Facet.ORGANIZATIONAL_UNIT,
+    CVSubjectArea: Facet.SUBJECT_AREA,
+    CVClassificationKeyword: Facet.KEYWORD,
+    CVGeographicArea: Facet.GEOGRAPHIC_AREA,
+}
+FACET_M2M_FIELDS = ["cv_subject_areas", "keywords", "cv_geographic_areas"]
+
+
+def _invalidate_resources(resource_ids):
+    resource_ids = set(resource_ids)
+    transaction.on_commit(lambda: page_cache.invalidate_resources(resource_ids))
+
+
+def _invalidate_all():
+    transaction.on_commit(page_cache.invalidate_all)
+
+
+def resource_changed(sender, instance, **kwargs):
+    # Also sent for the proxy models of Resource
+    if isinstance(instance, Resource):
+        _invalidate_resources([instance.pk])
+
+
+def resource_part_changed(sender, instance, **kwargs):
+    """
+    For objects belonging to exactly one resource, e.g. creators or files.
+    """
+    _invalidate_resources([instance.resource_id])
+
+
+def related_object_changed(sender, instance, lookup, **kwargs):
+    """
+    For objects shared between resources, e.g. persons or keywords.
+    """
+    _invalidate_resources(Resource.objects.filter(lookup(instance)).values_list("pk", flat=True))
+
+
+def resource_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        _invalidate_resources([instance.pk])
+    elif pk_set:
+        _invalidate_resources(pk_set)
+    else:
+        # Reverse clear, the affected resources are unknown
+        _invalidate_all()
+
+
+def global_object_changed(sender, **kwargs):
+    """
+    For objects shown on all landing pages, e.g. the branding.
+    """
+    _invalidate_all()
+
+
+def resource_facets_changed(sender, instance, **kwargs):
+    if isinstance(instance, Resource):
+        schedule_facet_update([instance.pk])
+
+
+def resource_facets_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        schedule_facet_update([instance.pk])
+    elif reverse and action in ("post_add", "post_remove"):
+        schedule_facet_update(pk_set)
+    elif reverse and action == "pre_clear":
+        # The affected resources are unknown after the clear
+        schedule_facet_update(get_counted_resource_ids(FACET_MODELS[type(instance)], instance.pk))
+
+
+def facet_object_saved(sender, instance, facet, **kwargs):
+    update_facet_label(facet, instance)
+
+
+def facet_object_deleted(sender, instance, facet, **kwargs):
+    # Relations of the deleted object are already gone, the counted resources
+    # are known from the facet memberships
+    schedule_facet_update(get_counted_resource_ids(facet, instance.pk))
+
+
+def connect_signals():
+    for signal_name, signal in (("save", post_save), ("delete", post_delete)):
+        signal.connect(resource_changed, dispatch_uid=f"landing_page_resource_{signal_name}")
+
+        for model in (CreatorPerson, ContributorPerson, FileInfo, DataCiteResource):
+            signal.connect(resource_part_changed, sender=model)
+
+        # Models referenced by foreign keys and many-to-many fields of Resource,
+        # e.g. Person (creators), OrganizationalUnit or the keywords
+        for field in Resource._meta.get_fields():
+            if (
+                field.is_relation
+                and field.concrete
+                and field.related_model not in (None, Resource)
+                and field.name not in NOT_DISPLAYED_FIELDS
+            ):
+                lookup = partial(lambda name, instance: Q(**{name: instance}), field.name)
+                signal.connect(
+                    partial(related_object_changed, lookup=lookup),
+                    sender=field.related_model,
+                    weak=False,
+                    dispatch_uid=f"landing_page_{field.name}_{signal_name}",
+                )
+
+        signal.connect(
+            partial(
+                related_object_changed,
+                lookup=lambda organization: (
+                    Q(creators__organization=organization)
+                    | Q(contributors__organization=organization)
+                    | Q(creatorperson__person_organization=organization)
+                    | Q(contributorperson__person_organization=organization)
+                ),
+            ),
+            sender=Organization,
+            weak=False,
+            dispatch_uid=f"landing_page_organization_{signal_name}",
+        )
+
+        for model in (Branding, ContributionPosition):
+            signal.connect(global_object_changed, sender=model)
+
+    for field in Resource._meta.many_to_many:
+        m2m_changed.connect(resource_m2m_changed, sender=field.remote_field.through)
+
+    post_save.connect(resource_facets_changed, dispatch_uid="listing_facets_resource_save")
+    post_delete.connect(resource_facets_changed, dispatch_uid="listing_facets_resource_delete")
+    for field_name in FACET_M2M_FIELDS:
+        m2m_changed.connect(
+            resource_facets_m2m_changed, sender=Resource._meta.get_field(field_name).remote_field.through
+        )
+    for model, facet in FACET_MODELS.items():
+        post_save.connect(
+            partial(facet_object_saved, facet=facet),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"listing_facets_{facet}_save",
+        )
+        post_delete.connect(
+            partial(facet_object_deleted, facet=facet),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"listing_facets_{facet}_delete",
+        )
+
+
+connect_signals()
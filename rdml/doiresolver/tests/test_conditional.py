@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from rdml.core import middleware
+from rdml.core.helpers import IPRangeMatcher
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    # ETags are only sent with a cache shared between processes
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def resource(db):
+    return Resource.objects.create(
+        slug="survey",
+        title_en="Survey",
+        is_public=True,
+        organizational_unit=OrganizationalUnit.objects.create(name="Unit", slug="unit"),
+        publisher=Organization.objects.create(name="Organization", slug="organization"),
+    )
+
+
+@pytest.fixture
+def restricted_ip_ranges(monkeypatch):
+    # The test client is not within the allowed ranges
+    monkeypatch.setattr(middleware, "ips_allowed", IPRangeMatcher(["10.0.0.0/8"]))
+
+
+def landing_page_url(resource):
+    return reverse("doiresolver:landing-page", kwargs={"identifier": resource.slug})
+
+
+@pytest.mark.parametrize("url_name", ["doiresolver:landing-page", "doiresolver:doi-list"])
+def test_unchanged_page_is_not_modified(client, shared_cache, resource, url_name):
+    url = landing_page_url(resource) if url_name == "doiresolver:landing-page" else reverse(url_name)
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["ETag"]
+    assert "Last-Modified" not in response
+
+    response = client.get(url, headers={"if-none-match": response["ETag"]})
+    assert response.status_code == 304
+
+
+def test_etag_changes_with_the_resource(client, shared_cache, resource, django_capture_on_commit_callbacks):
+    etag = client.get(landing_page_url(resource))["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resource.keywords.create(name_en="Soil", slug="soil")
+
+    response = client.get(landing_page_url(resource), headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_anonymous_pages_are_public(client, settings, resource):
+    settings.RDML_PUBLIC_PAGES_MAX_AGE = 300
+
+    response = client.get(landing_page_url(resource))
+
+    assert response["Cache-Control"] == "public, max-age=300"
+
+
+def test_pages_depending_on_the_ip_address_are_private(client, restricted_ip_ranges, resource):
+    response = client.get(landing_page_url(resource))
+
+    assert "private" in response["Cache-Control"]
+    assert "public" not in response["Cache-Control"]
+
+
+def test_pages_of_authenticated_users_are_private(client, django_user_model, resource):
+    client.force_login(django_user_model.objects.create_user(email="user@example.org", password="password"))
+
+    response = client.get(landing_page_url(resource))
+
+    assert "private" in response["Cache-Control"]
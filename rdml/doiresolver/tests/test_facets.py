@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from rdml.classification.models import CVClassificationKeyword
+from rdml.doiresolver.facets import rebuild_facet_counts
+from rdml.doiresolver.models import FacetCount
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def catalogue(db):
+    cache.clear()
+    organization = Organization.objects.create(name="Organization", slug="organization")
+    organizational_unit = OrganizationalUnit.objects.create(name="Unit", slug="unit")
+    keywords = [
+        CVClassificationKeyword.objects.create(name_en=f"Keyword {index}", slug=f"keyword-{index}")
+        for index in range(2)
+    ]
+
+    def create(slug, is_public=True, **fields):
+        return Resource.objects.create(
+            slug=slug,
+            title_en=slug,
+            is_public=is_public,
+            organizational_unit=organizational_unit,
+            publisher=organization,
+            **fields,
+        )
+
+    yield create, keywords
+    cache.clear()
+
+
+def get_counts():
+    return {(count.facet, count.label): count.count for count in FacetCount.objects.all()}
+
+
+def test_facet_counts_are_updated_incrementally(catalogue, django_capture_on_commit_callbacks):
+    create, keywords = catalogue
+    with django_capture_on_commit_callbacks(execute=True):
+        first = create("first", date_start=datetime.date(2020, 1, 1), datacite_resource_type_general="Text")
+        second = create("second", date_start=datetime.date(2021, 1, 1))
+        first.keywords.add(*keywords)
+        second.keywords.add(keywords[0])
+        create("hidden", is_public=False).keywords.add(keywords[1])
+
+    assert get_counts() == {
+        ("organizational_unit", "Unit"): 2,
+        ("resource_type", "Text"): 1,
+        ("resource_type", "Dataset"): 1,
+        ("year", "2020"): 1,
+        ("year", "2021"): 1,
+        ("keyword", "Keyword 0"): 2,
+        ("keyword", "Keyword 1"): 1,
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.is_public = False
+        first.save()
+        keywords[0].name_en = "Renamed"
+        keywords[0].save()
+        keywords[1].resource_set.clear()
+
+    assert get_counts() == {
+        ("organizational_unit", "Unit"): 1,
+        ("resource_type", "Dataset"): 1,
+        ("year", "2021"): 1,
+        ("keyword", "Renamed"): 1,
+    }
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.delete()
+
+    assert get_counts() == {}
+    rebuild_facet_counts()
+    assert get_counts() == {}
+
+
+def test_rebuild_matches_incremental_counts(catalogue, django_capture_on_commit_callbacks):
+    create, keywords = catalogue
+    with django_capture_on_commit_callbacks(execute=True):
+        create("first", date_start=datetime.date(2020, 1, 1)).keywords.add(*keywords)
+        create("second").keywords.add(keywords[0])
+        keywords[1].delete()
+    counts = get_counts()
+
+    rebuild_facet_counts()
+
+    assert get_counts() == counts
+    assert counts[("keyword", "Keyword 0")] == 2
+    assert ("keyword", "Keyword 1") not in counts
+
+
+def test_listing_is_filtered_by_facet(client, catalogue, django_capture_on_commit_callbacks):
+    create, keywords = catalogue
+    with django_capture_on_commit_callbacks(execute=True):
+        create("first").keywords.add(keywords[0])
+        create("second")
+
+    response = client.get(reverse("doiresolver:doi-list"), {"keyword": str(keywords[0].pk)})
+
+    assert [resource.slug for resource in response.context["resources_public"]] == ["first"]
+    labels = {facet_label: entries for facet_label, entries in response.context["facet_sidebar"]}
+    facet_count, is_selected, _params = labels["Keyword"][0]
+    assert (facet_count.label, facet_count.count, is_selected) == ("Keyword 0", 1, True)
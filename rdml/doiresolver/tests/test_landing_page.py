@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rdml.classification.models import CVClassificationKeyword, Filetype
+from rdml.doimanager.models import DataCiteResource
+from rdml.organization.models import Organization, OrganizationalUnit, Person
+from rdml.research.models import Resource
+from rdml.research.models.base_models import ContributionPosition, ContributorPerson, CreatorPerson, FileInfo
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Render the page instead of serving it from the landing page cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def create_resource(name, persons_count):
+    organization = Organization.objects.create(name=f"Organization {name}", slug=f"organization-{name}")
+    organizational_unit = OrganizationalUnit.objects.create(name=f"Unit {name}", slug=f"unit-{name}")
+    position = ContributionPosition.objects.create(name=f"Position {name}")
+    filetype = Filetype.objects.create(extension=f"ext-{name}")
+    resource = Resource.objects.create(
+        title_en=f"Resource {name}",
+        slug=f"resource-{name}",
+        is_public=True,
+        organizational_unit=organizational_unit,
+        publisher=organization,
+    )
+    DataCiteResource.objects.create(resource=resource, doi=f"10.12345/{name}")
+
+    for index in range(persons_count):
+        person = Person.objects.create(
+            first_name="First",
+            last_name=f"Last {name} {index}",
+            name_slug=f"person-{name}-{index}",
+            organization=organization,
+        )
+        CreatorPerson.objects.create(
+            resource=resource, person=person, person_organization=organization, contribution_position=position
+        )
+        ContributorPerson.objects.create(resource=resource, person=person, person_organization=organization)
+        FileInfo.objects.create(resource=resource, filename=f"file-{index}.csv", filetype=filetype)
+        resource.keywords.add(
+            CVClassificationKeyword.objects.create(name_en=f"Keyword {name} {index}", slug=f"keyword-{name}-{index}")
+        )
+
+    return resource
+
+
+def count_landing_page_queries(client, resource):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse("doiresolver:landing-page", kwargs={"identifier": resource.slug}))
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+def test_landing_page_query_count_is_constant(client):
+    """The number of queries must not grow with the number of creators, contributors, files or keywords."""
+    small = create_resource("small", persons_count=1)
+    large = create_resource("large", persons_count=10)
+
+    assert count_landing_page_queries(client, small) == count_landing_page_queries(client, large)
+
+
+@pytest.mark.django_db
+def test_landing_page_renders_creators_in_order(client):
+    resource = create_resource("ordered", persons_count=3)
+
+    response = client.get(reverse("doiresolver:landing-page", kwargs={"identifier": resource.slug}))
+
+    content = response.content.decode()
+    positions = [content.index(f"Last ordered {index}") for index in range(3)]
+    assert positions == sorted(positions)
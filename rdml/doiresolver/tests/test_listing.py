@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core import signing
+from django.core.cache import cache
+from django.urls import reverse
+
+from rdml.doiresolver.views import LISTING_CURSOR_SALT
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def resources(db, settings):
+    cache.clear()
+    settings.RDML_LISTING_PAGE_SIZE = 2
+    organization = Organization.objects.create(name="Organization", slug="organization")
+    organizational_unit = OrganizationalUnit.objects.create(name="Unit", slug="unit")
+    # Resources without an English title share the empty title, the id breaks the tie
+    for slug, title_en in [("c", "C"), ("untitled-1", ""), ("a", "A"), ("untitled-2", ""), ("b", "B")]:
+        Resource.objects.create(
+            slug=slug,
+            title_en=title_en,
+            is_public=True,
+            organizational_unit=organizational_unit,
+            publisher=organization,
+        )
+    Resource.objects.create(slug="hidden", title_en="Hidden", is_public=False)
+    yield
+    cache.clear()
+
+
+def test_listing_pages_are_complete_and_ordered(client, resources):
+    pages = []
+    response = client.get(reverse("doiresolver:doi-list"))
+    while True:
+        pages.append([resource.slug for resource in response.context["resources_public"]])
+        cursor = response.context["next_cursor"]
+        if cursor is None:
+            break
+        response = client.get(reverse("doiresolver:doi-list-rows"), {"after": cursor})
+
+    expected = list(Resource.public_objects.order_by("title_en", "id").values_list("slug", flat=True))
+    assert [slug for page in pages for slug in page] == expected
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_last_full_page_has_no_cursor(client, resources):
+    Resource.objects.filter(slug="b").delete()
+
+    response = client.get(reverse("doiresolver:doi-list"))
+    response = client.get(reverse("doiresolver:doi-list-rows"), {"after": response.context["next_cursor"]})
+
+    assert len(response.context["resources_public"]) == 2
+    assert response.context["next_cursor"] is None
+
+
+def test_tampered_cursor_is_not_found(client, resources):
+    cursor = client.get(reverse("doiresolver:doi-list")).context["next_cursor"]
+    _payload, signature = cursor.rsplit(":", 1)
+    tampered_payload = signing.dumps(["Z", "00000000-0000-0000-0000-000000000000"], salt=LISTING_CURSOR_SALT)
+    cursors = [
+        "invalid",
+        f"{tampered_payload.rsplit(':', 1)[0]}:{signature}",
+        # Signed, but the offset cursor of a search
+        signing.dumps(4, salt=LISTING_CURSOR_SALT),
+    ]
+
+    for cursor in cursors:
+        response = client.get(reverse("doiresolver:doi-list-rows"), {"after": cursor})
+        assert response.status_code == 404, cursor
+
+
+def test_rows_route_does_not_shadow_slugs(client, resources):
+    for slug in ["_rows", "listing"]:
+        Resource.objects.create(slug=slug, title_en=slug, is_public=True)
+
+        response = client.get(reverse("doiresolver:landing-page", kwargs={"identifier": slug}))
+
+        assert response.status_code == 200
+        assert response.context["resource"].slug == slug
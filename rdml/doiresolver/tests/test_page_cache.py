@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from rdml.classification.models import CVClassificationKeyword
+from rdml.doimanager.models import DataCiteResource
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    # A cache shared between processes, unlike the local memory cache
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+    }
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def resource(db):
+    resource = Resource.objects.create(
+        slug="survey",
+        title_en="Survey",
+        is_public=True,
+        organizational_unit=OrganizationalUnit.objects.create(name="Unit", slug="unit"),
+        publisher=Organization.objects.create(name="Organization", slug="organization"),
+    )
+    DataCiteResource.objects.create(resource=resource, doi="10.12345/survey")
+    resource.keywords.add(CVClassificationKeyword.objects.create(name_en="Soil", slug="soil"))
+    return resource
+
+
+def get_landing_page(client, resource):
+    response = client.get(reverse("doiresolver:landing-page", kwargs={"identifier": resource.slug}))
+    assert response.status_code == 200
+    return response
+
+
+def test_landing_page_is_served_from_cache(client, shared_cache, resource):
+    assert get_landing_page(client, resource)["X-Cache"] == "MISS"
+
+    response = get_landing_page(client, resource)
+
+    assert response["X-Cache"] == "HIT"
+    assert "Survey" in response.content.decode()
+
+
+def test_saving_resource_invalidates_cached_page(client, shared_cache, resource, django_capture_on_commit_callbacks):
+    get_landing_page(client, resource)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resource.title_en = "Soil survey"
+        resource.save()
+
+    response = get_landing_page(client, resource)
+    assert response["X-Cache"] == "MISS"
+    assert "Soil survey" in response.content.decode()
+
+
+def test_saving_related_object_invalidates_cached_page(
+    client, shared_cache, resource, django_capture_on_commit_callbacks
+):
+    get_landing_page(client, resource)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        keyword = resource.keywords.get()
+        keyword.name_en = "Topsoil"
+        keyword.save()
+
+    response = get_landing_page(client, resource)
+    assert response["X-Cache"] == "MISS"
+    assert "Topsoil" in response.content.decode()
+
+
+def test_page_cache_is_disabled_with_process_local_cache(client, settings, resource):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+    get_landing_page(client, resource)
+    response = get_landing_page(client, resource)
+
+    assert "X-Cache" not in response
+    assert "ETag" not in response
@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+from rdml.research.search import search_resources
+
+
+@pytest.fixture
+def resources(db):
+    cache.clear()
+    organization = Organization.objects.create(name="Organization", slug="organization")
+    organizational_unit = OrganizationalUnit.objects.create(name="Unit", slug="unit")
+
+    def create(slug, **fields):
+        return Resource.objects.create(
+            slug=slug, is_public=True, organizational_unit=organizational_unit, publisher=organization, **fields
+        )
+
+    yield {
+        "survey": create("survey", title_en="Household Surveys", title_de="Haushaltsumfrage"),
+        "panel": create("panel", title_en="Labour market panel", abstract_en="Includes a survey of employers."),
+        "crime": create("crime", title_en="Crime statistics", abstract_de="Kriminalität in Europa"),
+    }
+    cache.clear()
+
+
+def search(query):
+    return list(search_resources(Resource.objects.all(), query).values_list("slug", flat=True))
+
+
+def test_search_is_ranked_and_stemmed(resources):
+    # Title matches rank above abstract matches
+    assert search("survey") == ["survey", "panel"]
+    assert search("surveying") == ["survey", "panel"]
+    assert search("Haushaltsumfragen") == ["survey"]
+    assert search("kriminalitat") == ["crime"]
+    assert search("survey crime") == []
+    assert search("  ") == []
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite search index")
+def test_search_matches_the_index_once(resources):
+    with CaptureQueriesContext(connection) as context:
+        search("survey")
+
+    assert len(context) == 1
+    assert context[0]["sql"].count(" MATCH ") == 1
+
+
+def test_search_index_is_kept_in_sync(resources):
+    resources["crime"].title_en = "Survey of crime victims"
+    resources["crime"].save()
+    resources["panel"].delete()
+
+    assert sorted(search("survey")) == ["crime", "survey"]
+    assert search("labour") == []
+
+
+def test_listing_search(client, resources):
+    response = client.get(reverse("doiresolver:doi-list"), {"q": "survey"})
+
+    assert [resource.slug for resource in response.context["resources_public"]] == ["survey", "panel"]
+
+
+def test_admin_search_is_ordered_by_rank(admin_client, resources):
+    url = reverse("admin:research_researchresource_changelist")
+
+    response = admin_client.get(url, {"q": "survey"})
+    assert [resource.slug for resource in response.context["cl"].result_list] == ["survey", "panel"]
+
+    # Sorted by the slug column
+    response = admin_client.get(url, {"q": "survey", "o": "1"})
+    assert [resource.slug for resource in response.context["cl"].result_list] == ["panel", "survey"]
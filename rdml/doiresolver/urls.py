@@ -6,6 +6,7 @@ from django.urls import path
 from .views import (
     # DoiListView,
     landing_page_list,
+    landing_page_list_rows,
     landing_page,
 )
 
@@ -14,6 +15,8 @@ app_name = "doiresolver"
 
 urlpatterns = [
     path("", landing_page_list, name="doi-list"),
+    # Two segments, so it cannot shadow the landing page of any slug
+    path("listing/rows/", landing_page_list_rows, name="doi-list-rows"),
     path("<uuid:pk_uuid>/", landing_page, name="landing-page"),
     path("<slug:identifier>/", landing_page, name="landing-page"),
     # path('<str:identifier>/', landing_page, name="landing-page"),
@@ -2,34 +2,176 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
 from django.urls import reverse
 from django.http import Http404
 from django.template.response import TemplateResponse
+from django.views.decorators.http import condition
 
 from ..research.models.base_models import Resource
+from ..research.search import search_resources
+from . import cache as page_cache
+from .conditional import (
+    get_listing_counts,
+    landing_page_etag,
+    listing_etag,
+    public_cache_control,
+)
+from .facets import filter_resources, get_facet_counts, get_selected_facets
+from .models import Facet, FacetCount
+
+
+LISTING_CURSOR_SALT = "rdml.doiresolver.listing"
+
+
+def _get_listing_page(request):
+    """
+    Keyset pagination over public resources, ordered by (title_en, id). The
+    `after` parameter is an opaque cursor pointing at the last listed resource.
+    With a search query `q`, resources are ordered by rank and the cursor is
+    the offset of the next page. Resources are filtered by the selected
+    facets. Only the listed columns are loaded.
+    """
+    resources = Resource.public_objects.select_related("organizational_unit", "dataciteresource").only(
+        "id",
+        "slug",
+        "title_en",
+        "datacite_resource_type",
+        "datacite_resource_type_general",
+        "organizational_unit__name",
+        "organizational_unit__abbr",
+        "dataciteresource__doi",
+    )
+
+    resources = filter_resources(resources, get_selected_facets(request.GET))
+
+    cursor = request.GET.get("after")
+    if cursor:
+        try:
+            cursor = signing.loads(cursor, salt=LISTING_CURSOR_SALT)
+        except (signing.BadSignature, ValueError):
+            raise Http404("Invalid page cursor.")
+
+    page_size = settings.RDML_LISTING_PAGE_SIZE
+    query = request.GET.get("q", "").strip()
+    if query:
+        offset = cursor if isinstance(cursor, int) else 0
+        page = list(search_resources(resources, query)[offset : offset + page_size + 1])
+    else:
+        resources = resources.order_by("title_en", "id")
+        if cursor:
+            try:
+                after_title, after_id = cursor
+            except (TypeError, ValueError):
+                raise Http404("Invalid page cursor.")
+            resources = resources.filter(Q(title_en__gt=after_title) | Q(title_en=after_title, id__gt=after_id))
+        page = list(resources[: page_size + 1])
+
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        position = offset + page_size if query else [page[-1].title_en, str(page[-1].id)]
+        next_cursor = signing.dumps(position, salt=LISTING_CURSOR_SALT)
+
+    return page, next_cursor
+
+
+def _get_listing_params(request):
+    """
+    The query parameters of the listing (search query and facets), without
+    the page cursor.
+    """
+    params = request.GET.copy()
+    params.pop("after", None)
+    return params
 
 
+def _get_facet_sidebar(request):
+    """
+    Return (facet label, entries) pairs for the facet sidebar, with entries
+    of (FacetCount, is selected, query string toggling the value). Read from
+    the precomputed facet counts, see facets.py.
+    """
+    selected = get_selected_facets(request.GET)
+    facet_counts = get_facet_counts(settings.RDML_LISTING_FACET_SIZE)
+    if selected:
+        # Selected values beyond the most frequent ones
+        for facet_count in FacetCount.objects.filter(
+            reduce(or_, (Q(facet=facet, value=value) for facet, value in selected.items()))
+        ):
+            if facet_count not in facet_counts[facet_count.facet]:
+                facet_counts[facet_count.facet].insert(0, facet_count)
+
+    sidebar = []
+    for facet, counts in facet_counts.items():
+        entries = []
+        for facet_count in counts:
+            params = _get_listing_params(request)
+            is_selected = selected.get(facet) == facet_count.value
+            if is_selected:
+                params.pop(facet)
+            else:
+                params[facet] = facet_count.value
+            entries.append((facet_count, is_selected, params.urlencode()))
+        if entries:
+            sidebar.append((Facet(facet).label, entries))
+    return sidebar
+
+
+@public_cache_control
+@condition(etag_func=listing_etag)
 def landing_page_list(request):
-    resources_public = Resource.public_objects.select_related(
-        "organizational_unit",
-        "dataciteresource",
-    ).all()
-    resources_all_count = Resource.objects.count()
+    resources_public, next_cursor = _get_listing_page(request)
+    resources_all_count, resources_public_count = get_listing_counts(request)
     context = {
         "resources_all_count": resources_all_count,
         "resources_public": resources_public,
-        "resources_suppressed_count": resources_all_count - resources_public.count(),
+        "resources_public_count": resources_public_count,
+        "resources_suppressed_count": resources_all_count - resources_public_count,
+        "next_cursor": next_cursor,
+        "query": request.GET.get("q", "").strip(),
+        "selected_facets": get_selected_facets(request.GET),
+        "facet_sidebar": _get_facet_sidebar(request),
+        "listing_params": _get_listing_params(request).urlencode(),
     }
 
     return TemplateResponse(request, "doiresolver/landing_page_listing.html", context)
 
 
+@public_cache_control
+@condition(etag_func=listing_etag)
+def landing_page_list_rows(request):
+    """
+    The table rows of the next listing page, for infinite scrolling via htmx.
+    """
+    resources_public, next_cursor = _get_listing_page(request)
+    context = {
+        "resources_public": resources_public,
+        "next_cursor": next_cursor,
+        "listing_params": _get_listing_params(request).urlencode(),
+    }
+
+    return TemplateResponse(request, "doiresolver/includes/listing_rows.html", context)
+
+
+@public_cache_control
+@condition(etag_func=landing_page_etag)
 def landing_page(request, identifier=None, pk_uuid=None):
     # print(f"landing_page called with {identifier=}, {pk_uuid=}")
+    cacheable = page_cache.is_cacheable(request)
+    cache_identifier = identifier or str(pk_uuid)
+    if cacheable:
+        response = page_cache.get_page(request, cache_identifier)
+        if response:
+            return response
+
     try:
-        resource_qs = Resource.public_objects.select_related(
-            "organizational_unit", "dataciteresource", "publisher"
-        ).prefetch_related("keywords")
+        resource_qs = Resource.public_objects.for_landing_page()
 
         if identifier:
             resource = resource_qs.get(slug__exact=identifier)
@@ -42,5 +184,11 @@ def landing_page(request, identifier=None, pk_uuid=None):
         )
 
     context = {"resource": resource}
+    response = TemplateResponse(request, "doiresolver/landing_page.html", context)
+
+    if cacheable:
+        version = page_cache.get_version(resource.id)
+        response.render()
+        page_cache.set_page(request, cache_identifier, resource.id, version, response)
 
-    return TemplateResponse(request, "doiresolver/landing_page.html", context)
+    return response
@@ -3,16 +3,20 @@
 # SPDX-License-Identifier: EUPL-1.2
 
 from django.contrib import admin
+
+from ..core.admin import BrokenLinksAdminMixin
 from .models import Organization, OrganizationalUnit, Person, Branding
 
 
 @admin.register(Organization)
-class OrganizationAdmin(admin.ModelAdmin):
+class OrganizationAdmin(BrokenLinksAdminMixin, admin.ModelAdmin):
     list_display = [
         "name",
         "abbr",
         "slug",
+        "get_broken_links",
     ]
+    link_check_fields = ["url"]
     search_fields = [
         "name",
         "slug",
@@ -23,24 +27,28 @@ class OrganizationAdmin(admin.ModelAdmin):
 
 
 @admin.register(OrganizationalUnit)
-class OrganizationalUnitAdmin(admin.ModelAdmin):
+class OrganizationalUnitAdmin(BrokenLinksAdminMixin, admin.ModelAdmin):
     list_display = [
         "name",
         "abbr",
         "url",
+        "get_broken_links",
     ]
+    link_check_fields = ["url"]
 
     prepopulated_fields = {"slug": ("name",)}
 
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(BrokenLinksAdminMixin, admin.ModelAdmin):
     list_display = [
         "last_name",
         "first_name",
         "email",
         "name_slug",
+        "get_broken_links",
     ]
+    link_check_fields = ["orcid_id"]
 
     search_fields = [
         "last_name",
@@ -8,3 +8,6 @@ from django.apps import AppConfig
 class OrganizationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "rdml.organization"
+
+    def ready(self):
+        from . import signals  # noqa: F401
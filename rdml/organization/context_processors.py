@@ -9,9 +9,12 @@ from django.utils.html import format_html
 
 
 def branding(request):
-    """Make branding settings available for all requests."""
-    try:
-        branding = Branding.objects.first()
+    """
+    Make branding settings available for all requests. The branding is cached,
+    so public pages render without a database query.
+    """
+    branding = Branding.get_cached()
+    if branding:
         branding_dict = {
             "organization_name": branding.organization_name,
             "organization_abbr": branding.organization_abbr,
@@ -19,7 +22,12 @@ def branding(request):
             "branding_figurative_mark": branding.organization_figurative_mark,
             "branding_affiliation": branding.organization_affiliation,
         }
-    except (Branding.DoesNotExist, AttributeError):
+    else:
+        branding_dict = {}
+
+    # Only warn staff: adding a message would write to the session and
+    # set a cookie on otherwise cacheable public pages.
+    if not branding and request.user.is_staff:
         branding_meta = Branding._meta
         messages.warning(
             request,
@@ -31,6 +39,5 @@ def branding(request):
                 branding_meta.verbose_name,
             ),
         )
-        branding_dict = {}
 
     return branding_dict
@@ -9,6 +9,7 @@ from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 
+from ..core.cache import VersionedCache
 from ..core.models import TimeStampedBaseModel, UUIDBaseModel, SingletonBaseModel
 
 
@@ -249,6 +250,18 @@ class Branding(SingletonBaseModel):
     def __str__(self):
         return "Branding configuration"
 
+    @classmethod
+    def get_cached(cls):
+        """
+        Return the branding configuration or None. The result is cached per
+        process and invalidated whenever the branding is saved or deleted,
+        see signals.py. Do not modify the returned instance.
+        """
+        return _branding.get()
+
     class Meta:
         verbose_name = "Branding"
         verbose_name_plural = "Branding"
+
+
+_branding = VersionedCache("organization:branding", lambda: Branding.objects.first())
@@ -0,0 +1,14 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Branding, _branding
+
+
+@receiver(post_save, sender=Branding)
+@receiver(post_delete, sender=Branding)
+def invalidate_branding(sender, **kwargs):
+    _branding.invalidate()
@@ -2,12 +2,14 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.utils import timezone
 from django.utils.html import format_html
 from django.templatetags.static import static
 from django.utils.translation import gettext_lazy as _
 
-# from rdml.doimanager.datacite.rest_client import DataCiteRESTClient
 from .models import (
     Resource,
     CreatorPerson,
@@ -18,6 +20,10 @@ from .models import (
     FileInfo,
 )
 from .forms import ResearchResourceAdminForm
+from .search import search_resources
+from ..core.admin import BrokenLinksAdminMixin
+from ..doimanager.models import DOITransitionJob
+from ..doimanager.transitions import run_transition_jobs
 
 
 @admin.register(RelatedResource)
@@ -114,6 +120,18 @@ class HasDoiListFilter(admin.SimpleListFilter):
             return queryset
 
 
+class SearchRankChangeList(ChangeList):
+    def get_ordering(self, request, queryset):
+        """
+        Order search results by rank (see search.search_resources), unless
+        the user sorts by a column.
+        """
+        query = queryset.query
+        if ("search_rank" in query.annotations or "search_rank" in query.extra) and ORDER_VAR not in self.params:
+            return ["-search_rank", "title_en", "-pk"]
+        return super().get_ordering(request, queryset)
+
+
 # class ResourceAdminForm(forms.ModelForm):
 #     class Meta:
 #         fields = ('cv_subject_areas',)
@@ -126,7 +144,7 @@ class HasDoiListFilter(admin.SimpleListFilter):
 #         }
 
 
-class ResourceBaseAdmin(admin.ModelAdmin):
+class ResourceBaseAdmin(BrokenLinksAdminMixin, admin.ModelAdmin):
     save_on_top = False
     # form = ResourceAdminForm
     change_form_template = "research/admin/change_form.html"
@@ -139,8 +157,10 @@ class ResourceBaseAdmin(admin.ModelAdmin):
         "get_year_completed",
         "get_resource_type",
         "get_doi",
+        "get_broken_links",
         "is_public",
     ]
+    link_check_fields = ["website", "preregistration"]
 
     inlines = [
         FileInfoInline,
@@ -337,23 +357,13 @@ class ResourceBaseAdmin(admin.ModelAdmin):
     @admin.display(description="DOI")
     def get_doi(self, obj):
         """
-        TODO: Speed up getting the DOI state. The current DOI state should be saved
-        in the database and updated via a cron job.
+        The DOI state is read from the locally stored copy, which is refreshed
+        by DOI transitions and the `sync_doi_states` management command.
         """
         if obj.dataciteresource.doi:
             doi_img_url = static("img/doi-logo.svg")
-            # datacite_doi_state, datacite_found = DataCiteRESTClient().get_datacite_doi_state(
-            #     doi=obj.dataciteresource.doi
-            # )
-            # <span style="background-color: #e0a800;
-            #     border-radius: 10px;
-            #     font-size: smaller;
-            #     color: black;
-            #     padding: 1px 2px;
-            #     margin: 0 4px;
-            # ">
-            #     {datacite_doi_state.title()}
-            # </span>
+            state_synced = obj.dataciteresource.datacite_state_synced
+            state_synced = f"{timezone.localtime(state_synced):%Y-%m-%d %H:%M}" if state_synced else "never"
 
             return format_html(
                 """<span style="
@@ -369,9 +379,13 @@ class ResourceBaseAdmin(admin.ModelAdmin):
                     <img style="margin-right: 5px; height: 1.2em;" src="{}">
                     <br>
                     {}
+                    <br>
+                    <span title="DOI state, synced {}">{}</span>
                 </span>""",
                 doi_img_url,
                 obj.dataciteresource.doi,
+                state_synced,
+                obj.dataciteresource.get_datacite_state_display(),
             )
 
     @admin.display(
@@ -390,9 +404,39 @@ class ResourceBaseAdmin(admin.ModelAdmin):
         if obj.date_completed:
             return f"{obj.date_completed:%Y}"
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search the full-text index instead of `icontains` lookups on the
+        `search_fields`. Results are ordered by rank, unless the user sorts by
+        a column, see SearchRankChangeList.
+        """
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        results = search_resources(queryset, search_term)
+        if ORDER_VAR in request.GET:
+            # Keep the column the user sorts by
+            results = results.order_by(*queryset.query.order_by)
+        return results, False
+
+    def get_changelist(self, request, **kwargs):
+        return SearchRankChangeList
+
+    def get_curated_resource_ids(self, request):
+        """
+        Ids of the resources curated by the current user, fetched in one query
+        per request instead of one per permission check.
+        """
+        if not hasattr(request, "_curated_resource_ids"):
+            request._curated_resource_ids = set(
+                Resource.curators.through.objects.filter(customuser_id=request.user.id).values_list(
+                    "resource_id", flat=True
+                )
+            )
+        return request._curated_resource_ids
+
     def has_change_permission(self, request, obj=None):
         if obj:
-            return super().has_change_permission(request, obj) or obj.curators.filter(id=request.user.id).exists()
+            return super().has_change_permission(request, obj) or obj.pk in self.get_curated_resource_ids(request)
 
     def has_delete_permission(self, request, obj=None):
         if obj and request.user.is_superuser:
@@ -405,3 +449,43 @@ class ResourceBaseAdmin(admin.ModelAdmin):
 @admin.register(ResearchResource)
 class ResourceAdmin(ResourceBaseAdmin):
     form = ResearchResourceAdminForm
+    actions = ["draft_dois", "register_dois", "publish_dois"]
+
+    def has_register_or_update_dois_permission(self, request):
+        return request.user.has_perm("doimanager.register_or_update_dois")
+
+    def transition_dois(self, request, queryset, transition_to):
+        """
+        Queue DOI transitions for the selected resources. They are performed
+        concurrently, right away or with RDML_DOI_TRANSITIONS_ASYNC by the
+        `run_doi_jobs` worker.
+        """
+        jobs, skipped = DOITransitionJob.enqueue_many(queryset, transition_to, requested_by=request.user)
+        if not settings.RDML_DOI_TRANSITIONS_ASYNC:
+            run_transition_jobs([job for job in jobs if job.transition_to == transition_to and job.claim()])
+
+        if jobs:
+            self.message_user(
+                request,
+                f"{'Queued' if settings.RDML_DOI_TRANSITIONS_ASYNC else 'Performed'} {len(jobs)} DOI transitions "
+                f"to '{transition_to}'. See the DOI transition jobs for their progress.",
+                messages.SUCCESS,
+            )
+        if skipped:
+            self.message_user(
+                request,
+                f"Skipped {len(skipped)} resources whose DOI state does not allow a transition to '{transition_to}'.",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Draft DOIs", permissions=["register_or_update_dois"])
+    def draft_dois(self, request, queryset):
+        self.transition_dois(request, queryset, "draft")
+
+    @admin.action(description="Register DOIs", permissions=["register_or_update_dois"])
+    def register_dois(self, request, queryset):
+        self.transition_dois(request, queryset, "registered")
+
+    @admin.action(description="Publish DOIs (findable)", permissions=["register_or_update_dois"])
+    def publish_dois(self, request, queryset):
+        self.transition_dois(request, queryset, "findable")
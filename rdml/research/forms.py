@@ -7,7 +7,7 @@ from django import forms
 from django.db import models
 from django.core.exceptions import ValidationError
 
-from rdml.core.helpers import linkchecker
+from rdml.core.helpers import check_urls
 
 
 class ResearchResourceAdminForm(forms.ModelForm):
@@ -16,12 +16,12 @@ class ResearchResourceAdminForm(forms.ModelForm):
 
         # Get all URLField fields from the model
         url_fields = [field for field in self.Meta.model._meta.get_fields() if isinstance(field, models.URLField)]
+        urls = {field.name: cleaned_data.get(field.name) for field in url_fields if cleaned_data.get(field.name)}
 
-        # Check each URL field
-        for field in url_fields:
-            url_value = cleaned_data.get(field.name)
-            if url_value:
-                if not linkchecker(url_value):
-                    self.add_error(field.name, ValidationError(f"The URL `{url_value}` appears to be unreachable."))
+        # Check all URLs at once, URLs not checked within the time budget pass
+        results = check_urls(set(urls.values()))
+        for field_name, url_value in urls.items():
+            if results[url_value] is False:
+                self.add_error(field_name, ValidationError(f"The URL `{url_value}` appears to be unreachable."))
 
         return cleaned_data
@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from rdml.research.models import Resource
+from rdml.research.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the full-text search index of research resources, e.g. after bulk updates bypassing "
+        "signals or a database engine change."
+    )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(connection)
+        with transaction.atomic():
+            backend.install()
+            count = backend.rebuild(Resource.objects.all())
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {count} resources ({backend.__class__.__name__}, {connection.vendor}).")
+        )
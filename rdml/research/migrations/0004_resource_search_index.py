@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from rdml.research.search import get_search_backend
+
+
+def install_search_index(apps, schema_editor):
+    backend = get_search_backend(schema_editor.connection)
+    backend.install()
+    backend.rebuild(apps.get_model('research', 'Resource').objects.using(schema_editor.connection.alias))
+
+
+def uninstall_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).uninstall()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0003_alter_resource_options_resource_unique_lower_slug_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classification', '0002_filetype_unique_lower_extension_software'),
+        ('organization', '0004_alter_organization_options_and_more'),
+        ('research', '0004_resource_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['title_en', 'id'], name='research_re_title_e_6cd15b_idx'),
+        ),
+    ]
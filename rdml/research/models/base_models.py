@@ -5,14 +5,14 @@
 import uuid
 
 from django.db import models
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 from django.db.models.functions import Lower
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
 from ...doimanager.models import DataCiteContributorType, DataCiteResourceTypeGeneral
-from ...classification.models import License
+from ...classification.models import CVClassificationKeyword, License
 from ...core.models import TimeStampedBaseModel, UUIDBaseModel
 from ...core.helpers import get_countries_as_choices
 
@@ -224,13 +224,53 @@ class RelatedResource(ResourceBaseModel):
         return f"{self.parent_resource} → {self.relation_type} →  {self.child_resource}"
 
 
-class PublicResourceManager(models.Manager):
+class ResourceQuerySet(models.QuerySet):
+    def for_landing_page(self):
+        """
+        Fetch everything rendered on a landing page, in a constant number of
+        queries regardless of the number of creators, contributors or keywords.
+        """
+        return self.select_related(
+            "organizational_unit",
+            "publisher",
+            "dataciteresource",
+            "archiving_access_availability",
+        ).prefetch_related(
+            Prefetch(
+                "creatorperson_set",
+                queryset=CreatorPerson.objects.select_related("person", "person_organization", "contribution_position"),
+            ),
+            Prefetch(
+                "contributorperson_set",
+                queryset=ContributorPerson.objects.select_related("person", "person_organization"),
+            ),
+            Prefetch("fileinfo_set", queryset=FileInfo.objects.select_related("filetype")),
+            Prefetch("keywords", queryset=CVClassificationKeyword.objects.order_by("name_en")),
+            "cv_subject_areas",
+            "research_funding_agency",
+            "cv_time_dimension",
+            "cv_sampling_procedure",
+            "cv_mode_of_collection",
+            "cv_geographic_areas",
+        )
+
+    def for_datacite_metadata(self):
+        """
+        Fetch everything needed to build DataCite metadata, see
+        doimanager.metadata.iter_rdml_metadata().
+        """
+        return self.select_related("publisher").prefetch_related(
+            Prefetch("creatorperson_set", queryset=CreatorPerson.objects.select_related("person")),
+        )
+
+
+class PublicResourceManager(models.Manager.from_queryset(ResourceQuerySet)):
     def get_queryset(self):
         return super().get_queryset().filter(is_public=True)
 
 
 class Resource(ResourceBaseModel):
-    objects = models.Manager()
+    objects = ResourceQuerySet.as_manager()
     public_objects = PublicResourceManager()
 
     # class ResourceType(models.TextChoices):
@@ -581,3 +621,7 @@ class Resource(ResourceBaseModel):
                 condition=~Q(title_de=""),
             ),
         ]
+        indexes = [
+            # Keyset pagination of the public listing, see doiresolver.views
+            models.Index(fields=["title_en", "id"]),
+        ]
@@ -7,7 +7,7 @@ from django.db import models
 from auditlog.registry import auditlog
 from auditlog.models import AuditlogHistoryField
 
-from .base_models import Resource
+from .base_models import Resource, ResourceQuerySet
 
 
 # class ProjectManager(models.Manager):
@@ -29,7 +29,7 @@ from .base_models import Resource
 #         proxy = True
 
 
-class ResearchResourceManager(models.Manager):
+class ResearchResourceManager(models.Manager.from_queryset(ResourceQuerySet)):
     def get_queryset(self):
         return super().get_queryset()  # .exclude(resource_type=Resource.ResourceType.PROJECT)
 
@@ -0,0 +1,276 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Full-text search over research resources.
+
+The search index is a separate table, its kind depends on the database
+engine, see get_search_backend():
+
+- SQLite: an FTS5 table ranked by bm25. The porter tokenizer stems English,
+  German query terms are additionally matched by prefix without common
+  inflection suffixes, as FTS5 has no German stemmer.
+- PostgreSQL: a tsvector column with a GIN index, built with the english and
+  german text search configurations and ranked by ts_rank.
+- Other databases: icontains lookups, unranked.
+
+The index is created by a migration and kept in sync by signals, see
+signals.py. After bulk updates bypassing signals, run the
+`rebuild_search_index` management command.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ["title_en", "title_de", "abstract_en", "abstract_de", "datacite_resource_type"]
+
+# Common German inflection suffixes, longest first
+GERMAN_SUFFIXES = ("ern", "em", "en", "er", "es", "e", "n", "s")
+
+
+def get_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def strip_german_suffix(term):
+    for suffix in GERMAN_SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 4:
+            return term[: -len(suffix)]
+    return term
+
+
+class SearchRank(Func):
+    """
+    Rank of the resources of the outer query, from a correlated subquery on
+    the search index. `{pk}` in the SQL is replaced by the primary key column.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, sql, params):
+        super().__init__(F("pk"))
+        self.sql = sql
+        self.params = params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        pk_sql, pk_params = compiler.compile(self.source_expressions[0])
+        return f"({self.sql.format(pk=pk_sql)})", [*self.params, *pk_params]
+
+
+class SearchBackend:
+    """
+    Fallback for databases without a supported full-text index, and base
+    class of the backends.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def index(self, resources):
+        """Add or update the given resources in the index."""
+
+    def remove(self, resource_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, queryset, batch_size=1000):
+        """Replace the index with the resources of the queryset, returns their number."""
+        self.clear()
+        count = 0
+        batch = []
+        for resource in queryset.only("id", *SEARCH_FIELDS).iterator(chunk_size=batch_size):
+            batch.append(resource)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        self.index(batch)
+        return count + len(batch)
+
+    def search(self, queryset, query):
+        """
+        Filter the queryset by the search query, annotated with `search_rank`
+        and ordered by it, best first.
+        """
+        terms = get_terms(query)
+        if not terms:
+            return queryset.none()
+
+        condition = Q()
+        for term in terms:
+            condition &= Q(*[Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS], _connector=Q.OR)
+        return self.order(queryset.filter(condition).annotate(search_rank=Value(0.0)))
+
+    @staticmethod
+    def order(queryset):
+        return queryset.order_by("-search_rank", "title_en", "id")
+
+
+class SQLiteSearchBackend(SearchBackend):
+    table = "research_resource_fts"
+    # bm25() weights of the columns: resource_id, titles, abstracts, resource type
+    weights = "0, 10, 10, 1, 1, 2"
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"resource_id UNINDEXED, {', '.join(SEARCH_FIELDS)}, "
+                "tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    @staticmethod
+    def get_rowid(resource_id):
+        # FTS5 rows are addressed by a 64-bit integer, derived from the UUID
+        return resource_id.int & ((1 << 63) - 1)
+
+    def index(self, resources):
+        rows = [
+            (self.get_rowid(resource.id), resource.id.hex, *(getattr(resource, field) for field in SEARCH_FIELDS))
+            for resource in resources
+        ]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (rowid, resource_id, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES ({', '.join(['%s'] * (len(SEARCH_FIELDS) + 2))})",
+                rows,
+            )
+
+    def remove(self, resource_ids):
+        rowids = [self.get_rowid(resource_id) for resource_id in resource_ids]
+        if not rowids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(rowids))})", rowids)
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    @staticmethod
+    def get_match_expression(query):
+        """
+        FTS5 query matching all terms by prefix, e.g. `Umfragen 2020` becomes
+        `("umfragen"* OR "umfrag"*) AND "2020"*`.
+        """
+        expressions = []
+        for term in get_terms(query):
+            stripped = strip_german_suffix(term)
+            if stripped == term:
+                expressions.append(f'"{term}"*')
+            else:
+                expressions.append(f'("{term}"* OR "{stripped}"*)')
+        return " AND ".join(expressions)
+
+    def search(self, queryset, query):
+        match = self.get_match_expression(query)
+        if not match:
+            return queryset.none()
+
+        # Join the index, so a single MATCH yields both the matches and their
+        # bm25() rank, which is lower for better matches. The index has no
+        # model, hence extra().
+        return self.order(
+            queryset.extra(
+                select={"search_rank": f"-bm25({self.table}, {self.weights})"},
+                tables=[self.table],
+                where=[f"{self.table} MATCH %s", f"{self.table}.resource_id = {queryset.model._meta.db_table}.id"],
+                params=[match],
+            )
+        )
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    table = "research_resource_search"
+    document_sql = (
+        "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('german', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || setweight(to_tsvector('german', %s), 'B') || "
+        "setweight(to_tsvector('simple', %s), 'C')"
+    )
+    query_sql = "(websearch_to_tsquery('english', %s) || websearch_to_tsquery('german', %s))"
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "resource_id uuid PRIMARY KEY REFERENCES research_resource (id) ON DELETE CASCADE "
+                "DEFERRABLE INITIALLY DEFERRED, "
+                "document tsvector NOT NULL)"
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_document ON {self.table} USING GIN (document)")
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, resources):
+        rows = [(resource.id, *(getattr(resource, field) for field in SEARCH_FIELDS)) for resource in resources]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (resource_id, document) VALUES (%s, {self.document_sql}) "
+                "ON CONFLICT (resource_id) DO UPDATE SET document = EXCLUDED.document",
+                rows,
+            )
+
+    def remove(self, resource_ids):
+        if not resource_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE resource_id = ANY(%s)", [list(resource_ids)])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {self.table}")
+
+    def search(self, queryset, query):
+        if not get_terms(query):
+            return queryset.none()
+
+        matches = RawSQL(f"SELECT resource_id FROM {self.table} WHERE document @@ {self.query_sql}", [query, query])
+        rank = SearchRank(
+            f"SELECT ts_rank(document, {self.query_sql}) FROM {self.table} WHERE resource_id = {{pk}}",
+            [query, query],
+        )
+        return self.order(queryset.filter(pk__in=matches).annotate(search_rank=rank))
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    """
+    Return the search backend for the database engine of the connection.
+    """
+    connection = connection or connections["default"]
+    return BACKENDS.get(connection.vendor, SearchBackend)(connection)
+
+
+def search_resources(queryset, query):
+    """
+    Filter a queryset of resources by a full-text search query, annotated
+    with `search_rank` and ordered by it, best first.
+    """
+    return get_search_backend(connections[queryset.db]).search(queryset, query)
@@ -0,0 +1,24 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+
+from .models import Resource
+from .search import get_search_backend
+
+
+def resource_saved(sender, instance, using, **kwargs):
+    # Also sent for the proxy models of Resource
+    if isinstance(instance, Resource):
+        get_search_backend(connections[using]).index([instance])
+
+
+def resource_deleted(sender, instance, using, **kwargs):
+    if isinstance(instance, Resource):
+        get_search_backend(connections[using]).remove([instance.pk])
+
+
+post_save.connect(resource_saved, dispatch_uid="search_index_resource_save")
+post_delete.connect(resource_deleted, dispatch_uid="search_index_resource_delete")
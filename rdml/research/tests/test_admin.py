@@ -0,0 +1,145 @@
+# SPDX-FileCopyrightText: Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rdml.doimanager.datacite.fake_server import FakeDataCite
+from rdml.doimanager.models import DataCiteConfiguration, DataCiteResource, DOITransitionJob
+from rdml.organization.models import Organization, OrganizationalUnit
+from rdml.research.models import Resource
+
+
+@pytest.fixture
+def curator(db, django_user_model):
+    user = django_user_model.objects.create_user(email="curator@example.org", password="secret")
+    user.is_staff = True
+    user.save()
+    user.user_permissions.add(Permission.objects.get(codename="view_researchresource"))
+    return user
+
+
+def create_curated_resources(curator, start, count):
+    organization = Organization.objects.create(name=f"Organization {start}", slug=f"organization-{start}")
+    organizational_unit = OrganizationalUnit.objects.create(name=f"Unit {start}", slug=f"unit-{start}")
+    for index in range(start, start + count):
+        resource = Resource.objects.create(
+            title_en=f"Resource {index}",
+            slug=f"resource-{index}",
+            organizational_unit=organizational_unit,
+            publisher=organization,
+        )
+        DataCiteResource.objects.create(resource=resource, doi=f"10.12345/{index}")
+        resource.curators.add(curator)
+
+
+def test_changelist_query_count_is_constant(client, curator, django_assert_num_queries):
+    """The number of queries must not grow with the number of curated resources."""
+    client.force_login(curator)
+    url = reverse("admin:research_researchresource_changelist")
+
+    create_curated_resources(curator, 0, 5)
+    # Fill caches (e.g. of content types) first
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url).status_code == 200
+
+    create_curated_resources(curator, 5, 5)
+    with django_assert_num_queries(len(context)):
+        response = client.get(url)
+    changelist = response.context["cl"]
+    assert len(changelist.result_list) == 10
+
+    # The resources curated by the user are looked up once per request
+    with django_assert_num_queries(1):
+        for resource in changelist.result_list:
+            assert changelist.model_admin.has_change_permission(response.wsgi_request, resource)
+
+
+METADATA = {"titles": [{"title": "Survey"}], "publicationYear": "2024", "url": "https://example.org/"}
+
+
+@pytest.fixture
+def fake_datacite(settings):
+    cache.clear()
+    DataCiteConfiguration.objects.create(is_active=True, doi_prefix="10.12345")
+    # No client side rate limit for the local server
+    settings.RDML_DATACITE_RATE_LIMIT = 100_000
+    fake = FakeDataCite(prefix="10.12345", seed=1)
+    settings.RDML_DATACITE_API_URL = fake.start()
+    yield fake
+    fake.stop()
+    cache.clear()
+
+
+def create_resources_for_transition():
+    """Resources without a DOI, and one whose DOI is already findable."""
+    organization = Organization.objects.create(name="Organization", slug="organization")
+    organizational_unit = OrganizationalUnit.objects.create(name="Unit", slug="unit")
+
+    def create(slug):
+        return Resource.objects.create(
+            title_en=slug, slug=slug, organizational_unit=organizational_unit, publisher=organization
+        )
+
+    resources = [create(f"resource-{index}") for index in range(3)]
+    findable = create("findable")
+    DataCiteResource.objects.create(resource=findable, doi="10.12345/findable", datacite_state="findable")
+    return resources, findable
+
+
+def draft_dois(admin_client, resources):
+    return admin_client.post(
+        reverse("admin:research_researchresource_changelist"),
+        {"action": "draft_dois", "_selected_action": [resource.pk for resource in resources]},
+        follow=True,
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_transition_queues_jobs(admin_client, settings):
+    settings.RDML_DOI_TRANSITIONS_ASYNC = True
+    resources, findable = create_resources_for_transition()
+
+    response = draft_dois(admin_client, [*resources, findable])
+
+    jobs = DOITransitionJob.objects.all()
+    assert sorted(job.datacite_resource.resource_id for job in jobs) == sorted(resource.pk for resource in resources)
+    assert {job.status for job in jobs} == {DOITransitionJob.Status.QUEUED}
+    messages = [str(message) for message in response.context["messages"]]
+    assert "Queued 3 DOI transitions to 'draft'. See the DOI transition jobs for their progress." in messages
+    assert "Skipped 1 resources whose DOI state does not allow a transition to 'draft'." in messages
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_transition_performs_jobs(admin_client, fake_datacite, settings, monkeypatch):
+    settings.RDML_DOI_TRANSITIONS_ASYNC = False
+    monkeypatch.setattr(
+        "rdml.doimanager.transitions.iter_rdml_metadata",
+        lambda resources: ((resource, METADATA, None) for resource in resources),
+    )
+    resources, _findable = create_resources_for_transition()
+
+    draft_dois(admin_client, resources)
+
+    jobs = DOITransitionJob.objects.all()
+    assert [job.status for job in jobs] == [DOITransitionJob.Status.SUCCEEDED] * 3
+    assert len(fake_datacite.dois) == 3
+    assert set(DataCiteResource.objects.filter(resource__in=resources).values_list("datacite_state", flat=True)) == {
+        DataCiteResource.DOIState.DRAFT
+    }
+
+
+def test_bulk_transitions_require_permission(client, curator):
+    client.force_login(curator)
+
+    response = client.get(reverse("admin:research_researchresource_changelist"))
+
+    changelist = response.context["cl"]
+    assert "draft_dois" not in changelist.model_admin.get_actions(response.wsgi_request)
@@ -132,6 +132,18 @@ DATABASES = {
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a cache shared between all worker processes in production (e.g.
+# Redis or Memcached), as cache invalidation relies on it.
+
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+# Number of web server worker processes. `check --deploy` warns if more than
+# one worker uses the local memory cache.
+RDML_WEB_WORKERS = env.int("RDML_WEB_WORKERS", default=1)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -257,6 +269,79 @@ _raw = env.list("RDML_EDIT_ALLOWED_IP_RANGES", default=None)
 RDML_EDIT_ALLOWED_IP_RANGES = _raw or ["*"]
 
 
+# Override the DataCite API URL of the active DataCiteConfiguration, e.g.
+# with the local stand-in server of the `run_fake_datacite` command
+# (http://127.0.0.1:8765/). Never set this in production.
+RDML_DATACITE_API_URL = env.str("RDML_DATACITE_API_URL", default="")
+
+# DataCite API client: timeouts in seconds and the number of connections
+# kept alive per host and process.
+RDML_DATACITE_CONNECT_TIMEOUT = env.float("RDML_DATACITE_CONNECT_TIMEOUT", default=5)
+RDML_DATACITE_READ_TIMEOUT = env.float("RDML_DATACITE_READ_TIMEOUT", default=15)
+RDML_DATACITE_POOL_MAXSIZE = env.int("RDML_DATACITE_POOL_MAXSIZE", default=10)
+# Requests per period (seconds) sent to DataCite by each process. DataCite
+# allows 3000 requests per five minutes and client IP address; the default
+# leaves headroom for other processes on the same host.
+RDML_DATACITE_RATE_LIMIT = env.int("RDML_DATACITE_RATE_LIMIT", default=2500)
+RDML_DATACITE_RATE_LIMIT_PERIOD = env.int("RDML_DATACITE_RATE_LIMIT_PERIOD", default=300)
+# Retries of failed DataCite requests, with exponential backoff (seconds)
+RDML_DATACITE_MAX_RETRIES = env.int("RDML_DATACITE_MAX_RETRIES", default=3)
+RDML_DATACITE_RETRY_BACKOFF = env.float("RDML_DATACITE_RETRY_BACKOFF", default=0.5)
+RDML_DATACITE_RETRY_MAX_BACKOFF = env.float("RDML_DATACITE_RETRY_MAX_BACKOFF", default=30)
+# After this many consecutive failures, requests to DataCite fail
+# immediately for the open interval (seconds). Shared by all processes with
+# a shared CACHE_URL.
+RDML_DATACITE_BREAKER_THRESHOLD = env.int("RDML_DATACITE_BREAKER_THRESHOLD", default=5)
+RDML_DATACITE_BREAKER_OPEN_INTERVAL = env.int("RDML_DATACITE_BREAKER_OPEN_INTERVAL", default=60)
+# Days after which the `prune_datacite_api_log` command drops the bodies of
+# successful requests from the DataCite API log, and deletes entries.
+RDML_DATACITE_API_LOG_COMPACT_DAYS = env.int("RDML_DATACITE_API_LOG_COMPACT_DAYS", default=90)
+RDML_DATACITE_API_LOG_RETENTION_DAYS = env.int("RDML_DATACITE_API_LOG_RETENTION_DAYS", default=730)
+
+# DOI transitions are performed within the request. Set to True to queue
+# them for the `run_doi_jobs` worker instead, which must then be deployed
+# as a service, otherwise queued transitions are never performed.
+RDML_DOI_TRANSITIONS_ASYNC = env.bool("RDML_DOI_TRANSITIONS_ASYNC", default=False)
+# Number of DOI transitions performed concurrently by bulk transitions and
+# the `run_doi_jobs` worker.
+RDML_DOI_TRANSITIONS_WORKERS = env.int("RDML_DOI_TRANSITIONS_WORKERS", default=4)
+# Minutes after which running DOI transitions are considered interrupted,
+# e.g. by a killed process. They are queued again for the worker, or fail
+# if transitions are performed within the request.
+RDML_DOI_TRANSITIONS_TIMEOUT = env.int("RDML_DOI_TRANSITIONS_TIMEOUT", default=10)
+
+# URL reachability checks when saving resources: overall time budget, and
+# seconds to cache the result of reachable and of unreachable URLs.
+RDML_LINKCHECK_BUDGET = env.float("RDML_LINKCHECK_BUDGET", default=5)
+RDML_LINKCHECK_TTL = env.int("RDML_LINKCHECK_TTL", default=60 * 60 * 24)
+RDML_LINKCHECK_NEGATIVE_TTL = env.int("RDML_LINKCHECK_NEGATIVE_TTL", default=60 * 15)
+
+# Catalogue-wide link checks (check_links management command): concurrent
+# checks overall and per host, seconds between requests to the same host,
+# request timeout, and days link check results are kept.
+RDML_LINKCHECK_WORKERS = env.int("RDML_LINKCHECK_WORKERS", default=16)
+RDML_LINKCHECK_PER_HOST = env.int("RDML_LINKCHECK_PER_HOST", default=2)
+RDML_LINKCHECK_HOST_DELAY = env.float("RDML_LINKCHECK_HOST_DELAY", default=0.5)
+RDML_LINKCHECK_TIMEOUT = env.float("RDML_LINKCHECK_TIMEOUT", default=10)
+RDML_LINKCHECK_RETENTION_DAYS = env.int("RDML_LINKCHECK_RETENTION_DAYS", default=180)
+
+# Seconds to cache landing pages for anonymous users, 0 to disable. Cached
+# pages are invalidated when anything shown on them changes, which requires a
+# shared CACHE_URL: the page cache is disabled with the local memory cache.
+RDML_LANDING_PAGE_CACHE_TIMEOUT = env.int("RDML_LANDING_PAGE_CACHE_TIMEOUT", default=60 * 60 * 24)
+
+# Seconds reverse proxies may serve public pages to anonymous users without
+# revalidating them (Cache-Control: max-age). Only with unrestricted
+# RDML_EDIT_ALLOWED_IP_RANGES, as pages otherwise differ by client IP address.
+RDML_PUBLIC_PAGES_MAX_AGE = env.int("RDML_PUBLIC_PAGES_MAX_AGE", default=300)
+
+# Number of resources per page of the public listing
+RDML_LISTING_PAGE_SIZE = env.int("RDML_LISTING_PAGE_SIZE", default=100)
+
+# Number of most frequent values shown per facet of the public listing
+RDML_LISTING_FACET_SIZE = env.int("RDML_LISTING_FACET_SIZE", default=10)
+
+
 ### DEBUG SETTINGS
 
 if DEBUG: